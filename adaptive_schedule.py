@@ -0,0 +1,227 @@
+"""
+History-learned adaptive check scheduling for OurCampus Apartment Monitor.
+
+Instead of hard-coded priority windows, the adaptive scheduler reads the
+unavailable -> available transitions recorded in availability_history and
+estimates the probability of a release for every minute of the week. A
+configurable budget of checks per day is then spent in proportion to that
+estimate, and the expected detection delay the budget buys is reported so
+checks can be traded for latency deliberately.
+
+The profile is recomputed once a night (after ADAPTIVE_RECOMPUTE_HOUR).
+"""
+
+import logging
+import random
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# Button texts that do not say anything about availability
+UNRELIABLE_BUTTON_TEXTS = ("Unknown", "Error", "")
+
+
+def minute_of_week(dt):
+    """Minute index within the week, 0 = Monday 00:00."""
+    return dt.weekday() * MINUTES_PER_DAY + dt.hour * 60 + dt.minute
+
+
+def init_profile_table(conn):
+    """Create the table that records each recomputed schedule profile."""
+    c = conn.cursor()
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS schedule_profile (
+        computed_at TEXT,
+        transitions INTEGER,
+        checks_per_day REAL,
+        expected_delay_seconds REAL
+    )
+    ''')
+    conn.commit()
+
+
+def load_release_times(conn, lookback_days):
+    """Return the estimated time of every unavailable -> available transition.
+
+    A release happened somewhere between the last "unavailable" check and the
+    first "available" one, so the midpoint of the two is used.
+    """
+    since = (datetime.now() - timedelta(days=lookback_days)).isoformat()
+    placeholders = ", ".join("?" for _ in UNRELIABLE_BUTTON_TEXTS)
+    c = conn.cursor()
+    c.execute(f'''
+        SELECT prev_timestamp, timestamp FROM (
+            SELECT timestamp, available,
+                   LAG(available) OVER (PARTITION BY apartment_type ORDER BY timestamp) AS prev_available,
+                   LAG(timestamp) OVER (PARTITION BY apartment_type ORDER BY timestamp) AS prev_timestamp
+            FROM availability_history
+            WHERE timestamp >= ? AND (button_text IS NULL OR button_text NOT IN ({placeholders}))
+        )
+        WHERE available = 1 AND prev_available = 0
+    ''', (since,) + UNRELIABLE_BUTTON_TEXTS)
+
+    release_times = []
+    for prev_timestamp, timestamp in c.fetchall():
+        before = datetime.fromisoformat(prev_timestamp)
+        after = datetime.fromisoformat(timestamp)
+        release_times.append(before + (after - before) / 2)
+    return release_times
+
+
+def build_profile(release_times, smoothing_minutes=30, prior_weight=0.1):
+    """Estimate the release probability for each minute of the week.
+
+    Release counts are smoothed with a circular moving average of
+    +/- smoothing_minutes and mixed with a uniform prior so that no minute
+    ever has zero probability (and zero checks).
+    """
+    counts = [0.0] * MINUTES_PER_WEEK
+    for release_time in release_times:
+        counts[minute_of_week(release_time)] += 1
+
+    total = sum(counts)
+    if not total:
+        return [1.0 / MINUTES_PER_WEEK] * MINUTES_PER_WEEK
+
+    # Circular moving average using a running window sum
+    width = 2 * smoothing_minutes + 1
+    smoothed = [0.0] * MINUTES_PER_WEEK
+    window = sum(counts[m % MINUTES_PER_WEEK] for m in range(-smoothing_minutes, smoothing_minutes + 1))
+    for m in range(MINUTES_PER_WEEK):
+        smoothed[m] = window / width
+        window += counts[(m + smoothing_minutes + 1) % MINUTES_PER_WEEK]
+        window -= counts[(m - smoothing_minutes) % MINUTES_PER_WEEK]
+
+    smoothed_total = sum(smoothed)
+    uniform = 1.0 / MINUTES_PER_WEEK
+    return [(1 - prior_weight) * s / smoothed_total + prior_weight * uniform for s in smoothed]
+
+
+def allocate_intervals(profile, checks_per_day, min_interval, max_interval, exponent=1.0):
+    """Spread checks_per_day over the week in proportion to profile ** exponent.
+
+    Returns the check interval (seconds) for each minute of the week. An
+    exponent of 1.0 spends checks in direct proportion to release probability;
+    0.5 minimises the mean detection delay for a given budget.
+
+    Intervals are kept within [min_interval, max_interval]. Checks that a
+    clamped minute cannot use are redistributed to the others, so the whole
+    budget is spent whenever the limits allow it.
+    """
+    weights = [p ** exponent for p in profile]
+    min_rate = 60.0 / max_interval  # checks per minute
+    max_rate = 60.0 / min_interval
+    checks_per_week = checks_per_day * 7
+
+    def rates_for(scale):
+        return [min(max(scale * w, min_rate), max_rate) for w in weights]
+
+    # Find the scale whose clamped rates add up to the weekly budget
+    low, high = 0.0, max_rate / min(w for w in weights if w > 0)
+    for _ in range(50):
+        scale = (low + high) / 2
+        if sum(rates_for(scale)) < checks_per_week:
+            low = scale
+        else:
+            high = scale
+
+    return [60.0 / rate for rate in rates_for(high)]
+
+
+def expected_detection_delay(profile, intervals):
+    """Expected seconds between a release and the next check.
+
+    A release lands uniformly inside a check interval, so on average it waits
+    half an interval.
+    """
+    return sum(p * interval / 2 for p, interval in zip(profile, intervals))
+
+
+def effective_checks_per_day(intervals):
+    """Checks per day actually spent after intervals are clamped."""
+    return sum(60.0 / interval for interval in intervals) / 7
+
+
+class AdaptiveScheduler:
+    """Check intervals learned from availability history, recomputed nightly."""
+
+    def __init__(self, checks_per_day, min_interval, max_interval, lookback_days=90,
+                 smoothing_minutes=30, prior_weight=0.1, exponent=1.0, recompute_hour=3):
+        self.checks_per_day = checks_per_day
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.lookback_days = lookback_days
+        self.smoothing_minutes = smoothing_minutes
+        self.prior_weight = prior_weight
+        self.exponent = exponent
+        self.recompute_hour = recompute_hour
+
+        self.profile = None
+        self.intervals = None
+        self.transitions = 0
+        self.computed_at = None
+
+    @property
+    def ready(self):
+        return self.intervals is not None
+
+    def refresh(self, conn, now=None):
+        """Recompute the profile on first use and then once a night."""
+        now = now or datetime.now()
+        if self.computed_at is None:
+            self.recompute(conn)
+        elif self.computed_at.date() < now.date() and now.hour >= self.recompute_hour:
+            self.recompute(conn)
+
+    def recompute(self, conn):
+        release_times = load_release_times(conn, self.lookback_days)
+        self.profile = build_profile(release_times, self.smoothing_minutes, self.prior_weight)
+        self.intervals = allocate_intervals(
+            self.profile, self.checks_per_day, self.min_interval, self.max_interval, self.exponent
+        )
+        self.transitions = len(release_times)
+        self.computed_at = datetime.now()
+
+        delay = self.expected_delay()
+        logger.info(
+            f"Adaptive schedule recomputed from {self.transitions} releases: "
+            f"{effective_checks_per_day(self.intervals):.0f} checks/day, "
+            f"expected detection delay {delay:.0f}s"
+        )
+
+        try:
+            conn.execute(
+                "INSERT INTO schedule_profile VALUES (?, ?, ?, ?)",
+                (self.computed_at.isoformat(), self.transitions,
+                 effective_checks_per_day(self.intervals), delay)
+            )
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Error logging schedule profile: {e}")
+
+    def interval(self, now=None):
+        """Randomised check interval (seconds) for the current minute of the week."""
+        return max(1, int(round(self.base_interval(now) * random.uniform(0.85, 1.15))))
+
+    def base_interval(self, now=None):
+        """Check interval (seconds) for the current minute of the week, before randomisation."""
+        now = now or datetime.now()
+        return self.intervals[minute_of_week(now)]
+
+    def release_probability(self, now=None):
+        """Estimated release probability of the current minute (relative to uniform)."""
+        now = now or datetime.now()
+        return self.profile[minute_of_week(now)] * MINUTES_PER_WEEK
+
+    def expected_delay(self, checks_per_day=None):
+        """Expected detection delay (seconds) for the current or a hypothetical budget."""
+        if checks_per_day is None or checks_per_day == self.checks_per_day:
+            intervals = self.intervals
+        else:
+            intervals = allocate_intervals(
+                self.profile, checks_per_day, self.min_interval, self.max_interval, self.exponent
+            )
+        return expected_detection_delay(self.profile, intervals)
@@ -0,0 +1,126 @@
+"""
+Adaptive speed mode interval for OurCampus Apartment Monitor.
+
+A fixed 0.5-1.5s interval keeps hammering the site when it slows down (e.g.
+during a release), which only piles up slow requests. The interval is instead
+driven by additive-increase/multiplicative-decrease on the check rate:
+
+- while the site is healthy, the rate grows by step checks/second per check,
+  until the interval is down to the floor
+- when it degrades (a failed check, the rolling error rate above
+  max_error_rate, or recent latency above latency_ratio times its baseline),
+  the interval is multiplied by backoff, up to the ceiling
+
+Latency is tracked per check engine, since the engines differ several times
+in latency: a fast EWMA for the recent latency and a slow EWMA for the
+baseline it is compared to.
+"""
+
+import logging
+import random
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class AimdInterval:
+    """Check interval from measured latency and error rate (additive speed-up, multiplicative back-off)."""
+
+    def __init__(self, floor=0.5, ceiling=10.0, start=1.0, step=0.05, backoff=2.0, latency_ratio=2.0,
+                 max_error_rate=0.2, window=20, fast_alpha=0.3, slow_alpha=0.02, jitter=0.1):
+        self.floor = floor
+        self.ceiling = max(ceiling, floor)
+        self.interval = min(max(start, floor), self.ceiling)
+        self.step = step
+        self.backoff = backoff
+        self.latency_ratio = latency_ratio
+        self.max_error_rate = max_error_rate
+        self.fast_alpha = fast_alpha
+        self.slow_alpha = slow_alpha
+        self.jitter = jitter
+        self.outcomes = deque(maxlen=window)
+        self.recent = {}  # engine -> fast EWMA of latency (seconds)
+        self.baseline = {}  # engine -> slow EWMA of latency (seconds)
+        self.degraded = False
+        self.backoffs = 0
+        self.last_inputs = {}
+        self.lock = threading.Lock()
+
+    @property
+    def error_rate(self):
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def record(self, ok, latency=None, engine=None):
+        """Register a check (latency in seconds, for successful checks). Returns the new interval."""
+        with self.lock:
+            self.outcomes.append(ok)
+            error_rate = self.error_rate
+            recent = baseline = None
+            if ok and latency is not None:
+                recent = self.recent[engine] = ewma(self.recent.get(engine), latency, self.fast_alpha)
+                baseline = self.baseline[engine] = ewma(self.baseline.get(engine), latency, self.slow_alpha)
+
+            if not ok:
+                reason = "check failed"
+            elif error_rate > self.max_error_rate:
+                reason = f"error rate {error_rate:.0%}"
+            elif recent is not None and recent > baseline * self.latency_ratio:
+                reason = f"latency {recent * 1000:.0f}ms vs baseline {baseline * 1000:.0f}ms"
+            else:
+                reason = None
+
+            previous = self.interval
+            if reason:
+                self.interval = min(self.ceiling, self.interval * self.backoff)
+                self.backoffs += 1
+            else:
+                self.interval = max(self.floor, 1 / (1 / self.interval + self.step))
+            was_degraded, self.degraded = self.degraded, reason is not None
+            self.last_inputs = {
+                "engine": engine,
+                "latency_ms": latency * 1000 if latency is not None else None,
+                "recent_ms": recent * 1000 if recent is not None else None,
+                "baseline_ms": baseline * 1000 if baseline is not None else None,
+                "error_rate": error_rate,
+            }
+            interval = self.interval
+
+        if reason and not was_degraded:
+            logger.warning(f"Site degraded ({reason}) - backing off to {interval:.2f}s")
+        elif reason:
+            logger.info(f"Still degraded ({reason}) - interval {previous:.2f}s -> {interval:.2f}s")
+        elif was_degraded:
+            logger.info(f"Site healthy again - speeding up from {interval:.2f}s")
+        return interval
+
+    def next_interval(self):
+        """The current interval with a little jitter, so checks do not run on an exact grid."""
+        with self.lock:
+            interval = self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            return min(max(interval, self.floor), self.ceiling)
+
+    def describe(self):
+        """The interval and the inputs it was chosen from, for the log."""
+        with self.lock:
+            inputs = self.last_inputs
+            text = f"interval {self.interval:.2f}s"
+            if inputs.get("latency_ms") is not None:
+                text += (f" (latency {inputs['latency_ms']:.0f}ms, recent {inputs['recent_ms']:.0f}ms, "
+                         f"baseline {inputs['baseline_ms']:.0f}ms on {inputs['engine']}")
+            else:
+                text += " (failed check"
+            return text + f", errors {inputs.get('error_rate', 0.0):.0%})"
+
+    def stats(self):
+        with self.lock:
+            return {
+                "interval": self.interval,
+                "degraded": 1 if self.degraded else 0,
+                "error_rate": self.error_rate,
+                "backoffs": self.backoffs,
+            }
+
+
+def ewma(previous, value, alpha):
+    return value if previous is None else previous + alpha * (value - previous)
@@ -0,0 +1,74 @@
+"""
+Persistent alert state for OurCampus Apartment Monitor.
+
+The set of apartments already alerted on is stored per loop mode ("main",
+"speed") so a restarted monitor neither re-alerts on units it already
+announced nor reopens booking windows. Every change is also appended to an
+alert ledger. Both tables are written in one transaction, so a crash
+mid-write leaves the previous state intact.
+"""
+
+import logging
+import sqlite3
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def init_alert_state_table(conn):
+    """Create the alert state and ledger tables."""
+    c = conn.cursor()
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS alert_state (
+        mode TEXT,
+        entry TEXT,
+        notified_at TEXT,
+        correlation_id TEXT,
+        PRIMARY KEY (mode, entry)
+    ) WITHOUT ROWID
+    ''')
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS alert_ledger (
+        timestamp TEXT,
+        mode TEXT,
+        event TEXT,
+        entries TEXT,
+        correlation_id TEXT
+    )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_alert_ledger_mode_time ON alert_ledger (mode, timestamp)")
+    conn.commit()
+
+
+def load_alert_state(conn, mode):
+    """Entries already alerted on in this mode, or an empty set if the state cannot be read."""
+    if not conn:
+        return set()
+
+    try:
+        rows = conn.execute("SELECT entry FROM alert_state WHERE mode = ?", (mode,)).fetchall()
+    except sqlite3.Error as e:
+        logger.error(f"Error loading alert state: {e}")
+        return set()
+    return {row[0] for row in rows}
+
+
+def save_alert_state(conn, mode, entries, event, correlation_id=None):
+    """Replace the alerted entries of a mode and record the change in the ledger, atomically."""
+    if not conn:
+        return
+
+    timestamp = datetime.now().isoformat()
+    try:
+        with conn:  # one transaction: commits on success, rolls back on error
+            conn.execute("DELETE FROM alert_state WHERE mode = ?", (mode,))
+            conn.executemany(
+                "INSERT INTO alert_state (mode, entry, notified_at, correlation_id) VALUES (?, ?, ?, ?)",
+                [(mode, entry, timestamp, correlation_id) for entry in sorted(entries)]
+            )
+            conn.execute(
+                "INSERT INTO alert_ledger (timestamp, mode, event, entries, correlation_id) VALUES (?, ?, ?, ?, ?)",
+                (timestamp, mode, event, "\n".join(sorted(entries)), correlation_id)
+            )
+    except sqlite3.Error as e:
+        logger.error(f"Error saving alert state: {e}")
@@ -0,0 +1,102 @@
+"""
+Alert fan-out time against the local Telegram stand-in.
+
+N subscribers (with a mix of floor plan filters that all match the alert) are
+registered in a scratch database and one availability alert is sent:
+
+- fanout: send_alert, concurrent within the per-chat and global rate limits
+- sequential: the same messages sent one after the other, like a loop over
+  send_telegram_notification would
+
+Reported per N: the time from the start of the alert until every message was
+answered, and the messages per second. --response-delay makes the stand-in
+answer like a remote API would.
+
+Usage:
+    python -m benchmarks.alert_fanout --subscribers 1 10 30 100 --response-delay 0.1
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.detection_latency import REPO_DIR
+from benchmarks.telegram_stub import TelegramStub
+import html_extract
+import subscribers
+
+APARTMENTS = sorted(html_extract.FLOOR_PLANS.values())
+
+
+def register(db_conn, count):
+    """count subscribers: every other one for all floor plans, the rest for one floor plan each."""
+    with db_conn:
+        db_conn.execute("DELETE FROM subscribers")
+    for index in range(count):
+        floor_plans = None if index % 2 == 0 else {APARTMENTS[(index // 2) % len(APARTMENTS)]}
+        subscribers.add_subscriber(db_conn, str(1000 + index), floor_plans)
+
+
+def run(wu, db_conn, stub, mode):
+    """Send one alert. Returns (seconds until every message was answered, messages received)."""
+    stub.clear()
+    wu.alert_fanout = None  # fresh per-chat limiters, so runs do not throttle each other
+    started = time.perf_counter()
+    if mode == "fanout":
+        wu.send_alert(APARTMENTS, wu.format_available_message, db_conn)
+    else:
+        for chat_id, apartments in wu.alert_recipients(db_conn, APARTMENTS):
+            wu.send_telegram_message(chat_id, wu.format_available_message(apartments))
+    return time.perf_counter() - started, len(stub.messages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alert fan-out time for N subscribers")
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1, 10, 30, 100])
+    parser.add_argument("--response-delay", type=float, default=0.1, help="Seconds the stand-in takes per reply")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    stub = TelegramStub(response_delay=args.response_delay).start()
+    os.chdir(tempfile.mkdtemp(prefix="ourcampus_fanout_"))  # keep logs/ and data/ out of the repository
+    sys.path.insert(0, REPO_DIR)
+    import watch_units as wu
+    wu.TELEGRAM_API_URL = stub.url
+    wu.TELEGRAM_TOKEN = "benchmark"
+    wu.TELEGRAM_CHAT_ID = None  # subscribers only
+
+    db_conn = wu.init_database()
+    report = {}
+    try:
+        for count in args.subscribers:
+            register(db_conn, count)
+            report[count] = {}
+            for mode in ("fanout", "sequential"):
+                seconds, received = run(wu, db_conn, stub, mode)
+                report[count][mode] = {
+                    "seconds": seconds,
+                    "received": received,
+                    "messages_per_second": received / seconds if seconds else None,
+                }
+    finally:
+        db_conn.close()
+        stub.stop()
+
+    print(f"{'subscribers':>11} {'mode':<11} {'seconds':>9} {'received':>9} {'msg/s':>8}")
+    for count, modes in report.items():
+        for mode, stats in modes.items():
+            print(f"{count:>11} {mode:<11} {stats['seconds']:>9.2f} {stats['received']:>9} "
+                  f"{stats['messages_per_second']:>8.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
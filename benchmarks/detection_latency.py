@@ -0,0 +1,287 @@
+"""
+End-to-end detection latency benchmark against the local fixture site.
+
+For every target a fixture copy of floorplans.aspx is served locally, the
+Telegram API is replaced by a local stand-in, and one floor plan's button is
+flipped from "CONTACT US" to "APPLY" at a random moment. The benchmark reports
+flip-to-detect and flip-to-alert latency percentiles.
+
+Targets:
+- main, speed_mode_main: watch_units.py is started as a subprocess pointed at
+  the fixture; detection is taken from its log output, the alert from the
+  Telegram stand-in. Schedule settings (HIGH_PRIORITY_MIN, ...) are read from
+  the environment as usual.
+- check engines: each engine is polled in-process every --engine-interval
+  seconds and the alert is sent through send_telegram_notification.
+
+Usage:
+    python -m benchmarks.detection_latency --trials 10 --max-flip-delay 30
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.fixture_site import FixtureSite, FLOOR_PLAN_IDS
+from benchmarks.telegram_stub import TelegramStub
+from latency import percentile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WATCH_UNITS = os.path.join(REPO_DIR, "watch_units.py")
+
+# Log lines that mark the first check and a detection for each process target
+PROCESS_TARGETS = {
+    "main": {
+        "args": [],
+        "first_check": "Checking for apartment availability",
+        "detected": "New apartments available!",
+    },
+    "speed_mode_main": {
+        "args": ["--speed-mode"],
+        "first_check": "SPEED: Checking apartments",
+        "detected": "SUCCESS: New apartments found",
+    },
+}
+
+# In-process check engines: name -> (driver factory, check function)
+ENGINE_TARGETS = {
+    "check_availability": (
+        lambda wu: wu.setup_driver(headless=True),
+        lambda wu, driver: wu.check_availability(driver, None),
+    ),
+    "check_availability_speed": (
+        lambda wu: wu.setup_speed_driver(headless=True),
+        lambda wu, driver: wu.check_availability_speed(driver),
+    ),
+    "check_availability_page_source": (
+        lambda wu: wu.setup_speed_driver(headless=True),
+        lambda wu, driver: wu.check_availability_page_source(driver),
+    ),
+    "check_availability_resident": (
+        lambda wu: wu.setup_speed_driver(headless=True),
+        lambda wu, driver: wu.check_availability_resident(driver),
+    ),
+    "check_availability_http": (
+        lambda wu: wu.create_http_session(),
+        lambda wu, session: wu.check_availability_http(session),
+    ),
+}
+
+# Engines that need an HTTP server (the others can also load file:// pages)
+HTTP_ONLY_ENGINES = {"check_availability_resident", "check_availability_http"}
+
+
+def close_engine(driver):
+    """Quit a WebDriver or close an HTTP session."""
+    if hasattr(driver, "quit"):
+        driver.quit()
+    else:
+        driver.close()
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def is_alert(message, flipped_at):
+    return message["received_at"] >= flipped_at and "AVAILABLE!" in message["text"].upper()
+
+
+def run_process_trial(target, site, stub, max_flip_delay, timeout, workdir):
+    """Run one trial of main or speed_mode_main in a subprocess."""
+    spec = PROCESS_TARGETS[target]
+    site.reset()
+    stub.clear()
+
+    env = dict(
+        os.environ,
+        MONITOR_URL=site.url,
+        TELEGRAM_API_URL=stub.url,
+        TELEGRAM_TOKEN="benchmark",
+        TELEGRAM_CHAT_ID="1",
+        AUTO_OPEN_BROWSER="false",
+        HEALTH_CHECK_ENABLED="false",
+        INVENTORY_ENABLED="false",  # unit lists are fetched from the real site, not the fixture
+        EVIDENCE_CAPTURE="false",  # screenshots after each alert are not part of the detection latency
+        DB_DIR=tempfile.mkdtemp(prefix="data_", dir=workdir),  # fresh per trial: no alert state carried over
+        PYTHONUNBUFFERED="1",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, WATCH_UNITS] + spec["args"],
+        cwd=workdir, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, encoding="utf-8", errors="replace",
+    )
+
+    lines = []
+    lines_changed = threading.Condition()
+
+    def read_output():
+        for line in proc.stdout:
+            with lines_changed:
+                lines.append((time.time(), line))
+                lines_changed.notify_all()
+
+    reader = threading.Thread(target=read_output, daemon=True)
+    reader.start()
+
+    def wait_for_line(marker, since, wait):
+        deadline = time.time() + wait
+        with lines_changed:
+            while True:
+                for stamp, line in lines:
+                    if stamp >= since and marker in line:
+                        return stamp
+                remaining = deadline - time.time()
+                if remaining <= 0 or proc.poll() is not None:
+                    return None
+                lines_changed.wait(min(remaining, 1))
+
+    try:
+        if wait_for_line(spec["first_check"], 0, timeout) is None:
+            return {"error": "monitor never started checking"}
+
+        time.sleep(random.uniform(0, max_flip_delay))
+        flipped_at = site.flip(random.choice(FLOOR_PLAN_IDS))
+
+        detected_at = wait_for_line(spec["detected"], flipped_at, timeout)
+        alert = stub.wait_for(lambda m: is_alert(m, flipped_at), 10 if detected_at else 1)
+        return {
+            "detect": detected_at - flipped_at if detected_at else None,
+            "alert": alert["received_at"] - flipped_at if alert else None,
+        }
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def run_engine_trial(wu, check, driver, site, stub, max_flip_delay, interval, timeout):
+    """Run one trial of a check engine polled in-process."""
+    site.reset()
+    stub.clear()
+
+    # The flip happens on a timer thread, independent of the polling loop
+    flipper = threading.Timer(random.uniform(0, max_flip_delay), site.flip,
+                              args=(random.choice(FLOOR_PLAN_IDS),))
+    flipper.start()
+
+    detected_at = None
+    deadline = time.time() + max_flip_delay + timeout
+    while time.time() < deadline:
+        try:
+            available = check(wu, driver)
+        except Exception:
+            available = []  # a failed check is retried like a miss
+        if available and site.flipped_at:
+            detected_at = time.time()
+            break
+        time.sleep(interval)
+    flipper.cancel()
+
+    flipped_at = site.flipped_at
+    if not detected_at or not flipped_at:
+        return {"detect": None, "alert": None}
+
+    message = "APARTMENTS AVAILABLE!\n\n" + "\n".join(f"• {apt}" for apt in available)
+    wu.send_telegram_notification(message)
+    alert = stub.wait_for(lambda m: is_alert(m, flipped_at), 10)
+    return {
+        "detect": detected_at - flipped_at,
+        "alert": alert["received_at"] - flipped_at if alert else None,
+    }
+
+
+def summarise(results):
+    summary = {"trials": len(results), "missed": sum(1 for r in results if r.get("detect") is None)}
+    for metric in ("detect", "alert"):
+        values = [r[metric] for r in results if r.get(metric) is not None]
+        summary[metric] = {f"p{p}": percentile(values, p) for p in PERCENTILES}
+    return summary
+
+
+def print_report(report):
+    header = f"{'target':<26} {'n':>3} {'miss':>4}  " + "  ".join(
+        f"{metric + '_p' + str(p):>10}" for metric in ("detect", "alert") for p in PERCENTILES)
+    print(header)
+    print("-" * len(header))
+    for target, summary in report.items():
+        cells = []
+        for metric in ("detect", "alert"):
+            for p in PERCENTILES:
+                value = summary[metric][f"p{p}"]
+                cells.append(f"{value:>10.2f}" if value is not None else f"{'-':>10}")
+        print(f"{target:<26} {summary['trials']:>3} {summary['missed']:>4}  " + "  ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flip-to-detect / flip-to-alert latency benchmark")
+    parser.add_argument("--targets", nargs="+", default=list(PROCESS_TARGETS) + list(ENGINE_TARGETS),
+                        choices=list(PROCESS_TARGETS) + list(ENGINE_TARGETS))
+    parser.add_argument("--trials", type=int, default=5, help="Trials per target")
+    parser.add_argument("--max-flip-delay", type=float, default=20.0,
+                        help="Flip happens uniformly within this many seconds after the first check")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Give up on a trial after this many seconds")
+    parser.add_argument("--engine-interval", type=float, default=1.0, help="Polling interval for check engines")
+    parser.add_argument("--seed", type=int, help="Random seed for flip timing")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    site = FixtureSite().start()
+    stub = TelegramStub().start()
+    workdir = tempfile.mkdtemp(prefix="ourcampus_bench_")
+    print(f"Fixture site: {site.url}")
+    print(f"Telegram stand-in: {stub.url}")
+
+    report = {}
+    try:
+        for target in args.targets:
+            results = []
+            if target in PROCESS_TARGETS:
+                for trial in range(args.trials):
+                    result = run_process_trial(target, site, stub, args.max_flip_delay, args.timeout, workdir)
+                    print(f"{target} trial {trial + 1}: {result}")
+                    results.append(result)
+            else:
+                os.chdir(workdir)  # keep logs/ and data/ out of the repository
+                sys.path.insert(0, REPO_DIR)
+                import watch_units as wu
+                wu.URL = site.url
+                wu.TELEGRAM_API_URL = stub.url
+                wu.TELEGRAM_TOKEN = "benchmark"
+                wu.TELEGRAM_CHAT_ID = "1"
+
+                make_driver, check = ENGINE_TARGETS[target]
+                driver = make_driver(wu)
+                try:
+                    for trial in range(args.trials):
+                        result = run_engine_trial(wu, check, driver, site, stub, args.max_flip_delay,
+                                                  args.engine_interval, args.timeout)
+                        print(f"{target} trial {trial + 1}: {result}")
+                        results.append(result)
+                finally:
+                    close_engine(driver)
+            report[target] = summarise(results)
+    finally:
+        site.stop()
+        stub.stop()
+
+    print()
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Micro-benchmark of floor plan extraction against the local fixture site.
+
+Every method extracts the available apartment types from the fixture page
+(one floor plan flipped to "APPLY"), timed per call:
+
+- webdriver_lookups: the current approach, per floor plan a tab click and an
+  XPath find_element plus .text, each a chromedriver round trip
+- page_source_<backend>: one driver.page_source call and a single-pass parse
+- parse_<backend>: the parse alone on a cached page source
+- http_<backend>: one HTTP GET of the page and a single-pass parse
+
+The page is loaded once up front, so page load time is not included.
+
+Usage:
+    python -m benchmarks.extraction_micro --iterations 200
+    python -m benchmarks.extraction_micro --no-browser
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+from benchmarks.detection_latency import REPO_DIR
+from benchmarks.fixture_site import FixtureSite, FLOOR_PLAN_IDS
+import html_extract
+from latency import percentile
+
+BACKENDS = ["lxml", "stdlib"] if html_extract.etree is not None else ["stdlib"]
+
+
+def webdriver_lookups(wu, driver):
+    available = []
+    for plan_id, apartment_type in html_extract.FLOOR_PLANS.items():
+        tab = driver.find_element(wu.By.CSS_SELECTOR, f"a[href='#FP_Detail_{plan_id}']")
+        driver.execute_script("arguments[0].click();", tab)
+        button = driver.find_element(wu.By.XPATH, f"//div[@id='FP_Detail_{plan_id}']//button[contains(@class, 'btn')]")
+        if html_extract.is_available(button.text.strip()):
+            available.append(apartment_type)
+    return available
+
+
+def parse(html, backend):
+    return html_extract.available_apartments(html_extract.extract_floor_plans(html, backend))
+
+
+def measure(method, iterations):
+    """Time method() iterations times. Returns (timings in ms, last result)."""
+    timings = []
+    result = None
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = method()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-element WebDriver lookups vs single-pass page parsing")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--no-browser", action="store_true", help="Only benchmark the parse and HTTP methods")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    site = FixtureSite().start()
+    site.flip(FLOOR_PLAN_IDS[-1])
+    session = requests.Session()
+    page = session.get(site.url, timeout=10).text
+
+    methods = {}
+    for backend in BACKENDS:
+        methods[f"parse_{backend}"] = lambda backend=backend: parse(page, backend)
+        methods[f"http_{backend}"] = lambda backend=backend: parse(session.get(site.url, timeout=10).content, backend)
+
+    driver = None
+    if not args.no_browser:
+        os.chdir(tempfile.mkdtemp(prefix="ourcampus_micro_"))  # keep logs/ and data/ out of the repository
+        sys.path.insert(0, REPO_DIR)
+        import watch_units as wu
+
+        driver = wu.setup_speed_driver(headless=True)
+        driver.get(site.url)
+        methods["webdriver_lookups"] = lambda: webdriver_lookups(wu, driver)
+        for backend in BACKENDS:
+            methods[f"page_source_{backend}"] = lambda backend=backend: parse(driver.page_source, backend)
+
+    report = {}
+    try:
+        for name, method in methods.items():
+            measure(method, min(5, args.iterations))  # warm up
+            timings, result = measure(method, args.iterations)
+            report[name] = {
+                "result": result,
+                "mean_ms": sum(timings) / len(timings),
+                "p50_ms": percentile(timings, 50),
+                "p95_ms": percentile(timings, 95),
+            }
+    finally:
+        if driver:
+            driver.quit()
+        session.close()
+        site.stop()
+
+    print(f"{'method':<22} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}  result")
+    for name, stats in sorted(report.items(), key=lambda item: item[1]["mean_ms"]):
+        print(f"{name:<22} {stats['mean_ms']:>9.3f} {stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f}  {stats['result']}")
+    if len({json.dumps(stats["result"]) for stats in report.values()}) > 1:
+        print("\nWARNING: methods disagree on the extracted apartments")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
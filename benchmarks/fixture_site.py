@@ -0,0 +1,101 @@
+"""
+Local fixture copy of the OurCampus floor plans page.
+
+Serves benchmarks/fixtures/floorplans.html at the same path as the real site so
+every check engine can run unchanged against it. The button text of each floor
+plan can be flipped from "CONTACT US" to "APPLY" while the server is running.
+"""
+
+import http.server
+import os
+import threading
+import time
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FLOORPLANS_PATH = "/onlineleasing/ourcampus-amsterdam-diemen/floorplans.aspx"
+FLOOR_PLAN_IDS = ["1100004", "1100005"]
+
+UNAVAILABLE_TEXT = "CONTACT US"
+AVAILABLE_TEXT = "APPLY"
+
+
+class FixtureSite:
+    """Threaded HTTP server holding the current state of the fixture page."""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        with open(os.path.join(FIXTURE_DIR, "floorplans.html"), encoding="utf-8") as f:
+            self.template = f.read()
+        self.lock = threading.Lock()
+        self.buttons = {}
+        self.flipped_at = None
+        self.requests_served = 0
+        self.reset()
+
+        site = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != FLOORPLANS_PATH:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = site.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{FLOORPLANS_PATH}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset(self):
+        """Put every floor plan back to "CONTACT US"."""
+        with self.lock:
+            self.buttons = {plan_id: UNAVAILABLE_TEXT for plan_id in FLOOR_PLAN_IDS}
+            self.flipped_at = None
+
+    def flip(self, plan_id, text=AVAILABLE_TEXT):
+        """Change the button text of one floor plan and return the wall-clock flip time."""
+        with self.lock:
+            self.buttons[plan_id] = text
+            self.flipped_at = time.time()
+            return self.flipped_at
+
+    def render(self):
+        with self.lock:
+            self.requests_served += 1
+            html = self.template
+            for plan_id, button_text in self.buttons.items():
+                availability = "No availability" if button_text == UNAVAILABLE_TEXT else "Available now"
+                html = html.replace("{button_%s}" % plan_id, button_text)
+                html = html.replace("{availability_%s}" % plan_id, availability)
+            return html
+
+
+if __name__ == "__main__":
+    site = FixtureSite(port=int(os.getenv("FIXTURE_PORT", 8765))).start()
+    print(f"Fixture site serving {site.url}")
+    print("Press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        site.stop()
@@ -0,0 +1,84 @@
+"""
+Full page reloads vs in-page fetches against the local fixture site.
+
+Both paths end with the floorPlanDataContainer HTML of the current page:
+
+- reload: driver.get(URL) and a read of the live container, what every
+  browser check engine does today
+- fetch: fetch() of the same URL from inside the already loaded page,
+  parsed with DOMParser (check_availability_resident)
+
+Reported per check: latency and the bytes the browser received (decoded body
+sizes: document plus subresources for a reload, the document for a fetch).
+
+Usage:
+    python -m benchmarks.reload_vs_fetch --iterations 50
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+from benchmarks.detection_latency import REPO_DIR
+from benchmarks.fixture_site import FixtureSite
+from latency import percentile
+import resident_page
+
+
+def measure(page, method, iterations):
+    """Call method iterations times. Returns (latencies in ms, bytes) per call."""
+    latencies = []
+    sizes = []
+    for _ in range(iterations):
+        method()
+        _, size, seconds = page.last
+        latencies.append(seconds * 1000)
+        sizes.append(size)
+    return latencies, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-check bytes and latency of page reloads vs in-page fetches")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+    if args.json:
+        args.json = os.path.abspath(args.json)
+
+    site = FixtureSite().start()
+    os.chdir(tempfile.mkdtemp(prefix="ourcampus_resident_"))  # keep logs/ and data/ out of the repository
+    sys.path.insert(0, REPO_DIR)
+    import watch_units as wu
+
+    driver = wu.setup_speed_driver(headless=True)
+    page = resident_page.ResidentPage(driver, site.url, reload_every=args.iterations + 1)
+    report = {}
+    try:
+        page.reload()  # warm up
+        page.fetch()
+        for name, method in (("reload", page.reload), ("fetch", page.fetch)):
+            latencies, sizes = measure(page, method, args.iterations)
+            report[name] = {
+                "mean_ms": sum(latencies) / len(latencies),
+                "p50_ms": percentile(latencies, 50),
+                "p95_ms": percentile(latencies, 95),
+                "mean_bytes": sum(sizes) / len(sizes),
+            }
+    finally:
+        driver.quit()
+        site.stop()
+
+    print(f"{'path':<8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'bytes':>10}")
+    for name, stats in report.items():
+        print(f"{name:<8} {stats['mean_ms']:>9.1f} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} "
+              f"{stats['mean_bytes']:>10.0f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Offline replay of recorded page snapshots.
+
+Feeds every distinct snapshot recorded with SNAPSHOT_RECORDING=true through
+each extraction path and reports what it extracted and how fast:
+
+- html_parser, lxml_parser: html_extract's stdlib and lxml backends on the
+  stored HTML, no browser involved
+- browser check engines: the Selenium checks run against the snapshot
+  embedded in a local file copy of the floor plans page
+
+Snapshots on which the paths disagree are listed. --save
+writes the results to a file and --baseline compares a later run with it, so
+extraction changes can be checked for regressions.
+
+Usage:
+    python -m benchmarks.replay_snapshots --dir data/snapshots
+    python -m benchmarks.replay_snapshots --paths html_parser --repeat 100 --save baseline.json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.detection_latency import ENGINE_TARGETS, HTTP_ONLY_ENGINES, REPO_DIR, close_engine
+from benchmarks.fixture_site import FIXTURE_DIR
+import html_extract
+import snapshots
+
+PARSER_PATHS = {"html_parser": "stdlib", "lxml_parser": "lxml"}
+PATHS = list(PARSER_PATHS) + [target for target in ENGINE_TARGETS if target not in HTTP_ONLY_ENGINES]
+
+
+def load_distinct_snapshots(directory):
+    """(digest, first recorded timestamp, html) for every distinct snapshot, in recording order."""
+    seen = {}
+    for entry in snapshots.load_index(directory):
+        if entry["sha256"] not in seen:
+            seen[entry["sha256"]] = entry["ts"]
+    return [(digest, ts, snapshots.load_snapshot(directory, digest)) for digest, ts in seen.items()]
+
+
+def fixture_page(container_html):
+    """The fixture floor plans page with its container replaced by a recorded one."""
+    with open(os.path.join(FIXTURE_DIR, "floorplans.html"), encoding="utf-8") as f:
+        template = f.read()
+    return re.sub(r'<div id="floorPlanDataContainer">.*</div>\s*</form>',
+                  lambda match: container_html + "\n</form>", template, count=1, flags=re.DOTALL)
+
+
+def replay_parser(recorded, repeat, backend):
+    results = {}
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for digest, _, html in recorded:
+            results[digest] = html_extract.available_apartments(html_extract.extract_floor_plans(html, backend))
+    return results, time.perf_counter() - started, len(recorded) * repeat
+
+
+def replay_engine(target, recorded, workdir):
+    os.chdir(workdir)  # keep logs/ and data/ out of the repository
+    sys.path.insert(0, REPO_DIR)
+    import watch_units as wu
+
+    page_path = Path(workdir) / "floorplans.html"
+    make_driver, check = ENGINE_TARGETS[target]
+    driver = make_driver(wu)
+    results = {}
+    elapsed = 0.0
+    try:
+        for digest, _, html in recorded:
+            page_path.write_text(fixture_page(html), encoding="utf-8")
+            wu.URL = page_path.as_uri()
+            started = time.perf_counter()
+            try:
+                available = sorted(html_extract.apartment_type(apt) for apt in check(wu, driver))
+            except Exception as e:
+                available = f"error: {e}"
+            elapsed += time.perf_counter() - started
+            results[digest] = available
+    finally:
+        close_engine(driver)
+    return results, elapsed, len(recorded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded page snapshots through every extraction path")
+    parser.add_argument("--dir", default=os.path.join("data", "snapshots"), help="Snapshot directory")
+    parser.add_argument("--paths", nargs="+", default=PATHS, choices=PATHS)
+    parser.add_argument("--repeat", type=int, default=20, help="Passes over the snapshots for the parsers")
+    parser.add_argument("--save", help="Write the extraction results to this file")
+    parser.add_argument("--baseline", help="Compare the extraction results with a file written by --save")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    recorded = load_distinct_snapshots(os.path.abspath(args.dir))
+    if not recorded:
+        print(f"No snapshots found in {args.dir}")
+        return
+    print(f"Replaying {len(recorded)} distinct snapshots from {args.dir}")
+    for option in ("save", "baseline", "json"):
+        if getattr(args, option):
+            setattr(args, option, os.path.abspath(getattr(args, option)))
+
+    workdir = tempfile.mkdtemp(prefix="ourcampus_replay_")
+    results = {}
+    throughput = {}
+    for path in args.paths:
+        if path in PARSER_PATHS:
+            if PARSER_PATHS[path] == "lxml" and html_extract.etree is None:
+                print("lxml is not installed - skipping lxml_parser")
+                continue
+            path_results, elapsed, count = replay_parser(recorded, args.repeat, PARSER_PATHS[path])
+        else:
+            path_results, elapsed, count = replay_engine(path, recorded, workdir)
+        results[path] = path_results
+        throughput[path] = {"snapshots": count, "seconds": elapsed,
+                            "per_second": count / elapsed if elapsed else None}
+
+    print()
+    print(f"{'path':<26} {'snapshots':>9} {'seconds':>9} {'per second':>11}")
+    for path, stats in throughput.items():
+        rate = f"{stats['per_second']:>11.1f}" if stats["per_second"] else f"{'-':>11}"
+        print(f"{path:<26} {stats['snapshots']:>9} {stats['seconds']:>9.3f} {rate}")
+
+    # Snapshots on which the paths disagree
+    disagreements = []
+    for digest, ts, _ in recorded:
+        extracted = {path: results[path][digest] for path in results}
+        if len({json.dumps(value) for value in extracted.values()}) > 1:
+            disagreements.append({"sha256": digest, "ts": ts, "results": extracted})
+    print(f"\nPaths disagree on {len(disagreements)} snapshots")
+    for item in disagreements:
+        print(f"  {item['sha256'][:12]} ({time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(item['ts']))}): "
+              + ", ".join(f"{path}={value}" for path, value in item["results"].items()))
+
+    # Changes against a previous run
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for path, path_results in results.items():
+            for digest, value in path_results.items():
+                expected = baseline.get(path, {}).get(digest)
+                if expected is not None and expected != value:
+                    regressions.append({"path": path, "sha256": digest, "baseline": expected, "now": value})
+        print(f"\n{len(regressions)} results differ from {args.baseline}")
+        for item in regressions:
+            print(f"  {item['path']} {item['sha256'][:12]}: {item['baseline']} -> {item['now']}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"throughput": throughput, "disagreements": disagreements, "regressions": regressions},
+                      f, indent=2)
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
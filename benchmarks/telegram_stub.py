@@ -0,0 +1,103 @@
+"""
+Local stand-in for the Telegram Bot API.
+
+Accepts sendMessage and getUpdates for any bot token and records every message
+with the wall-clock time it arrived. Point TELEGRAM_API_URL at it.
+"""
+
+import http.server
+import json
+import threading
+import time
+import urllib.parse
+
+
+class TelegramStub:
+    """Threaded HTTP server that records sendMessage calls."""
+
+    def __init__(self, host="127.0.0.1", port=0, response_delay=0.0):
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        self.messages = []
+        self.response_delay = response_delay
+
+        stub = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def _reply(self, result):
+                body = json.dumps({"ok": True, "result": result}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.split("?")[0].endswith("/getUpdates"):
+                    self._reply([])
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+
+            def do_POST(self):
+                received_at = time.time()
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length).decode("utf-8")
+                if self.headers.get("Content-Type", "").startswith("application/json"):
+                    fields = json.loads(raw or "{}")
+                else:
+                    fields = {k: v[0] for k, v in urllib.parse.parse_qs(raw).items()}
+                if not self.path.endswith("/sendMessage"):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                stub.record(received_at, fields)
+                if stub.response_delay:
+                    time.sleep(stub.response_delay)
+                self._reply({"message_id": len(stub.messages), "chat": {"id": fields.get("chat_id")}})
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = http.server.ThreadingHTTPServer((host, port), Handler)
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def record(self, received_at, fields):
+        with self.condition:
+            self.messages.append({
+                "received_at": received_at,
+                "chat_id": str(fields.get("chat_id")),
+                "text": fields.get("text", ""),
+            })
+            self.condition.notify_all()
+
+    def clear(self):
+        with self.lock:
+            self.messages = []
+
+    def wait_for(self, predicate, timeout):
+        """Wait for the first recorded message matching predicate and return it (or None)."""
+        deadline = time.time() + timeout
+        with self.condition:
+            while True:
+                for message in self.messages:
+                    if predicate(message):
+                        return message
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
@@ -0,0 +1,106 @@
+"""
+Pre-launched booking browser for OurCampus Apartment Monitor.
+
+Starting a fresh Chrome when an apartment is detected costs seconds. Instead,
+a visible Chrome is launched in advance with a remote-debugging endpoint on
+localhost and a persistent profile (so a login to the booking site survives
+restarts). On detection the booking page is opened in it through the DevTools
+HTTP endpoint:
+
+    PUT /json/new?<url>        open a tab with the booking page
+    GET /json/activate/<id>    bring that tab to the front
+
+which takes milliseconds instead of a browser start. The browser is left open
+when the monitor exits, since a booking may be in progress in it.
+"""
+
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+import driver_cache
+
+logger = logging.getLogger(__name__)
+
+
+class BookingBrowser:
+    """A visible Chrome kept running for instant hand-off of booking pages."""
+
+    def __init__(self, port=9223, profile_dir=os.path.join("data", "booking_profile"), chrome_path=None):
+        self.port = port
+        self.profile_dir = os.path.abspath(profile_dir)
+        self.chrome_path = chrome_path
+        self.process = None
+        self.lock = threading.Lock()  # one launch at a time
+
+    @property
+    def endpoint(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def request(self, path, method="GET", timeout=2):
+        request = urllib.request.Request(self.endpoint + path, method=method)
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.read().decode("utf-8")
+
+    def is_ready(self):
+        """Whether the DevTools endpoint answers (also true for a browser left over from an earlier run)."""
+        try:
+            self.request("/json/version", timeout=0.5)
+            return True
+        except OSError:
+            return False
+
+    def start(self, timeout=30):
+        """Launch Chrome unless it is already running. Returns True once the DevTools endpoint answers."""
+        with self.lock:
+            if self.is_ready():
+                return True
+            chrome_path = self.chrome_path or driver_cache.find_chrome()
+            if not chrome_path:
+                logger.error("Booking browser: Chrome not found")
+                return False
+
+            os.makedirs(self.profile_dir, exist_ok=True)
+            started = time.perf_counter()
+            self.process = subprocess.Popen([
+                chrome_path,
+                f"--remote-debugging-port={self.port}",
+                "--remote-allow-origins=*",
+                f"--user-data-dir={self.profile_dir}",
+                "--no-first-run",
+                "--no-default-browser-check",
+                "--start-maximized",
+                "about:blank",
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                if self.process.poll() is not None:
+                    logger.error(f"Booking browser exited during startup (code {self.process.returncode})")
+                    self.process = None
+                    return False
+                if self.is_ready():
+                    logger.info(f"Booking browser ready on port {self.port} "
+                                f"({time.perf_counter() - started:.1f}s to start)")
+                    return True
+                time.sleep(0.1)
+            logger.error(f"Booking browser did not answer on port {self.port} within {timeout}s")
+            return False
+
+    def start_in_background(self):
+        if self.lock.locked():
+            return  # already starting
+        threading.Thread(target=self.start, name="booking-browser", daemon=True).start()
+
+    def open(self, url):
+        """Open url in a new foreground tab. Returns the hand-off time in seconds; raises OSError on failure."""
+        started = time.perf_counter()
+        # Chrome only accepts PUT for /json/new since version 111
+        target = json.loads(self.request("/json/new?" + urllib.parse.quote(url, safe=":/?&=%#"), method="PUT"))
+        self.request(f"/json/activate/{target['id']}")
+        return time.perf_counter() - started
@@ -0,0 +1,191 @@
+"""
+Append-only binary check log for OurCampus Apartment Monitor.
+
+Speed mode checks about once a second, too often for a SQLite commit per
+check. Instead every check appends one fixed-size record per floor plan
+(timestamp, check sequence number, floor plan ID, state, latency) to a
+preallocated, memory-mapped file: an append is a struct.pack_into into the
+mapping, with no system call. A background importer copies new records into
+availability_history in one transaction every import_interval seconds.
+
+The file is a ring of capacity records behind a small header holding the
+written and imported record counts, so records survive a restart and are
+imported once. If the importer falls more than capacity records behind, the
+oldest records are overwritten and counted as dropped.
+
+Records keep the button state rather than its text, so imported rows have
+no button text (NULL), except floor plans that could not be read: those are
+imported as "Unknown" and stay out of the adaptive schedule like other
+"Unknown" rows.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"OCCL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIQQ")  # magic, version, record size, capacity, reserved, written, imported
+RECORD = struct.Struct("<dIIBxxxf")  # timestamp, check sequence, floor plan ID, state, latency (ms)
+WRITTEN_OFFSET = 16
+IMPORTED_OFFSET = 24
+COUNTER = struct.Struct("<Q")
+
+UNAVAILABLE, AVAILABLE, UNKNOWN = 0, 1, 2
+
+
+def open_mapping(path, capacity):
+    """Open (or create and preallocate) the log file. Returns the file and its mapping."""
+    size = HEADER.size + capacity * RECORD.size
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if not os.path.exists(path):
+        open(path, "wb").close()
+    f = open(path, "r+b")
+    valid = False
+    if os.fstat(f.fileno()).st_size == size:
+        f.seek(0)
+        magic, version, record_size, file_capacity, _, _, _ = HEADER.unpack(f.read(HEADER.size))
+        valid = (magic, version, record_size, file_capacity) == (MAGIC, VERSION, RECORD.size, capacity)
+    if not valid:
+        if os.fstat(f.fileno()).st_size:
+            logger.warning(f"Check log {path} has a different layout - starting a new one")
+        f.truncate(0)
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(f.fileno(), 0, size)
+        else:
+            f.truncate(size)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, capacity, 0, 0, 0))
+        f.flush()
+    return f, mmap.mmap(f.fileno(), size)
+
+
+class CheckLog:
+    """Memory-mapped ring of fixed-size check records."""
+
+    def __init__(self, path, capacity=262144):
+        self.path = path
+        self.capacity = capacity
+        self.file, self.map = open_mapping(path, capacity)
+        self.lock = threading.Lock()
+        self.written = COUNTER.unpack_from(self.map, WRITTEN_OFFSET)[0]
+        self.imported = COUNTER.unpack_from(self.map, IMPORTED_OFFSET)[0]
+        self.sequence = self.written  # check sequence numbers keep increasing across restarts
+        self.dropped = 0
+
+    def append(self, states, latency_ms, timestamp=None):
+        """Append one check: states maps floor plan ID -> AVAILABLE/UNAVAILABLE/UNKNOWN."""
+        timestamp = timestamp or time.time()
+        with self.lock:
+            self.sequence += 1
+            for plan_id, state in states.items():
+                offset = HEADER.size + (self.written % self.capacity) * RECORD.size
+                RECORD.pack_into(self.map, offset, timestamp, self.sequence, int(plan_id), state, latency_ms)
+                self.written += 1
+            COUNTER.pack_into(self.map, WRITTEN_OFFSET, self.written)
+
+    def pending(self):
+        """(end index, records written but not yet imported, oldest first)."""
+        with self.lock:
+            start, end = self.imported, self.written
+            if end - start > self.capacity:
+                self.dropped += end - start - self.capacity
+                logger.warning(f"Check log overran {end - start - self.capacity} records before import")
+                start = end - self.capacity
+            return end, [
+                RECORD.unpack_from(self.map, HEADER.size + (index % self.capacity) * RECORD.size)
+                for index in range(start, end)
+            ]
+
+    def mark_imported(self, index):
+        with self.lock:
+            self.imported = index
+            COUNTER.pack_into(self.map, IMPORTED_OFFSET, index)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "written": self.written,
+                "backlog": self.written - self.imported,
+                "dropped": self.dropped,
+            }
+
+    def close(self):
+        with self.lock:
+            self.map.flush()
+            self.map.close()
+            self.file.close()
+
+
+def import_rows(records, floor_plans, check_prefix="speed"):
+    """availability_history rows for check log records."""
+    rows = []
+    for timestamp, sequence, plan_id, state, latency_ms in records:
+        recorded_at = datetime.fromtimestamp(timestamp)
+        rows.append((
+            recorded_at.isoformat(),
+            f"{recorded_at.strftime('%Y%m%d%H%M%S')}-{check_prefix}{sequence}",
+            floor_plans.get(str(plan_id), str(plan_id)),
+            "Unknown" if state == UNKNOWN else None,
+            1 if state == AVAILABLE else 0,
+            round(latency_ms, 1),
+        ))
+    return rows
+
+
+class CheckLogImporter:
+    """Bulk-import new check log records into availability_history in the background."""
+
+    def __init__(self, log, conn, floor_plans, import_interval=30):
+        self.log = log
+        self.conn = conn
+        self.floor_plans = floor_plans  # floor plan ID -> apartment type
+        self.import_interval = import_interval
+        self.imports = 0
+        self.last_import_seconds = None
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="check-log-import", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def run(self):
+        while not self.stopping.wait(self.import_interval):
+            self.import_pending()
+
+    def import_pending(self):
+        """Import every pending record in one transaction. Returns the number of rows imported."""
+        end, records = self.log.pending()
+        if not records:
+            return 0
+        started = time.perf_counter()
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO availability_history "
+                    "(timestamp, check_id, apartment_type, button_text, available, latency_ms) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    import_rows(records, self.floor_plans)
+                )
+        except Exception as e:
+            logger.error(f"Error importing check log: {e}")
+            return 0
+        self.log.mark_imported(end)
+        self.imports += 1
+        self.last_import_seconds = time.perf_counter() - started
+        logger.info(f"Imported {len(records)} check log records in {self.last_import_seconds * 1000:.0f}ms")
+        return len(records)
+
+    def stop(self):
+        """Stop the background imports and import what is left."""
+        self.stopping.set()
+        if self.thread.is_alive():
+            self.thread.join(timeout=10)
+        self.import_pending()
@@ -0,0 +1,341 @@
+"""
+Multi-node cluster mode for OurCampus Apartment Monitor.
+
+Nodes coordinate through a shared SQLite database (e.g. on a shared volume):
+
+- Every node heartbeats into cluster_nodes. Live nodes are ranked by node ID
+  and each one only checks the schedule slots whose index matches its rank,
+  so together they split the check schedule instead of all hitting the site.
+  The slot length is the one the leader publishes in cluster_leader, so all
+  nodes cut time into the same slots; randomisation only moves a check
+  within its node's own slot.
+- One node holds a short lease in cluster_leader and is the only one that
+  sends alerts (and answers Telegram commands). When its heartbeat stops, the
+  lease runs out and another node takes over within a few seconds.
+- Check results from all nodes are applied to one shared state under a write
+  lock, in sample order, so each transition produces exactly one row in
+  cluster_alerts, which the leader delivers.
+
+SQLite's rollback journal is used rather than WAL, which does not work on
+network filesystems. Node clocks are assumed to be NTP-synchronised.
+"""
+
+import json
+import logging
+import math
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+from collections import deque
+
+import html_extract
+
+logger = logging.getLogger(__name__)
+
+
+def default_node_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def connect(path):
+    # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+    conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=DELETE")
+    return conn
+
+
+def init_cluster_tables(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS cluster_nodes (
+        node_id TEXT PRIMARY KEY,
+        hostname TEXT,
+        started_at REAL,
+        heartbeat_at REAL,
+        checks INTEGER,
+        checks_per_minute REAL,
+        lag REAL
+    )
+    ''')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS cluster_leader (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        node_id TEXT,
+        lease_expires REAL,
+        slot_seconds REAL
+    )
+    ''')
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(cluster_leader)")]
+    if "slot_seconds" not in columns:
+        conn.execute("ALTER TABLE cluster_leader ADD COLUMN slot_seconds REAL")
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS cluster_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        notified TEXT,
+        observed_at REAL
+    )
+    ''')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS cluster_alerts (
+        correlation_id TEXT PRIMARY KEY,
+        kind TEXT,
+        apartments TEXT,
+        detected_by TEXT,
+        check_id TEXT,
+        check_started_at REAL,
+        checked_at REAL,
+        decided_at REAL,
+        sent_by TEXT,
+        sent_at REAL,
+        delivered INTEGER
+    )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_cluster_alerts_pending ON cluster_alerts (sent_at, decided_at)")
+
+
+def read_status(conn, lease_seconds):
+    """Cluster membership, leader and throughput, for status pages."""
+    now = time.time()
+    leader = conn.execute("SELECT node_id, lease_expires FROM cluster_leader WHERE id = 1").fetchone()
+    nodes = []
+    for node_id, hostname, started_at, heartbeat_at, checks, checks_per_minute, lag in conn.execute(
+            "SELECT * FROM cluster_nodes ORDER BY node_id"):
+        nodes.append({
+            "node_id": node_id,
+            "hostname": hostname,
+            "live": now - heartbeat_at <= lease_seconds,
+            "heartbeat_age_seconds": now - heartbeat_at,
+            "checks": checks,
+            "checks_per_minute": checks_per_minute,
+            "lag_seconds": lag,
+            "uptime_seconds": now - started_at,
+        })
+    live = [node for node in nodes if node["live"]]
+    return {
+        "leader": leader[0] if leader and leader[1] >= now else None,
+        "live_nodes": len(live),
+        "combined_checks_per_minute": sum(node["checks_per_minute"] or 0 for node in live),
+        "max_lag_seconds": max((node["lag_seconds"] or 0 for node in live), default=0),
+        "nodes": nodes,
+    }
+
+
+class ClusterNode:
+    """This process's membership in the cluster."""
+
+    def __init__(self, path, send_alert, node_id=None, heartbeat_interval=1.0, lease_seconds=5.0,
+                 alert_poll_interval=0.5):
+        self.path = path
+        self.send_alert = send_alert
+        self.node_id = node_id or default_node_id()
+        self.heartbeat_interval = heartbeat_interval
+        self.lease_seconds = lease_seconds
+        self.alert_poll_interval = alert_poll_interval
+
+        self.conn = connect(path)
+        self.lock = threading.Lock()  # one connection, shared by the loop and the background threads
+        with self.lock:
+            init_cluster_tables(self.conn)
+
+        self.started_at = time.time()
+        self.is_leader = False
+        self.rank = 0
+        self.size = 1
+        self.checks = 0
+        self.check_times = deque()
+        self.lag = 0.0
+        self.proposed_slot_seconds = None  # this node's slot length, published while it leads
+        self.slot_seconds = None  # the slot length published by the leader
+        self.alert_ready = threading.Event()
+        self.stopping = threading.Event()
+        self.threads = []
+
+    def start(self):
+        self.heartbeat()
+        for target, name in ((self._heartbeat_loop, "cluster-heartbeat"), (self._alert_loop, "cluster-alerts")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        logger.info(f"Cluster node {self.node_id} joined as {self.rank + 1}/{self.size}"
+                    f"{' (leader)' if self.is_leader else ''}")
+
+    def stop(self):
+        """Leave the cluster and hand leadership over immediately."""
+        self.stopping.set()
+        self.alert_ready.set()
+        for thread in self.threads:
+            thread.join(timeout=5)
+        with self.lock:
+            self.conn.execute("UPDATE cluster_leader SET lease_expires = 0 WHERE node_id = ?", (self.node_id,))
+            self.conn.execute("UPDATE cluster_nodes SET heartbeat_at = 0 WHERE node_id = ?", (self.node_id,))
+        self.conn.close()
+
+    def _heartbeat_loop(self):
+        while not self.stopping.wait(self.heartbeat_interval):
+            try:
+                self.heartbeat()
+            except sqlite3.Error as e:
+                logger.error(f"Cluster heartbeat failed: {e}")
+
+    def heartbeat(self):
+        """Refresh this node's row, renew or take the leader lease, and recompute rank."""
+        now = time.time()
+        while self.check_times and now - self.check_times[0] > 60:
+            self.check_times.popleft()
+
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute(
+                    "INSERT INTO cluster_nodes VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (node_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at, "
+                    "checks = excluded.checks, checks_per_minute = excluded.checks_per_minute, lag = excluded.lag",
+                    (self.node_id, socket.gethostname(), self.started_at, now, self.checks,
+                     len(self.check_times), self.lag)
+                )
+                self.conn.execute("INSERT OR IGNORE INTO cluster_leader (id, lease_expires) VALUES (1, 0)")
+                cursor = self.conn.execute(
+                    "UPDATE cluster_leader SET node_id = ?, lease_expires = ?, "
+                    "slot_seconds = COALESCE(?, slot_seconds) "
+                    "WHERE id = 1 AND (node_id = ? OR lease_expires < ?)",
+                    (self.node_id, now + self.lease_seconds, self.proposed_slot_seconds, self.node_id, now)
+                )
+                leader = cursor.rowcount == 1
+                slot_seconds = self.conn.execute("SELECT slot_seconds FROM cluster_leader WHERE id = 1").fetchone()[0]
+                live = [row[0] for row in self.conn.execute(
+                    "SELECT node_id FROM cluster_nodes WHERE heartbeat_at >= ? ORDER BY node_id",
+                    (now - self.lease_seconds,)
+                )]
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+        if leader != self.is_leader:
+            logger.info(f"Cluster node {self.node_id} {'became' if leader else 'is no longer'} the leader")
+            if leader:
+                self.alert_ready.set()  # deliver anything the previous leader left behind
+        self.is_leader = leader
+        self.slot_seconds = slot_seconds
+        self.size = max(1, len(live))
+        self.rank = live.index(self.node_id) if self.node_id in live else 0
+
+    def seconds_until_my_slot(self, slot_seconds, jitter=0.0, now=None):
+        """Seconds until a check in the next schedule slot owned by this node.
+
+        slot_seconds is this node's unrandomised check interval; it is published
+        while this node leads, and the leader's value is used by every node
+        (this node's own until one is known). Time is divided into slots of that
+        length; slot k belongs to the node whose rank is k mod (number of live
+        nodes). The check falls up to jitter (a fraction of the slot) into the slot.
+        """
+        now = now or time.time()
+        self.proposed_slot_seconds = slot_seconds
+        interval = self.slot_seconds or slot_seconds
+        slot = math.floor(now / interval) + 1
+        while slot % self.size != self.rank:
+            slot += 1
+        return (slot + random.uniform(0, jitter)) * interval - now
+
+    def record_check(self, checked_at, lag):
+        self.checks += 1
+        self.check_times.append(checked_at)
+        self.lag = lag
+
+    def report(self, check_id, check_started_at, checked_at, available_apartments, alert_id):
+        """Apply a check result to the shared state. Returns (alert kind, apartments) of the alert created,
+        (None, []) if none.
+
+        Mirrors the single-node decision: new apartments raise an "available"
+        alert, and an empty result after an alert raises a "gone" alert.
+        Results older than the latest applied one are ignored.
+        """
+        current = set(available_apartments)
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute("SELECT notified, observed_at FROM cluster_state WHERE id = 1").fetchone()
+                if row and check_started_at < row[1]:
+                    self.conn.execute("COMMIT")
+                    return None, []
+
+                notified = set(json.loads(row[0])) if row else set()
+                kind, apartments = None, []
+                if current:
+                    # Compared by apartment type, so nodes on different check engines agree
+                    notified_types = {html_extract.apartment_type(apt) for apt in notified}
+                    new_available = {apt for apt in current if html_extract.apartment_type(apt) not in notified_types}
+                    if new_available:
+                        kind, apartments = "available", sorted(new_available)
+                        notified = current
+                elif notified:
+                    # The gone alert goes to the recipients of the apartments that were announced
+                    kind, apartments, notified = "gone", sorted(notified), set()
+
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO cluster_state VALUES (1, ?, ?)",
+                    (json.dumps(sorted(notified)), check_started_at)
+                )
+                if kind:
+                    self.conn.execute(
+                        "INSERT INTO cluster_alerts VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL, NULL, NULL)",
+                        (alert_id, kind, json.dumps(apartments), self.node_id, check_id,
+                         check_started_at, checked_at, time.time())
+                    )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+        if kind:
+            logger.info(f"Cluster: {kind} transition recorded by {self.node_id}: {apartments}")
+            self.alert_ready.set()
+        return kind, apartments
+
+    def _alert_loop(self):
+        while not self.stopping.is_set():
+            self.alert_ready.wait(self.alert_poll_interval)
+            self.alert_ready.clear()
+            if self.is_leader and not self.stopping.is_set():
+                try:
+                    self.deliver_pending()
+                except sqlite3.Error as e:
+                    logger.error(f"Cluster alert delivery failed: {e}")
+
+    def deliver_pending(self):
+        """Send every undelivered alert (leader only). Each alert is claimed before it is sent."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT correlation_id, kind, apartments, check_id, check_started_at, checked_at, decided_at "
+                "FROM cluster_alerts WHERE sent_at IS NULL ORDER BY decided_at"
+            ).fetchall()
+
+        for correlation_id, kind, apartments, check_id, check_started_at, checked_at, decided_at in rows:
+            with self.lock:
+                cursor = self.conn.execute(
+                    "UPDATE cluster_alerts SET sent_by = ?, sent_at = ? WHERE correlation_id = ? AND sent_at IS NULL",
+                    (self.node_id, time.time(), correlation_id)
+                )
+            if cursor.rowcount != 1:
+                continue  # another leader got there first
+
+            delivered = self.send_alert({
+                "correlation_id": correlation_id,
+                "kind": kind,
+                "apartments": json.loads(apartments),
+                "check_id": check_id,
+                "check_started_at": check_started_at,
+                "checked_at": checked_at,
+                "decided_at": decided_at,
+            })
+            with self.lock:
+                self.conn.execute(
+                    "UPDATE cluster_alerts SET delivered = ? WHERE correlation_id = ?",
+                    (1 if delivered else 0, correlation_id)
+                )
+
+    def status(self):
+        with self.lock:
+            return read_status(self.conn, self.lease_seconds)
@@ -0,0 +1,99 @@
+"""
+Drift-free deadline scheduling for the OurCampus check loops.
+
+Sleeping a fixed interval after each check makes the real period the interval
+plus the check time plus whatever else the loop does, and it drifts. The
+DeadlineScheduler instead aims every tick at an absolute target time: time
+already spent is subtracted from the wait, lateness is recorded for each
+tick, and when a check overruns the missed ticks are coalesced into a single
+immediate tick instead of building a backlog.
+"""
+
+import time
+from collections import deque
+
+from latency import percentile
+
+
+class DeadlineScheduler:
+    """Schedule loop ticks at absolute deadlines on the monotonic clock."""
+
+    def __init__(self, history=500, clock=time.monotonic, sleep=time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self.deadline = None  # deadline of the current (or next) tick
+        self.ticks = 0
+        self.skipped = 0
+        self.lateness = deque(maxlen=history)
+
+    def begin_tick(self):
+        """Mark the start of a tick and record how late it started. Returns the lateness in seconds."""
+        now = self.clock()
+        if self.deadline is None:
+            self.deadline = now
+        late = max(0.0, now - self.deadline)
+        self.lateness.append(late)
+        self.ticks += 1
+        return late
+
+    def reset(self):
+        """Forget the current deadline; the next tick starts a new schedule."""
+        self.deadline = None
+
+    def schedule(self, interval):
+        """Set the next deadline interval seconds after the current one.
+
+        If that deadline has already passed, whole missed ticks are skipped and
+        the latest one is kept, so the next tick runs immediately and the
+        schedule stays on its grid. Returns the seconds until the next tick.
+        """
+        now = self.clock()
+        deadline = self.deadline + interval
+        if now > deadline and interval > 0:
+            missed = int((now - deadline) // interval)
+            deadline += missed * interval
+            self.skipped += missed
+        self.deadline = deadline
+        return max(0.0, deadline - now)
+
+    def schedule_in(self, delay):
+        """Set the next deadline delay seconds from now, e.g. a slot computed elsewhere. Returns delay."""
+        self.deadline = self.clock() + delay
+        return delay
+
+    def wait(self, idle=None, idle_every=5, idle_guard=0):
+        """Sleep until the next deadline.
+
+        idle() is called roughly every idle_every seconds while waiting, but
+        only when at least idle_guard seconds remain so that slow idle work
+        (e.g. Telegram polling) cannot push the tick past its deadline.
+        """
+        last_idle = self.clock()
+        while True:
+            now = self.clock()
+            remaining = self.deadline - now
+            if remaining <= 0:
+                return
+            until_idle = last_idle + idle_every - now
+            if idle is None or remaining <= idle_guard or remaining <= until_idle:
+                self.sleep(remaining)
+                return
+            if until_idle <= 0:
+                idle()
+                last_idle = self.clock()
+                continue
+            self.sleep(until_idle)
+
+    def seconds_until_next(self):
+        return max(0.0, self.deadline - self.clock())
+
+    def stats(self):
+        """Lateness summary over recent ticks, in seconds."""
+        recent = list(self.lateness)
+        return {
+            "ticks": self.ticks,
+            "skipped_ticks": self.skipped,
+            "lateness_mean": sum(recent) / len(recent) if recent else 0.0,
+            "lateness_p95": percentile(recent, 95) or 0.0,
+            "lateness_max": max(recent) if recent else 0.0,
+        }
@@ -45,6 +45,16 @@ mkdir -p $APP_DIR/logs
 echo "Copying application files..."
 cp apartment_monitor_server.py $APP_DIR/
 cp health_check.py $APP_DIR/
+cp latency.py $APP_DIR/
+cp adaptive_schedule.py $APP_DIR/
+cp priority_windows.py priority_windows.json $APP_DIR/
+cp deadline_scheduler.py $APP_DIR/
+cp worker_pool.py rate_limit.py $APP_DIR/
+cp cluster.py $APP_DIR/
+cp alert_state.py $APP_DIR/
+cp driver_cache.py $APP_DIR/
+cp log_setup.py $APP_DIR/
+cp html_extract.py snapshots.py page_fingerprint.py resident_page.py selector_cache.py engine_controller.py inventory.py booking_browser.py recovery.py hang_watchdog.py aimd_interval.py subscribers.py check_log.py evidence.py $APP_DIR/
 cp requirements.txt $APP_DIR/
 cp .env $APP_DIR/
 
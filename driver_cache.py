@@ -0,0 +1,122 @@
+"""
+On-disk cache of the resolved ChromeDriver binary for OurCampus Apartment Monitor.
+
+Resolving the driver with webdriver_manager touches the filesystem and may hit
+the network, and the monitor restarts its browser every few checks. The
+resolved driver path is cached in a JSON file together with the Chrome binary
+and version it was resolved for. A cached entry is re-validated with two
+stat() calls: it is used as long as the driver binary is unchanged and Chrome
+has not been upgraded since.
+"""
+
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+CHROME_COMMANDS = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"]
+CHROME_PATHS = {
+    "windows": [
+        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    ],
+    "darwin": ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"],
+}
+
+
+def find_chrome():
+    """Path of the installed Chrome/Chromium binary, or None."""
+    for command in CHROME_COMMANDS:
+        path = shutil.which(command)
+        if path:
+            return os.path.realpath(path)
+    for path in CHROME_PATHS.get(platform.system().lower(), []):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def chrome_version(chrome_path):
+    """Version string reported by the Chrome binary (only run when the cache is refreshed)."""
+    if not chrome_path:
+        return None
+    try:
+        output = subprocess.run([chrome_path, "--version"], capture_output=True, text=True, timeout=10).stdout
+        return output.strip().split()[-1] if output.strip() else None
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"Could not read Chrome version: {e}")
+        return None
+
+
+def file_signature(path):
+    """(size, mtime) of a file, or None if it is missing."""
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return [stat.st_size, stat.st_mtime]
+
+
+def load_cache(cache_path):
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_cache(cache_path, entry):
+    # Write to a temporary file first so a crash never leaves a half-written cache
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not write driver cache {cache_path}: {e}")
+
+
+def is_valid(entry, chrome_path):
+    """Cheap check that a cached entry still matches the installed driver and Chrome."""
+    return (
+        entry.get("chrome_path") == chrome_path
+        and file_signature(entry.get("driver_path")) == entry.get("driver_signature")
+        and file_signature(chrome_path) == entry.get("chrome_signature")
+    )
+
+
+def resolve(cache_path, install, fallback_paths=()):
+    """Return (driver_path, cache_hit).
+
+    install() is only called when the cache is missing or stale; if it fails,
+    the first existing fallback path is used. driver_path is None if nothing
+    was found, in which case Selenium resolves the driver itself.
+    """
+    chrome_path = find_chrome()
+    entry = load_cache(cache_path)
+    if entry and is_valid(entry, chrome_path):
+        return entry["driver_path"], True
+
+    try:
+        driver_path = install()
+    except Exception as e:
+        logger.warning(f"Failed to use webdriver_manager: {e}. Trying common paths.")
+        driver_path = next((path for path in fallback_paths if os.path.exists(path)), None)
+
+    if driver_path:
+        entry = {
+            "driver_path": driver_path,
+            "driver_signature": file_signature(driver_path),
+            "chrome_path": chrome_path,
+            "chrome_signature": file_signature(chrome_path),
+            "chrome_version": chrome_version(chrome_path),
+            "resolved_at": datetime.now().isoformat(),
+        }
+        save_cache(cache_path, entry)
+        logger.info(f"Resolved ChromeDriver {driver_path} for Chrome {entry['chrome_version'] or 'unknown'}")
+    return driver_path, False
@@ -0,0 +1,224 @@
+"""
+Check engine failover for OurCampus Apartment Monitor.
+
+Keeps rolling success rate and latency for every configured check engine and
+routes each check to the fastest healthy one (lowest median latency; engines
+without samples yet are used in configured order). An engine that fails is
+demoted after demote_after consecutive failures, or when its rolling success
+rate drops below min_success_rate, and the check fails over to the next engine
+at once. Demoted and not yet measured engines get a canary check every
+probe_interval seconds; the caller runs probe() after it has acted on the
+check result, so a canary never delays a check or its alert. A demoted engine
+is promoted again after promote_after consecutive canary successes.
+
+Every change of the engine in use is passed to on_switch with its reason and
+stored in the engine_switches table.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from latency import percentile
+
+logger = logging.getLogger(__name__)
+
+
+def init_engine_switches_table(conn):
+    c = conn.cursor()
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS engine_switches (
+        timestamp TEXT,
+        from_engine TEXT,
+        to_engine TEXT,
+        reason TEXT
+    )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_engine_switches_timestamp ON engine_switches (timestamp)")
+    conn.commit()
+
+
+def record_switch(conn, from_engine, to_engine, reason):
+    if not conn:
+        return
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO engine_switches VALUES (?, ?, ?, ?)",
+                (datetime.now().isoformat(), from_engine, to_engine, reason)
+            )
+    except Exception as e:
+        logger.error(f"Error recording engine switch: {e}")
+
+
+def recent_switches(conn, limit=10):
+    c = conn.cursor()
+    c.execute("SELECT timestamp, from_engine, to_engine, reason FROM engine_switches "
+              "ORDER BY timestamp DESC LIMIT ?", (limit,))
+    return [
+        {"timestamp": row[0], "from": row[1], "to": row[2], "reason": row[3]}
+        for row in c.fetchall()
+    ]
+
+
+class EngineStats:
+    """Rolling outcomes of one engine."""
+
+    def __init__(self, window):
+        self.outcomes = deque(maxlen=window)  # True/False per check
+        self.latencies = deque(maxlen=window)  # seconds, successful checks only
+        self.consecutive_failures = 0
+        self.canary_successes = 0
+        self.demoted = False
+        self.last_probe = 0
+        self.last_error = None
+
+    @property
+    def success_rate(self):
+        return sum(self.outcomes) / len(self.outcomes) if self.outcomes else None
+
+    @property
+    def median_latency(self):
+        return percentile(list(self.latencies), 50) if self.latencies else None
+
+
+class EngineController:
+    """Route checks to the fastest healthy engine, failing over and probing demoted engines."""
+
+    def __init__(self, engines, on_switch=None, window=20, min_success_rate=0.8, demote_after=3,
+                 probe_interval=60, promote_after=3):
+        self.engines = list(engines)  # preference order while there are no latency samples
+        self.on_switch = on_switch
+        self.window = window
+        self.min_success_rate = min_success_rate
+        self.demote_after = demote_after
+        self.probe_interval = probe_interval
+        self.promote_after = promote_after
+        self.stats_by_engine = {name: EngineStats(window) for name in self.engines}
+        self.current = None
+        self.pending_reason = None  # why the next switch happens
+        self.lock = threading.Lock()
+
+    def ranking(self):
+        """Healthy engines, fastest first; demoted engines last as a final resort."""
+        def key(name):
+            stats = self.stats_by_engine[name]
+            latency = stats.median_latency
+            return (stats.demoted, latency is None, latency or 0, self.engines.index(name))
+        return sorted(self.engines, key=key)
+
+    def run(self, runners):
+        """Run one check. runners maps engine name -> callable returning the available apartments.
+
+        Returns (engine, result). Raises the last error if every engine fails.
+        """
+        last_error = None
+        failed = None
+        for name in self.ranking():
+            if name not in runners:
+                continue
+            started = time.perf_counter()
+            try:
+                result = runners[name]()
+            except Exception as e:
+                self.record(name, False, error=e)
+                last_error = e
+                failed = failed or name
+                logger.warning(f"Check engine {name} failed: {e}")
+                continue
+            self.record(name, True, latency=time.perf_counter() - started)
+            self.use(name, f"{failed} failed ({type(last_error).__name__})" if failed else None)
+            return name, result
+        raise last_error or RuntimeError("No check engine available")
+
+    def probe(self, runners, exclude=None):
+        """Canary check of one demoted or unmeasured engine, if its probe is due. The result is discarded.
+
+        Call after the check result has been handled; exclude is the engine that just ran it.
+        """
+        now = time.monotonic()
+        for name in self.engines:
+            stats = self.stats_by_engine[name]
+            if name == exclude or name not in runners or now - stats.last_probe < self.probe_interval:
+                continue
+            if not stats.demoted and stats.latencies:
+                continue
+            stats.last_probe = now
+            started = time.perf_counter()
+            try:
+                runners[name]()
+            except Exception as e:
+                self.record(name, False, error=e, canary=True)
+                logger.info(f"Canary check of {name} failed: {e}")
+            else:
+                self.record(name, True, latency=time.perf_counter() - started, canary=True)
+            return
+
+    def record(self, name, ok, latency=None, error=None, canary=False):
+        with self.lock:
+            stats = self.stats_by_engine[name]
+            stats.outcomes.append(ok)
+            if ok:
+                stats.latencies.append(latency)
+                stats.consecutive_failures = 0
+                if stats.demoted and canary:
+                    stats.canary_successes += 1
+                    if stats.canary_successes >= self.promote_after:
+                        stats.demoted = False
+                        stats.outcomes.clear()  # start the success rate afresh
+                        stats.outcomes.append(True)
+                        self.pending_reason = f"{name} promoted after {stats.canary_successes} canary successes"
+                        logger.info(f"Check engine {name} promoted after recovering")
+                return
+
+            stats.consecutive_failures += 1
+            stats.canary_successes = 0
+            stats.last_error = f"{type(error).__name__}: {error}" if error else None
+            if stats.demoted:
+                return
+            rate = stats.success_rate
+            if stats.consecutive_failures >= self.demote_after:
+                reason = f"{stats.consecutive_failures} consecutive failures"
+            elif len(stats.outcomes) >= self.window // 2 and rate < self.min_success_rate:
+                reason = f"success rate {rate:.0%}"
+            else:
+                return
+            stats.demoted = True
+            stats.last_probe = time.monotonic()
+            self.pending_reason = f"{name} demoted: {reason} (last error: {stats.last_error})"
+            logger.warning(f"Check engine {name} demoted: {reason}")
+
+    def use(self, name, failover_reason=None):
+        with self.lock:
+            previous = self.current
+            if name == previous:
+                self.pending_reason = None  # the demotion or promotion did not change the engine in use
+                return
+            self.current = name
+            reason = self.pending_reason or failover_reason
+            if reason is None and previous is not None and not self.stats_by_engine[previous].demoted:
+                latency = self.stats_by_engine[name].median_latency
+                previous_latency = self.stats_by_engine[previous].median_latency
+                reason = f"{name} faster (p50 {latency * 1000:.0f}ms vs {previous_latency * 1000:.0f}ms)"
+            elif reason is None:
+                reason = "first check" if previous is None else f"{previous} failed"
+            self.pending_reason = None
+        logger.info(f"Check engine: {previous or '-'} -> {name} ({reason})")
+        if self.on_switch:
+            self.on_switch(previous, name, reason)
+
+    def stats(self):
+        """Per-engine health, for runtime metrics."""
+        with self.lock:
+            return {
+                name: {
+                    "active": 1 if name == self.current else 0,
+                    "healthy": 0 if stats.demoted else 1,
+                    "success_rate": stats.success_rate,
+                    "p50_ms": stats.median_latency * 1000 if stats.latencies else None,
+                    "checks": len(stats.outcomes),
+                }
+                for name, stats in self.stats_by_engine.items()
+            }
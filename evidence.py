@@ -0,0 +1,182 @@
+"""
+Detection evidence for OurCampus Apartment Monitor.
+
+An alert only records the button text it was raised on, which makes false
+positives (an "Unknown" button, an error page) hard to diagnose afterwards.
+On every detected transition, after the alert has been dispatched, the
+FP_Detail_<id> pane of each newly available floor plan is captured from the
+browser: its outerHTML and a screenshot of the pane (of the whole page if the
+pane cannot be shown). Only these WebDriver calls run on the check loop; the
+captures are compressed and written by a background thread into one
+directory per transition, and the oldest directories are deleted when the
+total exceeds max_bytes.
+
+Engines that do not leave the checked page loaded in the browser (the HTTP
+engine, or the resident page between reloads) hand over the container HTML
+they parsed instead; it is stored as is, without WebDriver calls or
+screenshots, since the browser would show a different page.
+"""
+
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# arguments: pane IDs; returns pane ID -> outerHTML (null if missing), plus the page title and URL
+PANES_SCRIPT = """
+var panes = {};
+for (var i = 0; i < arguments[0].length; i++) {
+    var pane = document.getElementById(arguments[0][i]);
+    panes[arguments[0][i]] = pane ? pane.outerHTML : null;
+}
+return {panes: panes, title: document.title, url: location.href};
+"""
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class EvidenceStore:
+    """Capture FP_Detail panes on the check loop, compress and store them off it."""
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024, screenshots=True, queue_size=20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.screenshots = screenshots
+        os.makedirs(directory, exist_ok=True)
+        self.entries = sorted(
+            name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name))
+        )
+        self.sizes = {name: directory_size(os.path.join(directory, name)) for name in self.entries}
+        self.counts = {"captures": 0, "dropped": 0, "failed": 0, "deleted": 0}
+        self.last_grab_ms = None
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(target=self._run, name="evidence", daemon=True)
+        self.thread.start()
+
+    def capture(self, driver, plan_ids, metadata, show=None, html=None):
+        """Grab the panes of plan_ids from the driver and queue them for writing.
+
+        show(plan_id) may bring a pane into view (e.g. click its tab) before its screenshot.
+        With html (the container HTML the detecting engine parsed), that is stored instead and the
+        driver is not used. Never raises: evidence must not break the check loop.
+        """
+        if html is not None:
+            self.enqueue(dict(metadata, source="engine_html"), {}, {}, html)
+            return
+        started = time.perf_counter()
+        pane_ids = [f"FP_Detail_{plan_id}" for plan_id in plan_ids]
+        try:
+            page = driver.execute_script(PANES_SCRIPT, pane_ids) or {}
+            screenshots = {}
+            if self.screenshots:
+                for plan_id, pane_id in zip(plan_ids, pane_ids):
+                    screenshots[pane_id] = self.screenshot(driver, plan_id, pane_id, show)
+        except Exception as e:
+            with self.lock:
+                self.counts["failed"] += 1
+            logger.warning(f"Evidence capture failed: {e}")
+            return
+        grab_ms = (time.perf_counter() - started) * 1000
+        metadata = dict(metadata, source="driver", title=page.get("title"), page_url=page.get("url"),
+                        grab_ms=round(grab_ms, 1))
+        with self.lock:
+            self.last_grab_ms = grab_ms
+        self.enqueue(metadata, page.get("panes") or {}, screenshots)
+
+    def enqueue(self, metadata, panes, screenshots, html=None):
+        try:
+            self.queue.put_nowait((time.time(), metadata, panes, screenshots, html))
+        except queue.Full:
+            with self.lock:
+                self.counts["dropped"] += 1
+            logger.warning("Evidence writer is behind - dropping capture")
+
+    def screenshot(self, driver, plan_id, pane_id, show):
+        """PNG of the pane, or of the whole page if the pane cannot be shown."""
+        try:
+            if show:
+                show(plan_id)
+            return driver.find_element("id", pane_id).screenshot_as_png
+        except Exception:
+            return driver.get_screenshot_as_png()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            try:
+                self._store(*item)
+                self._enforce_limit()
+            except OSError as e:
+                with self.lock:
+                    self.counts["failed"] += 1
+                logger.error(f"Error storing evidence: {e}")
+
+    def _store(self, captured_at, metadata, panes, screenshots, html):
+        stamp = datetime.fromtimestamp(captured_at).strftime("%Y%m%d-%H%M%S-%f")
+        name = f"{stamp}-{(metadata.get('correlation_id') or 'none')[:12]}"
+        path = os.path.join(self.directory, name)
+        os.makedirs(path, exist_ok=True)
+        for pane_id, html in panes.items():
+            if html is not None:
+                with gzip.open(os.path.join(path, f"{pane_id}.html.gz"), "wt", encoding="utf-8") as f:
+                    f.write(html)
+        if html is not None:
+            if isinstance(html, bytes):
+                html = html.decode("utf-8", errors="replace")
+            with gzip.open(os.path.join(path, "floorPlanDataContainer.html.gz"), "wt", encoding="utf-8") as f:
+                f.write(html)
+        for pane_id, png in screenshots.items():
+            with open(os.path.join(path, f"{pane_id}.png"), "wb") as f:
+                f.write(png)
+        metadata = dict(metadata, captured_at=datetime.fromtimestamp(captured_at).isoformat(),
+                        missing_panes=[pane_id for pane_id, html in panes.items() if html is None])
+        with open(os.path.join(path, "evidence.json"), "w", encoding="utf-8") as f:
+            json.dump(metadata, f, indent=2)
+        size = directory_size(path)
+        with self.lock:
+            self.entries.append(name)
+            self.sizes[name] = size
+            self.counts["captures"] += 1
+        logger.info(f"Stored detection evidence {name} ({size} bytes)")
+
+    def _enforce_limit(self):
+        """Delete the oldest captures while the total is above max_bytes (the newest one is always kept)."""
+        while True:
+            with self.lock:
+                if len(self.entries) <= 1 or sum(self.sizes.values()) <= self.max_bytes:
+                    return
+                name = self.entries.pop(0)
+                self.sizes.pop(name, None)
+                self.counts["deleted"] += 1
+            shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def stats(self):
+        with self.lock:
+            return dict(
+                self.counts,
+                stored_bytes=sum(self.sizes.values()),
+                last_grab_ms=self.last_grab_ms,
+            )
+
+    def stop(self):
+        self.queue.put(None)
+        self.thread.join(timeout=10)
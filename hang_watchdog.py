@@ -0,0 +1,177 @@
+"""
+Hang watchdog for OurCampus Apartment Monitor.
+
+The page load timeout does not cover a hung find_element, execute_script or a
+chromedriver socket that never answers, and a stuck WebDriver call would block
+the check loop forever while the process still looks alive to supervisor.
+
+The check loop runs each phase (a check, a browser restart) inside
+Watchdog.phase(name, seconds, driver). A background thread watches the
+deadline of the current phase; when it passes, the stacks of all threads are
+dumped with faulthandler and the driver's process tree (chromedriver and its
+Chrome processes) is killed. A phase that starts a browser has no driver to
+kill yet: phases run with new_processes=True note the child processes that
+exist when they start, and when the driver's tree is already gone, the child
+processes started during the phase are killed instead. The blocked call then
+fails on its closed socket, and the phase raises StallError so the loop
+continues with a fresh driver.
+"""
+
+import faulthandler
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class StallError(Exception):
+    """A phase ran past its deadline and its driver was killed."""
+
+
+def driver_pid(driver):
+    """PID of the chromedriver process behind a Selenium driver, or None."""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return getattr(process, "pid", None)
+
+
+def kill_process_tree(pid, timeout=5):
+    """Kill a process and all its descendants. Returns the number of processes killed."""
+    import psutil  # Deferred: only needed once a phase stalls
+
+    try:
+        parent = psutil.Process(pid)
+        processes = parent.children(recursive=True) + [parent]
+    except psutil.NoSuchProcess:
+        return 0
+    killed = []
+    for process in processes:
+        try:
+            process.kill()
+            killed.append(process)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    psutil.wait_procs(killed, timeout=timeout)
+    return len(killed)
+
+
+def child_pids():
+    """PIDs of the child processes of this process."""
+    import psutil  # Deferred: only needed by phases that start processes
+
+    return {process.pid for process in psutil.Process().children()}
+
+
+def kill_new_children(existing, timeout=5):
+    """Kill the child processes of this process that are not in existing, with their trees."""
+    return sum(kill_process_tree(pid, timeout) for pid in child_pids() - existing)
+
+
+def dump_stacks(path, reason):
+    """Write the stacks of all threads to path (stderr without a path)."""
+    if not path:
+        faulthandler.dump_traceback(all_threads=True)
+        return
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(f"\n--- {datetime.now().isoformat()} {reason} ---\n")
+            f.flush()
+            faulthandler.dump_traceback(file=f, all_threads=True)
+    except OSError as e:
+        logger.error(f"Could not write stack dump to {path}: {e}")
+        faulthandler.dump_traceback(all_threads=True)
+
+
+class Watchdog:
+    """Wall-clock deadlines for the phases of one check loop."""
+
+    def __init__(self, dump_path=None, poll_interval=0.5):
+        self.dump_path = dump_path
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        self.current = None  # (name, deadline, seconds, driver, child PIDs at the start) of the running phase
+        self.stalled = False  # the running phase passed its deadline
+        self.stalls = {}  # phase -> stall count
+        self.killed_processes = 0
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    @contextmanager
+    def phase(self, name, seconds, driver=None, new_processes=False):
+        """Run the body under a deadline. Raises StallError if the deadline passed.
+
+        With new_processes, child processes started by the body (a new browser) are killed on a stall.
+        """
+        existing = child_pids() if new_processes else None
+        with self.lock:
+            self.current = (name, time.monotonic() + seconds, seconds, driver, existing)
+            self.stalled = False
+        try:
+            yield
+        except Exception as e:
+            if self.end():
+                raise StallError(f"{name} stalled for more than {seconds}s") from e
+            raise
+        except BaseException:
+            self.end()
+            raise
+        if self.end():
+            raise StallError(f"{name} stalled for more than {seconds}s")
+
+    def end(self):
+        """Clear the running phase. Returns whether it stalled."""
+        with self.lock:
+            stalled = self.stalled
+            self.current = None
+            self.stalled = False
+            return stalled
+
+    def run(self):
+        while not self.stop_event.wait(self.poll_interval):
+            with self.lock:
+                if self.current is None or self.stalled or time.monotonic() < self.current[1]:
+                    continue
+                name, _, seconds, driver, existing = self.current
+                self.stalled = True
+                self.stalls[name] = self.stalls.get(name, 0) + 1
+            self.handle_stall(name, seconds, driver, existing)
+
+    def handle_stall(self, name, seconds, driver, existing=None):
+        logger.error(f"Watchdog: {name} passed its {seconds}s deadline - dumping stacks and killing the browser")
+        dump_stacks(self.dump_path, f"{name} stalled for more than {seconds}s")
+        pid = driver_pid(driver)
+        if pid is None and existing is None:
+            return
+        try:
+            killed = kill_process_tree(pid) if pid is not None else 0
+            if not killed and existing is not None:
+                # The driver is already gone (or not created yet): a browser start is hanging
+                pid = None
+                killed = kill_new_children(existing)
+        except Exception as e:
+            logger.error(f"Watchdog could not kill the browser processes: {e}")
+            return
+        with self.lock:
+            self.killed_processes += killed
+        if pid is not None:
+            logger.warning(f"Watchdog killed {killed} browser processes (chromedriver pid {pid})")
+        else:
+            logger.warning(f"Watchdog killed {killed} processes started during {name}")
+
+    def stats(self):
+        with self.lock:
+            metrics = {f"stalls.{name}": count for name, count in self.stalls.items()}
+            metrics["stalls"] = sum(self.stalls.values())
+            metrics["killed_processes"] = self.killed_processes
+            return metrics
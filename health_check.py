@@ -19,6 +19,10 @@ import psutil
 import time
 from datetime import datetime
 import threading
+import latency
+import cluster
+import engine_controller
+import recovery
 
 # Configuration
 PORT = int(os.getenv("HEALTH_CHECK_PORT", 8080))
@@ -26,6 +30,8 @@ MONITOR_PROCESS_NAME = "watch_units.py"
 DB_DIR = os.getenv("DB_DIR", "data")
 DB_FILE = os.getenv("DB_FILE", "apartment_history.db")
 DATABASE_PATH = os.path.join(DB_DIR, DB_FILE)
+CLUSTER_DB_PATH = os.getenv("CLUSTER_DB_PATH", "")
+CLUSTER_LEASE_SECONDS = float(os.getenv("CLUSTER_LEASE_SECONDS", 5))
 
 # Global metrics
 last_metrics_update = 0
@@ -78,6 +84,38 @@ def get_database_metrics():
         c.execute("SELECT * FROM stats WHERE date = ?", (today,))
         today_stats = c.fetchone()
         
+        # Get detection-to-alert latency percentiles
+        try:
+            alert_latency = latency.latency_percentiles(conn)
+        except sqlite3.OperationalError:
+            alert_latency = {"count": 0}  # Table not created yet
+        
+        # Get the latest loop metrics published by the monitor
+        try:
+            c.execute("SELECT name, value FROM runtime_metrics")
+            runtime = dict(c.fetchall())
+        except sqlite3.OperationalError:
+            runtime = {}
+        
+        # Get the latest check engine switches
+        try:
+            engine_switches = engine_controller.recent_switches(conn)
+        except sqlite3.OperationalError:
+            engine_switches = []  # Table not created yet
+        
+        # Get recovery time percentiles over the latest failure incidents
+        try:
+            recovery_times = recovery.recovery_summary(conn)
+        except sqlite3.OperationalError:
+            recovery_times = {"count": 0}  # Table not created yet
+        
+        # Get the latest adaptive schedule profile
+        try:
+            c.execute("SELECT * FROM schedule_profile ORDER BY computed_at DESC LIMIT 1")
+            profile = c.fetchone()
+        except sqlite3.OperationalError:
+            profile = None
+        
         conn.close()
         
         return {
@@ -89,7 +127,17 @@ def get_database_metrics():
                 "checks": today_stats[1] if today_stats else 0,
                 "availabilities": today_stats[2] if today_stats else 0,
                 "errors": today_stats[3] if today_stats else 0
-            }
+            },
+            "alert_latency": alert_latency,
+            "runtime": runtime,
+            "engine_switches": engine_switches,
+            "recovery": recovery_times,
+            "schedule_profile": {
+                "computed_at": profile[0],
+                "transitions": profile[1],
+                "checks_per_day": profile[2],
+                "expected_delay_seconds": profile[3]
+            } if profile else None
         }
     except Exception as e:
         return {
@@ -97,6 +145,19 @@ def get_database_metrics():
             "error": str(e)
         }
 
+def get_cluster_metrics():
+    """Get membership, leader, combined throughput and per-node lag from the cluster store."""
+    if not CLUSTER_DB_PATH:
+        return {"enabled": False}
+    
+    try:
+        conn = sqlite3.connect(CLUSTER_DB_PATH, timeout=5)
+        status = cluster.read_status(conn, CLUSTER_LEASE_SECONDS)
+        conn.close()
+        return {"enabled": True, **status}
+    except sqlite3.Error as e:
+        return {"enabled": True, "error": str(e)}
+
 def update_metrics():
     """Update cached metrics."""
     global last_metrics_update, metrics_cache
@@ -120,11 +181,15 @@ def update_metrics():
         # Database metrics
         db_metrics = get_database_metrics()
         
+        # Cluster metrics
+        cluster_metrics = get_cluster_metrics()
+        
         # Combine all metrics
         metrics_cache = {
             "system": system_metrics,
             "monitor": monitor_status,
-            "database": db_metrics
+            "database": db_metrics,
+            "cluster": cluster_metrics
         }
         
         last_metrics_update = current_time
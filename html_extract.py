@@ -0,0 +1,160 @@
+"""
+Browser-free floor plan extraction for OurCampus Apartment Monitor.
+
+Parses floorPlanDataContainer HTML (or a whole floorplans.aspx page, e.g.
+driver.page_source or an HTTP response body) in a single pass. For every
+FP_Detail_<id> pane it collects the text of the availability-count div and of
+the first "btn" button, the same elements the Selenium checks read.
+
+Two backends give the same results: lxml with precompiled XPath expressions
+(used when lxml is installed) and the standard library HTMLParser.
+"""
+
+import re
+from html.parser import HTMLParser
+
+# Try to import lxml (but don't fail if it's not installed)
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:
+    etree = lxml_html = None
+
+# Floor plan ID -> apartment type, as used in the FP_Detail_<id> pane IDs
+FLOOR_PLANS = {
+    "1100004": "1 Person Apartment",
+    "1100005": "2 Person Apartment",
+}
+
+UNAVAILABLE_BUTTON_TEXTS = ("CONTACT US", "Contact Us")
+
+PANE_PREFIX = "FP_Detail_"
+
+# Compiled once; the same expressions the Selenium checks use, relative to each pane
+if etree is not None:
+    PANES_XPATH = etree.XPath("//div[starts-with(@id, 'FP_Detail_')]")
+    AVAILABILITY_XPATH = etree.XPath(".//div[@class='availability-count']")
+    BUTTON_XPATH = etree.XPath(".//button[contains(@class, 'btn')]")
+
+BACKEND = "lxml" if etree is not None else "stdlib"
+
+
+def is_available(button_text):
+    """A floor plan is available when its button says anything other than "CONTACT US"."""
+    return bool(button_text) and button_text not in UNAVAILABLE_BUTTON_TEXTS
+
+
+def apartment_type(entry):
+    """Apartment type of a check result entry ("1 Person Apartment - Button says: APPLY" -> "1 Person Apartment")."""
+    return entry.split(" - ")[0]
+
+
+def normalise_text(text):
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class FloorPlanParser(HTMLParser):
+    """Collect availability and button text per floor plan pane."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.plans = {}
+        self.pane = None  # floor plan ID of the pane being parsed
+        self.pane_depth = 0  # open <div>s inside the pane
+        self.field = None  # "availability_text" or "button_text" while capturing
+        self.field_depth = 0
+        self.text = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "div":
+            if self.pane is None:
+                element_id = attrs.get("id") or ""
+                if element_id.startswith(PANE_PREFIX):
+                    self.pane = element_id[len(PANE_PREFIX):]
+                    self.pane_depth = 0
+                    self.plans.setdefault(self.pane, {"availability_text": None, "button_text": None})
+            else:
+                self.pane_depth += 1
+                if self.field == "availability_text":
+                    self.field_depth += 1
+                elif (self.field is None and attrs.get("class") == "availability-count"
+                      and self.plans[self.pane]["availability_text"] is None):
+                    self.start_field("availability_text")
+        elif tag == "button" and self.pane is not None and self.field is None:
+            classes = attrs.get("class") or ""
+            if "btn" in classes and self.plans[self.pane]["button_text"] is None:
+                self.start_field("button_text")
+
+    def handle_endtag(self, tag):
+        if self.pane is None:
+            return
+        if tag == "button" and self.field == "button_text":
+            self.end_field()
+        elif tag == "div":
+            if self.field == "availability_text":
+                if self.field_depth == 0:
+                    self.end_field()
+                else:
+                    self.field_depth -= 1
+            if self.pane_depth == 0:
+                self.pane = None
+            else:
+                self.pane_depth -= 1
+
+    def handle_data(self, data):
+        if self.field:
+            self.text.append(data)
+
+    def start_field(self, field):
+        self.field = field
+        self.field_depth = 0
+        self.text = []
+
+    def end_field(self):
+        self.plans[self.pane][self.field] = normalise_text("".join(self.text))
+        self.field = None
+
+
+def extract_floor_plans_stdlib(html):
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+    parser = FloorPlanParser()
+    parser.feed(html)
+    parser.close()
+    return {FLOOR_PLANS[plan_id]: fields for plan_id, fields in parser.plans.items() if plan_id in FLOOR_PLANS}
+
+
+def extract_floor_plans_lxml(html):
+    if isinstance(html, str):
+        html = html.encode("utf-8")  # lets lxml accept documents with an XML encoding declaration
+    document = lxml_html.fromstring(html)
+    plans = {}
+    for pane in PANES_XPATH(document):
+        plan_id = pane.get("id")[len(PANE_PREFIX):]
+        if plan_id not in FLOOR_PLANS or FLOOR_PLANS[plan_id] in plans:
+            continue
+        availability = AVAILABILITY_XPATH(pane)
+        button = BUTTON_XPATH(pane)
+        plans[FLOOR_PLANS[plan_id]] = {
+            "availability_text": normalise_text(availability[0].text_content()) if availability else None,
+            "button_text": normalise_text(button[0].text_content()) if button else None,
+        }
+    return plans
+
+
+def extract_floor_plans(html, backend=None):
+    """Map apartment type -> {"availability_text", "button_text"} for every known floor plan in the HTML.
+
+    html may be str or bytes. backend is "lxml" or "stdlib" (default: lxml if installed).
+    """
+    if (backend or BACKEND) == "lxml":
+        return extract_floor_plans_lxml(html)
+    return extract_floor_plans_stdlib(html)
+
+
+def available_apartments(floor_plans):
+    """Apartment types whose button shows availability, in FLOOR_PLANS order."""
+    return [
+        apartment_type for apartment_type in FLOOR_PLANS.values()
+        if apartment_type in floor_plans and is_available(floor_plans[apartment_type]["button_text"])
+    ]
@@ -0,0 +1,263 @@
+"""
+Unit-level inventory tracking for OurCampus Apartment Monitor.
+
+When a floor plan turns available, its availableunits.aspx page is fetched
+(all floor plans in parallel) and the unit table is parsed into unit number,
+price and move-in date. Units are stored in the units table and every change
+is appended to unit_history, so alerts can name the new units and history can
+be queried per unit:
+
+    SELECT * FROM unit_history WHERE unit = 'A-1.04' ORDER BY timestamp;
+
+The table parser is deliberately tolerant: columns are found by their header
+text (or data-label attributes), not by position or class names.
+"""
+
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from html.parser import HTMLParser
+
+logger = logging.getLogger(__name__)
+
+# Header keywords for each field, checked in order
+COLUMN_KEYWORDS = {
+    "unit": ("apartment", "unit", "room", "#"),
+    "price": ("rent", "price", "cost"),
+    "move_in": ("move-in", "move in", "available", "date"),
+}
+
+
+def normalise_text(text):
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def parse_price(text):
+    """Numeric value of a price like "€ 1.234,50", "$1,234.50" or "795", or None."""
+    digits = re.sub(r"[^\d.,]", "", text or "")
+    if not re.search(r"\d", digits):
+        return None
+    # The last separator followed by exactly two digits is the decimal separator
+    match = re.match(r"^(.*?)[.,](\d{2})$", digits)
+    if match:
+        return float(re.sub(r"[.,]", "", match.group(1)) + "." + match.group(2))
+    return float(re.sub(r"[.,]", "", digits))
+
+
+class TableParser(HTMLParser):
+    """Collect every table row as a list of (cell text, cell attributes, is header)."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self.row = None
+        self.cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "tr":
+            self.row = []
+        elif tag in ("td", "th") and self.row is not None:
+            self.cell = {"text": [], "attrs": dict(attrs), "header": tag == "th"}
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self.cell is not None:
+            self.row.append((normalise_text("".join(self.cell["text"])), self.cell["attrs"], self.cell["header"]))
+            self.cell = None
+        elif tag == "tr" and self.row is not None:
+            if self.row:
+                self.rows.append(self.row)
+            self.row = None
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell["text"].append(data)
+
+
+def match_columns(labels):
+    """Map field -> column index from header labels; None if no unit column is found."""
+    columns = {}
+    for field, keywords in COLUMN_KEYWORDS.items():
+        for keyword in keywords:
+            index = next((i for i, label in enumerate(labels)
+                          if keyword in label.lower() and i not in columns.values()), None)
+            if index is not None:
+                columns[field] = index
+                break
+    return columns if "unit" in columns else None
+
+
+def parse_units(html):
+    """List of {"unit", "price", "price_value", "move_in"} parsed from an availableunits.aspx page."""
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+    parser = TableParser()
+    parser.feed(html)
+    parser.close()
+
+    units = []
+    columns = None
+    for row in parser.rows:
+        texts = [text for text, _, _ in row]
+        labels = [attrs.get("data-label") or "" for _, attrs, _ in row]
+        if any(is_header for _, _, is_header in row):
+            columns = match_columns(texts)
+            continue
+        row_columns = match_columns(labels) if any(labels) else columns
+        if not row_columns or len(texts) <= row_columns["unit"]:
+            continue
+
+        unit = texts[row_columns["unit"]]
+        unit = re.sub(r"^(apartment|unit|room)\s*:?\s*", "", unit, flags=re.IGNORECASE)
+        if not unit:
+            continue
+        price = texts[row_columns["price"]] if "price" in row_columns and row_columns["price"] < len(texts) else None
+        move_in = texts[row_columns["move_in"]] if "move_in" in row_columns and row_columns["move_in"] < len(texts) else None
+        units.append({"unit": unit, "price": price, "price_value": parse_price(price), "move_in": move_in})
+    return units
+
+
+def init_inventory_tables(conn):
+    c = conn.cursor()
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS units (
+        floor_plan TEXT,
+        unit TEXT,
+        price TEXT,
+        price_value REAL,
+        move_in TEXT,
+        first_seen TEXT,
+        last_seen TEXT,
+        active INTEGER,
+        PRIMARY KEY (floor_plan, unit)
+    )
+    ''')
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS unit_history (
+        timestamp TEXT,
+        floor_plan TEXT,
+        unit TEXT,
+        event TEXT,
+        price TEXT,
+        move_in TEXT
+    )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_units_active ON units (active, floor_plan)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_unit_history_unit ON unit_history (unit, timestamp)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_unit_history_floor_plan ON unit_history (floor_plan, timestamp)")
+    conn.commit()
+
+
+def diff_units(previous, current):
+    """Compare unit lists keyed by unit number. Returns (added, removed, changed) lists of units."""
+    previous = {unit["unit"]: unit for unit in previous}
+    current = {unit["unit"]: unit for unit in current}
+    added = [current[key] for key in current if key not in previous]
+    removed = [previous[key] for key in previous if key not in current]
+    changed = [current[key] for key in current if key in previous
+               and (current[key]["price"], current[key]["move_in"]) != (previous[key]["price"], previous[key]["move_in"])]
+    return added, removed, changed
+
+
+def active_units(conn, floor_plan=None):
+    query = "SELECT floor_plan, unit, price, price_value, move_in FROM units WHERE active = 1"
+    params = ()
+    if floor_plan:
+        query += " AND floor_plan = ?"
+        params = (floor_plan,)
+    return [
+        {"floor_plan": row[0], "unit": row[1], "price": row[2], "price_value": row[3], "move_in": row[4]}
+        for row in conn.execute(query + " ORDER BY floor_plan, unit", params)
+    ]
+
+
+def apply_snapshot(conn, floor_plan, units):
+    """Store the current unit list of a floor plan and record the differences. Returns (added, removed, changed)."""
+    added, removed, changed = diff_units(active_units(conn, floor_plan), units)
+    timestamp = datetime.now().isoformat()
+    with conn:
+        for unit in units:
+            conn.execute(
+                "INSERT INTO units VALUES (?, ?, ?, ?, ?, ?, ?, 1) "
+                "ON CONFLICT (floor_plan, unit) DO UPDATE SET price = excluded.price, "
+                "price_value = excluded.price_value, move_in = excluded.move_in, "
+                "last_seen = excluded.last_seen, active = 1",
+                (floor_plan, unit["unit"], unit["price"], unit["price_value"], unit["move_in"], timestamp, timestamp)
+            )
+        for unit in removed:
+            conn.execute("UPDATE units SET active = 0 WHERE floor_plan = ? AND unit = ?", (floor_plan, unit["unit"]))
+        conn.executemany(
+            "INSERT INTO unit_history VALUES (?, ?, ?, ?, ?, ?)",
+            [(timestamp, floor_plan, unit["unit"], event, unit["price"], unit["move_in"])
+             for event, group in (("listed", added), ("removed", removed), ("changed", changed))
+             for unit in group]
+        )
+    return added, removed, changed
+
+
+def format_unit(unit):
+    details = [part for part in (unit["price"], f"from {unit['move_in']}" if unit["move_in"] else None) if part]
+    return f"{unit['unit']} ({', '.join(details)})" if details else unit["unit"]
+
+
+class InventoryTracker:
+    """Fetch and diff unit lists in the background while floor plans are available."""
+
+    def __init__(self, urls, fetch, conn, notify, refresh_seconds=300, max_workers=4):
+        self.urls = urls  # floor plan -> availableunits.aspx URL
+        self.fetch = fetch  # url -> page bytes
+        self.conn = conn
+        self.notify = notify  # called with a message naming new units
+        self.refresh_seconds = refresh_seconds
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inventory")
+        self.lock = threading.Lock()  # serialises database writes from the fetch threads
+        self.available = set()
+        self.last_fetch = {}
+
+    def update(self, available_floor_plans):
+        """Called after every check with the available floor plans. Never blocks on the network."""
+        available = {plan for plan in available_floor_plans if plan in self.urls}
+        now = time.monotonic()
+
+        due = [plan for plan in available
+               if plan not in self.available or now - self.last_fetch.get(plan, 0) >= self.refresh_seconds]
+        for plan in due:
+            self.last_fetch[plan] = now
+            self.executor.submit(self.refresh, plan)
+
+        # A floor plan that is no longer available has no units left
+        for plan in self.available - available:
+            self.executor.submit(self.store, plan, [])
+        self.available = available
+
+    def refresh(self, floor_plan):
+        try:
+            started = time.perf_counter()
+            units = parse_units(self.fetch(self.urls[floor_plan]))
+            logger.info(f"Inventory: {len(units)} units listed for {floor_plan} "
+                        f"({time.perf_counter() - started:.2f}s)")
+            if not units:
+                logger.warning(f"Inventory: no units parsed for {floor_plan} - page layout may have changed")
+                return
+            added = self.store(floor_plan, units)
+            if added:
+                message = f"New {floor_plan} units:\n\n"
+                message += "".join(f"• {format_unit(unit)}\n" for unit in added)
+                message += f"\nBook here: {self.urls[floor_plan]}"
+                self.notify(message)
+        except Exception as e:
+            logger.error(f"Inventory: error refreshing {floor_plan}: {e}")
+
+    def store(self, floor_plan, units):
+        if not self.conn:
+            return units
+        with self.lock:
+            added, removed, changed = apply_snapshot(self.conn, floor_plan, units)
+        if added or removed or changed:
+            logger.info(f"Inventory: {floor_plan}: {len(added)} new, {len(removed)} gone, {len(changed)} changed")
+        return added
+
+    def stop(self):
+        self.executor.shutdown(wait=False)
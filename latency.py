@@ -0,0 +1,148 @@
+"""
+Detection-to-alert latency tracking for OurCampus Apartment Monitor.
+
+Every alert-triggering detection gets a correlation ID. One trace per newly
+available apartment carries that ID through the check, the decision, the
+notification enqueue and the delivery, with a timestamp at each stage. Traces
+are stored in the alert_latency table, and notifications rows carry the same
+correlation ID so an alert can be joined back to the check that caused it.
+
+Used by watch_units.py (writes) and health_check.py (reads).
+"""
+
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Timestamps recorded for every trace, in pipeline order
+STAGES = ("check_started", "checked", "decided", "enqueued", "delivered")
+
+# Reported segments: name -> (from stage, to stage)
+SEGMENTS = {
+    "check": ("check_started", "checked"),
+    "decision": ("checked", "decided"),
+    "enqueue": ("decided", "enqueued"),
+    "delivery": ("enqueued", "delivered"),
+    "total": ("check_started", "delivered"),
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+def init_latency_table(conn):
+    """Create the alert_latency table and link notifications to it."""
+    c = conn.cursor()
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS alert_latency (
+        correlation_id TEXT,
+        check_id TEXT,
+        apartment_type TEXT,
+        mode TEXT,
+        check_started_at REAL,
+        checked_at REAL,
+        decided_at REAL,
+        enqueued_at REAL,
+        delivered_at REAL,
+        delivered INTEGER
+    )
+    ''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_alert_latency_checked_at ON alert_latency (checked_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_alert_latency_correlation ON alert_latency (correlation_id)")
+
+    # Older databases have a notifications table without the correlation ID
+    columns = [row[1] for row in c.execute("PRAGMA table_info(notifications)")]
+    if columns and "correlation_id" not in columns:
+        c.execute("ALTER TABLE notifications ADD COLUMN correlation_id TEXT")
+    conn.commit()
+
+
+def new_correlation_id():
+    return uuid.uuid4().hex
+
+
+def new_traces(correlation_id, check_id, apartment_types, mode, check_started_at, checked_at):
+    """Start one trace per newly available apartment type, all sharing a correlation ID."""
+    return [
+        {
+            "correlation_id": correlation_id,
+            "check_id": check_id,
+            "apartment_type": apartment_type,
+            "mode": mode,
+            "check_started_at": check_started_at,
+            "checked_at": checked_at,
+            "decided_at": None,
+            "enqueued_at": None,
+            "delivered_at": None,
+        }
+        for apartment_type in apartment_types
+    ]
+
+
+def mark(traces, stage, at=None):
+    """Stamp a stage (decided, enqueued, delivered) on every trace."""
+    at = at if at is not None else time.time()
+    for trace in traces:
+        trace[f"{stage}_at"] = at
+
+
+def record_traces(conn, traces, delivered):
+    """Log the latency of finished traces and store them if a database is available."""
+    for trace in traces:
+        end = trace["delivered_at"] or trace["enqueued_at"] or trace["decided_at"] or trace["checked_at"]
+        status = "delivered" if delivered else "NOT delivered"
+        logger.info(
+            f"Alert latency [{trace['correlation_id'][:8]}] {trace['apartment_type']}: "
+            f"{status} {end - trace['check_started_at']:.2f}s after check start"
+        )
+
+    if not conn:
+        return
+
+    try:
+        c = conn.cursor()
+        c.executemany(
+            "INSERT INTO alert_latency VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (t["correlation_id"], t["check_id"], t["apartment_type"], t["mode"],
+                 t["check_started_at"], t["checked_at"], t["decided_at"], t["enqueued_at"],
+                 t["delivered_at"], 1 if delivered else 0)
+                for t in traces
+            ]
+        )
+        conn.commit()
+    except Exception as e:
+        logger.error(f"Error logging alert latency: {e}")
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a list of numbers (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_percentiles(conn, limit=1000):
+    """p50/p95/p99 (seconds) for each segment over the most recent delivered alerts."""
+    c = conn.cursor()
+    c.execute(
+        "SELECT check_started_at, checked_at, decided_at, enqueued_at, delivered_at "
+        "FROM alert_latency WHERE delivered = 1 ORDER BY checked_at DESC LIMIT ?",
+        (limit,)
+    )
+    rows = [dict(zip([f"{stage}_at" for stage in STAGES], row)) for row in c.fetchall()]
+
+    result = {"count": len(rows)}
+    for name, (start, end) in SEGMENTS.items():
+        values = [
+            row[f"{end}_at"] - row[f"{start}_at"]
+            for row in rows
+            if row[f"{start}_at"] is not None and row[f"{end}_at"] is not None
+        ]
+        result[name] = {f"p{p}": percentile(values, p) for p in PERCENTILES}
+    return result
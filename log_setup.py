@@ -0,0 +1,120 @@
+"""
+Logging pipeline for OurCampus Apartment Monitor.
+
+Log calls only put the record on an in-memory queue; a QueueListener thread
+formats it and does the console and file I/O, so writing logs never blocks a
+check. The log file is rotated by size (or by time with LOG_ROTATE_WHEN) and
+can be written as compact JSON lines.
+
+Per-subsystem verbosity is set with LOG_LEVELS, e.g. "speed=WARNING,cluster=DEBUG",
+where each name is a logger name (the module name, or "speed" for the speed
+mode hot path). LOG_SAMPLE thins out hot-path loggers: with "speed=20" only
+every 20th record below WARNING from each line that logs to "speed" is
+written, tagged with the number of records it stands for. Warnings and errors
+are never sampled.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class JsonFormatter(logging.Formatter):
+    """One compact JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Pass the first record and then every Nth record below WARNING, counted per call site."""
+
+    def __init__(self, every):
+        super().__init__()
+        self.every = every
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.every <= 1:
+            return True
+        site = (record.pathname, record.lineno)
+        with self.lock:
+            count = self.counts.get(site, 0) + 1
+            self.counts[site] = count
+        if count == 1:
+            return True
+        if count % self.every:
+            return False
+        record.msg = f"{record.getMessage()} [sampled: 1 of {self.every}]"
+        record.args = ()
+        return True
+
+
+def parse_levels(spec):
+    """Turn "speed=WARNING,cluster=DEBUG" into {"speed": "WARNING", "cluster": "DEBUG"}."""
+    result = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            result[name.strip()] = value.strip()
+    return result
+
+
+def stop_listener(listener):
+    """Flush the queue and stop the listener; safe to call more than once."""
+    try:
+        listener.stop()
+    except AttributeError:
+        pass  # already stopped
+
+
+def setup_logging(log_dir="logs", level="INFO", log_format="text", max_bytes=10 * 1024 * 1024,
+                  backup_count=5, rotate_when="", levels="", sample=""):
+    """Install the queue-based pipeline on the root logger. Returns the running QueueListener."""
+    os.makedirs(log_dir, exist_ok=True)
+    log_path = os.path.join(log_dir, "watch_units.log")
+
+    if rotate_when:
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            log_path, when=rotate_when, backupCount=backup_count, encoding='utf-8'
+        )
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+    file_handler.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT))
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(stop_listener, listener)  # flush what is still queued on exit
+
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level.upper())
+
+    for name, value in parse_levels(levels).items():
+        logging.getLogger(name).setLevel(value.upper())
+    for name, value in parse_levels(sample).items():
+        logging.getLogger(name).addFilter(SamplingFilter(int(value)))
+
+    return listener
@@ -0,0 +1,130 @@
+"""
+Content fingerprints of the floor plans page for OurCampus Apartment Monitor.
+
+Nearly every check sees the same floorPlanDataContainer as the one before.
+Each check engine fingerprints the normalised container HTML first; when the
+fingerprint matches the previous check, the previous result is reused and the
+tab clicks, extraction and database writes are skipped. The HTTP engine also
+sends If-None-Match / If-Modified-Since, so an unchanged page can come back as
+a bodiless 304.
+
+A fingerprint is only reused when the container it was taken from already
+carried the button of every floor plan, so it covers everything the check
+reads. Results also expire after max_age seconds, which keeps
+availability_history sampled while nothing changes.
+"""
+
+import hashlib
+import re
+import threading
+import time
+
+import html_extract
+
+CONTAINER_ID = "floorPlanDataContainer"
+
+# Cache-busting query values (e.g. t=0.3437430084) and comments change on every load
+VOLATILE_PATTERNS = [
+    re.compile(r"<!--.*?-->", re.DOTALL),
+    re.compile(r"([?&]t=)0\.\d+"),
+]
+DIV_TAG = re.compile(r"<(/?)div\b", re.IGNORECASE)
+
+
+def normalise(html):
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+    for pattern in VOLATILE_PATTERNS:
+        html = pattern.sub(lambda match: match.group(1) if match.groups() else "", html)
+    return re.sub(r"\s+", " ", html).strip()
+
+
+def container_html(html):
+    """The floorPlanDataContainer element of a whole page, or None if the page has none."""
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+    match = re.search(r"<div\b[^>]*\bid=[\"']%s[\"']" % CONTAINER_ID, html)
+    if not match:
+        return None
+    depth = 0
+    for tag in DIV_TAG.finditer(html, match.start()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return html[match.start():html.index(">", tag.end()) + 1]
+    return html[match.start():]
+
+
+def fingerprint(html):
+    return hashlib.sha256(normalise(html).encode("utf-8")).hexdigest()
+
+
+def covers_all_floor_plans(html):
+    """Whether the HTML carries the button of every known floor plan (so its fingerprint covers the check)."""
+    floor_plans = html_extract.extract_floor_plans(html)
+    return all(
+        floor_plans.get(apartment_type, {}).get("button_text")
+        for apartment_type in html_extract.FLOOR_PLANS.values()
+    )
+
+
+class ContentCache:
+    """The last fingerprint and result of one check engine, with hit counters."""
+
+    def __init__(self, max_age=600):
+        self.max_age = max_age
+        self.lock = threading.Lock()  # worker pool browsers share the main engine's cache
+        self.digest = None
+        self.result = None
+        self.stored_at = 0
+        self.etag = None
+        self.last_modified = None
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, digest):
+        """The cached result for this fingerprint (a copy), or None. Counts a hit or a miss."""
+        with self.lock:
+            if digest is not None and digest == self.digest and time.monotonic() - self.stored_at < self.max_age:
+                self.hits += 1
+                return list(self.result)
+            self.misses += 1
+            return None
+
+    def store(self, digest, result, html=None):
+        """Remember a result. With html given, it is only cached if the fingerprint covers every floor plan."""
+        if html is not None and not covers_all_floor_plans(html):
+            digest = None
+        with self.lock:
+            self.digest = digest
+            self.result = list(result)
+            self.stored_at = time.monotonic()
+
+    def hit(self):
+        """Reuse the cached result without a fingerprint (HTTP 304). Returns it, or None if there is none."""
+        with self.lock:
+            if self.result is None or time.monotonic() - self.stored_at >= self.max_age:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return list(self.result)
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def update_validators(self, headers):
+        self.etag = headers.get("ETag")
+        self.last_modified = headers.get("Last-Modified")
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
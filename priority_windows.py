@@ -0,0 +1,212 @@
+"""
+Config-file priority windows for OurCampus Apartment Monitor.
+
+Windows are read from a JSON (or YAML, if PyYAML is installed) file and
+compiled into minute-of-week lookup tables, so finding the priority of the
+current minute is a single array index. The file is re-read when it changes,
+without restarting the monitor.
+
+Example priority_windows.json:
+
+    {
+      "windows": [
+        {"priority": "high", "days": "wed", "start": "12:00", "end": "15:30"},
+        {"priority": "medium", "days": "tue-fri", "start": "13:00", "end": "19:00"},
+        {"priority": "high", "days": ["mon"], "start": "09:00", "end": "10:00",
+         "property": "ourcampus-amsterdam-diemen", "floor_plans": ["2 Person Apartment"]}
+      ]
+    }
+
+"days" takes day names, cron-style ranges ("tue-fri") or "*". Both start and
+end minutes are inside the window. Windows with "property" only apply when
+monitoring that property; windows with "floor_plans" only raise the priority
+of those floor plans. Where windows overlap, the highest priority wins.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+from adaptive_schedule import MINUTES_PER_DAY, MINUTES_PER_WEEK, minute_of_week
+
+# Try to import PyYAML (but don't fail if it's not installed)
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+logger = logging.getLogger(__name__)
+
+NORMAL, MEDIUM, HIGH = 0, 1, 2
+PRIORITY_LEVELS = {"normal": NORMAL, "medium": MEDIUM, "high": HIGH}
+LEVEL_NAMES = {level: name for name, level in PRIORITY_LEVELS.items()}
+
+DAY_NAMES = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def parse_days(days):
+    """Turn "wed", "tue-fri", "*" or a list of those into weekday numbers (0=Monday)."""
+    if isinstance(days, (str, int)):
+        days = [days]
+
+    result = set()
+    for entry in days:
+        if isinstance(entry, int):
+            result.add(entry)
+            continue
+        entry = entry.strip().lower()
+        if entry == "*":
+            result.update(range(7))
+        elif "-" in entry:
+            first, last = (DAY_NAMES.index(part[:3]) for part in entry.split("-", 1))
+            day = first
+            while True:
+                result.add(day)
+                if day == last:
+                    break
+                day = (day + 1) % 7
+        else:
+            result.add(DAY_NAMES.index(entry[:3]))
+    return sorted(result)
+
+
+def parse_time(value):
+    """Minutes since midnight for "HH:MM"."""
+    hour, minute = value.split(":")
+    return int(hour) * 60 + int(minute)
+
+
+def windows_from_legacy(high_windows, medium_windows):
+    """Convert the HIGH/MEDIUM_PRIORITY_WINDOWS dict lists into config-file windows."""
+    windows = []
+    for priority, legacy in (("high", high_windows), ("medium", medium_windows)):
+        for window in legacy:
+            windows.append({
+                "priority": priority,
+                "days": [window["day"]],
+                "start": f"{window['start_hour']:02d}:{window['start_minute']:02d}",
+                "end": f"{window['end_hour']:02d}:{window['end_minute']:02d}",
+            })
+    return windows
+
+
+def compile_windows(windows, property_name, floor_plans):
+    """Compile windows into one minute-of-week table per floor plan.
+
+    Returns (tables, combined): tables maps each floor plan to a bytearray of
+    priority levels, combined holds the highest level over all floor plans.
+    """
+    tables = {plan: bytearray(MINUTES_PER_WEEK) for plan in floor_plans}
+
+    for window in windows:
+        if window.get("property") and window["property"] != property_name:
+            continue
+
+        level = PRIORITY_LEVELS[window.get("priority", "high").lower()]
+        start = parse_time(window["start"])
+        end = parse_time(window["end"])
+        plans = window.get("floor_plans") or floor_plans
+        unknown = [plan for plan in plans if plan not in tables]
+        if unknown:
+            raise ValueError(f"Unknown floor plans in priority window: {unknown}")
+
+        for day in parse_days(window.get("days", "*")):
+            first = day * MINUTES_PER_DAY + start
+            last = day * MINUTES_PER_DAY + end
+            if end < start:  # window runs past midnight
+                last += MINUTES_PER_DAY
+            for minute in range(first, last + 1):
+                minute %= MINUTES_PER_WEEK
+                for plan in plans:
+                    if tables[plan][minute] < level:
+                        tables[plan][minute] = level
+
+    combined = bytearray(MINUTES_PER_WEEK)
+    for table in tables.values():
+        for minute, level in enumerate(table):
+            if level > combined[minute]:
+                combined[minute] = level
+    return tables, combined
+
+
+def load_windows_file(path):
+    """Read the window list from a JSON or YAML file."""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yml", ".yaml")):
+            if yaml is None:
+                raise RuntimeError("PyYAML is not installed - use a .json priority windows file")
+            config = yaml.safe_load(f)
+        else:
+            config = json.load(f)
+    return config.get("windows", []) if isinstance(config, dict) else config
+
+
+class PriorityWindows:
+    """Minute-of-week priority lookup backed by a hot-reloaded config file."""
+
+    def __init__(self, path, property_name, floor_plans, default_windows=None, reload_interval=5):
+        self.path = path
+        self.property_name = property_name
+        self.floor_plans = list(floor_plans)
+        self.default_windows = default_windows or []
+        self.reload_interval = reload_interval
+
+        self.windows = []
+        self.tables = {}
+        self.combined = bytearray(MINUTES_PER_WEEK)
+        self.loaded_mtime = None
+        self.next_stat = 0
+        self.load()
+
+    def load(self):
+        """(Re)load windows from the file, or the defaults if there is no file."""
+        try:
+            if os.path.exists(self.path):
+                mtime = os.stat(self.path).st_mtime
+                windows = load_windows_file(self.path)
+                source = self.path
+            else:
+                mtime = None
+                windows = self.default_windows
+                source = "built-in defaults"
+            self.tables, self.combined = compile_windows(windows, self.property_name, self.floor_plans)
+            self.windows = windows
+            self.loaded_mtime = mtime
+            logger.info(f"Loaded {len(windows)} priority windows from {source}")
+        except Exception as e:
+            # Keep the previous tables so a bad edit does not stop the monitor
+            logger.error(f"Error loading priority windows from {self.path}: {e}")
+            if os.path.exists(self.path):
+                self.loaded_mtime = os.stat(self.path).st_mtime
+
+    def maybe_reload(self):
+        """Reload if the file changed; the file is stat'ed at most every reload_interval seconds."""
+        now = time.monotonic()
+        if now < self.next_stat:
+            return
+        self.next_stat = now + self.reload_interval
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            mtime = None
+        if mtime != self.loaded_mtime:
+            self.load()
+
+    def level(self, now=None, floor_plan=None):
+        """Priority level (NORMAL, MEDIUM or HIGH) of the current minute."""
+        self.maybe_reload()
+        table = self.tables[floor_plan] if floor_plan else self.combined
+        return table[minute_of_week(now or datetime.now())]
+
+    def describe(self):
+        """One line per window for status messages."""
+        lines = []
+        for window in self.windows:
+            days = ", ".join(DAY_NAMES[day].capitalize() for day in parse_days(window.get("days", "*")))
+            line = f"{window.get('priority', 'high').capitalize()}: {days} {window['start']}-{window['end']}"
+            if window.get("floor_plans"):
+                line += f" ({', '.join(window['floor_plans'])})"
+            lines.append(line)
+        return lines
@@ -0,0 +1,55 @@
+"""
+Thread-safe sliding-window rate limiter for OurCampus Apartment Monitor.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class RateLimiter:
+    """Allow at most max_calls per period seconds, shared between threads."""
+
+    def __init__(self, max_calls, period=60.0, clock=time.monotonic):
+        self.max_calls = max_calls
+        self.period = period
+        self.clock = clock
+        self.calls = deque()
+        self.lock = threading.Lock()
+
+    def _expire(self, now):
+        while self.calls and now - self.calls[0] >= self.period:
+            self.calls.popleft()
+
+    def try_acquire(self):
+        """Take a slot if one is free. Returns False instead of waiting."""
+        with self.lock:
+            now = self.clock()
+            self._expire(now)
+            if len(self.calls) >= self.max_calls:
+                return False
+            self.calls.append(now)
+            return True
+
+    def acquire(self, timeout=None):
+        """Wait for a free slot. Returns False if timeout expires first."""
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            with self.lock:
+                now = self.clock()
+                self._expire(now)
+                if len(self.calls) < self.max_calls:
+                    self.calls.append(now)
+                    return True
+                wait = self.period - (now - self.calls[0])
+            if deadline is not None:
+                if now >= deadline:
+                    return False
+                wait = min(wait, deadline - now)
+            time.sleep(max(wait, 0.001))
+
+    def used(self):
+        """Calls made in the current window."""
+        with self.lock:
+            self._expire(self.clock())
+            return len(self.calls)
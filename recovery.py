@@ -0,0 +1,210 @@
+"""
+Failure recovery for OurCampus Apartment Monitor.
+
+Replaces the fixed 30-second sleeps after a failed check. Each failure is
+classified, and every class has its own backoff (exponential in the number of
+consecutive failures of that class, with full jitter) and decides whether the
+browser is restarted:
+
+- crash: the browser or chromedriver is gone or hung (restart at once)
+- timeout: page load or script timeout (restart if it repeats)
+- network: no connection or DNS (wait, a new browser would not help)
+- site: the page loaded but is an error page or lacks the floor plans
+- unknown: anything else
+
+After failure_threshold consecutive failures the circuit opens: checks pause
+for open_seconds (doubling up to max_open_seconds while it stays broken), then
+a single half-open trial check decides whether it closes again.
+
+The time from the first failure of an incident to the next successful check
+is its recovery time; incidents are stored in the recovery_incidents table.
+"""
+
+import logging
+import random
+import re
+import threading
+import time
+from datetime import datetime
+
+from latency import percentile
+
+logger = logging.getLogger(__name__)
+
+# class -> (base delay, max delay, restart the browser after this many consecutive failures; 0 = never)
+POLICIES = {
+    "crash": (0.5, 10, 1),
+    "timeout": (2, 30, 2),
+    "network": (5, 60, 0),
+    "site": (5, 120, 3),
+    "unknown": (3, 60, 2),
+}
+
+CRASH_MARKERS = (
+    "invalid session id", "session deleted", "chrome not reachable", "disconnected",
+    "no such window", "target window already closed", "tab crashed", "failed to establish a new connection",
+    "connection refused", "max retries exceeded", "remote end closed",
+)
+NETWORK_MARKERS = (
+    "err_internet_disconnected", "err_name_not_resolved", "err_network_changed", "err_connection",
+    "err_address_unreachable", "name or service not known", "temporary failure in name resolution",
+    "network is unreachable",
+)
+SITE_MARKERS = re.compile(r"server error|service unavailable|bad gateway|\b(?:404|500|502|503|504)\b")
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+
+def classify(error):
+    """Failure class of an exception raised by a check or a browser start."""
+    name = type(error).__name__.lower()
+    message = str(error).lower()
+    if any(marker in message for marker in NETWORK_MARKERS):
+        return "network"
+    if "timeout" in name or "timed out" in message:
+        return "timeout"
+    if name in ("invalidsessionidexception", "nosuchwindowexception", "stallerror") or any(
+            marker in message for marker in CRASH_MARKERS):
+        # Refused connections from requests mean the site is unreachable, not a dead chromedriver
+        return "network" if name in ("connectionerror", "connecttimeout") else "crash"
+    if name in ("checkerror", "httperror") or SITE_MARKERS.search(message):
+        return "site"
+    if name in ("connectionerror", "gaierror", "connectionrefusederror", "connectionreseterror"):
+        return "network"
+    return "unknown"
+
+
+def init_recovery_table(conn):
+    c = conn.cursor()
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS recovery_incidents (
+        started_at TEXT,
+        recovered_at TEXT,
+        recovery_seconds REAL,
+        failure_class TEXT,
+        failures INTEGER,
+        circuit_opened INTEGER
+    )
+    ''')
+    conn.commit()
+
+
+def record_incident(conn, incident):
+    if not conn:
+        return
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO recovery_incidents VALUES (?, ?, ?, ?, ?, ?)",
+                (datetime.fromtimestamp(incident["started_at"]).isoformat(),
+                 datetime.fromtimestamp(incident["recovered_at"]).isoformat(),
+                 incident["recovery_seconds"], incident["failure_class"], incident["failures"],
+                 1 if incident["circuit_opened"] else 0)
+            )
+    except Exception as e:
+        logger.error(f"Error recording recovery incident: {e}")
+
+
+def recovery_summary(conn, limit=100):
+    """Count and recovery time percentiles over the latest incidents."""
+    c = conn.cursor()
+    c.execute("SELECT recovery_seconds FROM recovery_incidents ORDER BY started_at DESC LIMIT ?", (limit,))
+    seconds = [row[0] for row in c.fetchall()]
+    return {
+        "count": len(seconds),
+        "p50": percentile(seconds, 50) if seconds else None,
+        "p95": percentile(seconds, 95) if seconds else None,
+        "max": max(seconds) if seconds else None,
+    }
+
+
+class Decision:
+    """What the check loop does after a failure."""
+
+    def __init__(self, failure_class, delay, restart_browser, circuit_opened):
+        self.failure_class = failure_class
+        self.delay = delay
+        self.restart_browser = restart_browser
+        self.circuit_opened = circuit_opened  # the circuit opened on this failure
+
+
+class Recovery:
+    """Per-class backoff and a half-open circuit breaker for one check loop."""
+
+    def __init__(self, policies=POLICIES, failure_threshold=5, open_seconds=60, max_open_seconds=600):
+        self.policies = policies
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.state = CLOSED
+        self.current_open_seconds = open_seconds
+        self.consecutive = 0
+        self.class_counts = {}  # consecutive failures per class in the current incident
+        self.incident = None
+        self.incidents = 0
+        self.last_recovery_seconds = None
+        self.lock = threading.Lock()
+
+    def failure(self, error):
+        """Register a failed check (or browser start). Returns the Decision for the loop."""
+        failure_class = classify(error)
+        with self.lock:
+            now = time.time()
+            if self.incident is None:
+                self.incident = {"started_at": now, "failure_class": failure_class, "failures": 0,
+                                 "circuit_opened": False}
+            self.incident["failures"] += 1
+            self.consecutive += 1
+            count = self.class_counts[failure_class] = self.class_counts.get(failure_class, 0) + 1
+
+            base, cap, restart_after = self.policies.get(failure_class, self.policies["unknown"])
+            delay = random.uniform(0, min(cap, base * 2 ** (count - 1)))  # full jitter
+            restart_browser = bool(restart_after) and count % restart_after == 0
+
+            opened = False
+            if self.state == HALF_OPEN:
+                # The trial check failed: open again for longer
+                self.current_open_seconds = min(self.current_open_seconds * 2, self.max_open_seconds)
+                self.state = OPEN
+            elif self.state == CLOSED and self.consecutive >= self.failure_threshold:
+                self.state = OPEN
+                self.current_open_seconds = self.open_seconds
+                self.incident["circuit_opened"] = opened = True
+            if self.state == OPEN:
+                # One fresh browser for the trial check, then a single half-open attempt
+                delay = self.current_open_seconds * random.uniform(0.9, 1.1)
+                restart_browser = failure_class != "network"
+                self.state = HALF_OPEN
+
+        logger.warning(f"Check failure classified as {failure_class} (#{count}); "
+                       f"waiting {delay:.1f}s{', restarting browser' if restart_browser else ''}"
+                       f"{' - circuit open' if self.state == HALF_OPEN else ''}")
+        return Decision(failure_class, delay, restart_browser, opened)
+
+    def success(self):
+        """Register a successful check. Returns the finished incident (with its recovery time), if any."""
+        with self.lock:
+            self.consecutive = 0
+            self.class_counts = {}
+            self.state = CLOSED
+            self.current_open_seconds = self.open_seconds
+            incident = self.incident
+            self.incident = None
+            if incident is None:
+                return None
+            incident["recovered_at"] = time.time()
+            incident["recovery_seconds"] = incident["recovered_at"] - incident["started_at"]
+            self.incidents += 1
+            self.last_recovery_seconds = incident["recovery_seconds"]
+        logger.info(f"Recovered from {incident['failure_class']} failure after "
+                    f"{incident['recovery_seconds']:.1f}s ({incident['failures']} failed attempts)")
+        return incident
+
+    def stats(self):
+        with self.lock:
+            return {
+                "circuit_open": 0 if self.state == CLOSED else 1,
+                "consecutive_failures": self.consecutive,
+                "incidents": self.incidents,
+                "last_recovery_seconds": self.last_recovery_seconds,
+            }
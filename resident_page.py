@@ -0,0 +1,116 @@
+"""
+Resident floor plans page for OurCampus Apartment Monitor.
+
+Instead of driver.get(URL) on every check, which re-downloads the page with
+all its scripts and styles and rebuilds the DOM, the page is loaded once and
+kept open. Each check fetch()es the same URL from inside the page with
+execute_async_script, parses the response there with DOMParser and returns only
+the floorPlanDataContainer HTML. The page is fully reloaded on the first
+check, after a failed fetch, and every reload_every checks.
+
+Bytes per check are the decoded body sizes reported by the browser: the
+fetched document for a resident check, the document plus every subresource
+for a reload.
+"""
+
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+CONTAINER_ID = "floorPlanDataContainer"
+
+# arguments: url, container id, callback
+FETCH_SCRIPT = """
+var url = arguments[0], containerId = arguments[1], done = arguments[arguments.length - 1];
+fetch(url, {credentials: 'same-origin', cache: 'no-store'})
+    .then(function (response) {
+        return response.text().then(function (text) {
+            var container = new DOMParser().parseFromString(text, 'text/html').getElementById(containerId);
+            done({status: response.status, bytes: new Blob([text]).size,
+                  html: container ? container.outerHTML : null});
+        });
+    })
+    .catch(function (error) { done({error: String(error)}); });
+"""
+
+# arguments: container id
+RELOADED_SCRIPT = """
+var container = document.getElementById(arguments[0]);
+var bytes = 0;
+performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))
+    .forEach(function (entry) { bytes += entry.decodedBodySize || 0; });
+performance.clearResourceTimings();
+return {bytes: bytes, html: container ? container.outerHTML : null};
+"""
+
+
+class ResidentPageError(Exception):
+    """The in-page fetch failed or returned no floor plan data."""
+
+
+class ResidentPage:
+    """A floor plans page kept loaded in one driver, refreshed with in-page fetches."""
+
+    def __init__(self, driver, url, reload_every=50, script_timeout=10):
+        self.driver = driver
+        self.url = url
+        self.reload_every = reload_every
+        self.script_timeout = script_timeout
+        self.loaded = False
+        self.fetches_since_reload = 0
+        self.totals = {"fetch": [0, 0, 0.0], "reload": [0, 0, 0.0]}  # count, bytes, seconds
+        self.last = None  # (source, bytes, seconds) of the last refresh
+
+    def reload(self):
+        """Load the page with driver.get. Returns the live container HTML."""
+        started = time.perf_counter()
+        self.driver.get(self.url)
+        self.driver.set_script_timeout(self.script_timeout)
+        result = self.driver.execute_script(RELOADED_SCRIPT, CONTAINER_ID)
+        self.loaded = True
+        self.fetches_since_reload = 0
+        self.count("reload", result.get("bytes") or 0, time.perf_counter() - started)
+        return result.get("html")
+
+    def fetch(self):
+        """Fetch the page from inside the loaded one. Returns the fetched container HTML."""
+        started = time.perf_counter()
+        result = self.driver.execute_async_script(FETCH_SCRIPT, self.url, CONTAINER_ID)
+        if not result or result.get("error"):
+            raise ResidentPageError((result or {}).get("error") or "no result")
+        if result.get("status") != 200:
+            raise ResidentPageError(f"HTTP {result.get('status')}")
+        if not result.get("html"):
+            raise ResidentPageError(f"{CONTAINER_ID} not in the fetched page")
+        self.fetches_since_reload += 1
+        self.count("fetch", result.get("bytes") or 0, time.perf_counter() - started)
+        return result["html"]
+
+    def container(self, force_reload=False):
+        """Current container HTML: fetched in-page, or from a full reload when due or when the fetch fails."""
+        if force_reload or not self.loaded or self.fetches_since_reload >= self.reload_every:
+            return self.reload()
+        try:
+            return self.fetch()
+        except Exception as e:
+            logger.warning(f"Resident page fetch failed ({e}) - reloading the page")
+            return self.reload()
+
+    def count(self, source, size, seconds):
+        totals = self.totals[source]
+        totals[0] += 1
+        totals[1] += size
+        totals[2] += seconds
+        self.last = (source, size, seconds)
+
+    def stats(self):
+        """Checks, mean bytes and mean latency (ms) per refresh, for in-page fetches and full reloads."""
+        return {
+            source: {
+                "checks": count,
+                "mean_bytes": size / count if count else None,
+                "mean_ms": seconds * 1000 / count if count else None,
+            }
+            for source, (count, size, seconds) in self.totals.items()
+        }
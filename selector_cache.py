@@ -0,0 +1,90 @@
+"""
+Self-tuning selector order for OurCampus Apartment Monitor.
+
+Elements like the floor plan tabs have several candidate selectors, because
+the site's markup has changed before. Trying them in a fixed order with an
+implicit wait means every miss in front of the working selector costs the
+full implicit wait. Instead, lookups use find_elements (which returns at once
+with implicit waits off), the selector that worked last time is tried first,
+and the fallbacks are only probed when it misses. The learned order is saved
+to a JSON file, so it survives restarts.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def load_order(path):
+    """Learned selector order per key, or {} if there is no readable file."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return {key: [tuple(candidate) for candidate in order] for key, order in json.load(f).items()}
+    except (OSError, ValueError, TypeError):
+        return {}
+
+
+class SelectorCache:
+    """Find elements through candidate (by, selector) lists, most recently working selector first."""
+
+    def __init__(self, path=None, miss_timeout=2.0, poll_interval=0.1):
+        self.path = path
+        self.miss_timeout = miss_timeout  # how long to keep probing when no candidate matches yet
+        self.poll_interval = poll_interval
+        self.order = load_order(path) if path else {}
+        self.lock = threading.Lock()
+        self.counts = {"first_try": 0, "fallback": 0, "miss": 0}
+
+    def ordered(self, key, candidates):
+        """Candidates with the learned order first; new candidates after them, dropped ones left out."""
+        candidates = [tuple(candidate) for candidate in candidates]
+        learned = [candidate for candidate in self.order.get(key, []) if candidate in candidates]
+        return learned + [candidate for candidate in candidates if candidate not in learned]
+
+    def find(self, driver, key, candidates):
+        """First element matched by a candidate, or None if none matches within miss_timeout."""
+        order = self.ordered(key, candidates)
+        deadline = time.monotonic() + self.miss_timeout
+        while True:
+            for index, (by, selector) in enumerate(order):
+                elements = driver.find_elements(by, selector)
+                if elements:
+                    self.learn(key, order, index)
+                    return elements[0]
+            if time.monotonic() >= deadline:
+                with self.lock:
+                    self.counts["miss"] += 1
+                logger.warning(f"No selector matched for {key}")
+                return None
+            time.sleep(self.poll_interval)
+
+    def learn(self, key, order, index):
+        with self.lock:
+            if index == 0 and self.order.get(key) == order:
+                self.counts["first_try"] += 1
+                return
+            if index:
+                self.counts["fallback"] += 1
+                logger.info(f"Selector for {key} changed to {order[index][1]}")
+            else:
+                self.counts["first_try"] += 1
+            self.order[key] = [order[index]] + order[:index] + order[index + 1:]
+            self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+                json.dump(self.order, f, indent=2)
+            os.replace(f"{self.path}.tmp", self.path)
+        except OSError as e:
+            logger.warning(f"Could not save selector order: {e}")
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counts)
@@ -0,0 +1,104 @@
+"""
+Page snapshot recorder for OurCampus Apartment Monitor.
+
+When SNAPSHOT_RECORDING is enabled, the floorPlanDataContainer HTML seen by
+each check is handed to a background thread, which stores it gzip-compressed
+under its SHA-256 (objects/<sha256>.html.gz), so each distinct snapshot is
+stored once. index.jsonl gets a timestamped line whenever the content
+changes. Recorded snapshots can be replayed through every extraction path
+with benchmarks/replay_snapshots.py.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def object_path(directory, digest):
+    return os.path.join(directory, "objects", f"{digest}.html.gz")
+
+
+def load_index(directory):
+    """Index entries in recording order."""
+    entries = []
+    try:
+        with open(os.path.join(directory, "index.jsonl"), encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entries.append(json.loads(line))
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def load_snapshot(directory, digest):
+    with gzip.open(object_path(directory, digest), "rt", encoding="utf-8") as f:
+        return f.read()
+
+
+class SnapshotRecorder:
+    """Store container HTML snapshots off the check path."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        self.index_path = os.path.join(directory, "index.jsonl")
+
+        entries = load_index(directory)
+        self.last_digest = entries[-1]["sha256"] if entries else None
+        self.stored = {name.split(".")[0] for name in os.listdir(os.path.join(directory, "objects"))}
+        self.recorded = 0
+
+        self.queue = queue.Queue(maxsize=100)
+        self.thread = threading.Thread(target=self._run, name="snapshot-recorder", daemon=True)
+        self.thread.start()
+
+    def record(self, html, source, check_id=None):
+        """Queue a snapshot. Never blocks; drops the snapshot if the writer has fallen behind."""
+        if not html:
+            return
+        try:
+            self.queue.put_nowait((time.time(), html, source, check_id))
+        except queue.Full:
+            logger.warning("Snapshot recorder is behind - dropping snapshot")
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            try:
+                self._store(*item)
+            except OSError as e:
+                logger.error(f"Error storing snapshot: {e}")
+
+    def _store(self, recorded_at, html, source, check_id):
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        if digest == self.last_digest:
+            return
+
+        if digest not in self.stored:
+            path = object_path(self.directory, digest)
+            with gzip.open(f"{path}.tmp", "wb") as f:
+                f.write(data)
+            os.replace(f"{path}.tmp", path)
+            self.stored.add(digest)
+
+        entry = {"ts": recorded_at, "sha256": digest, "source": source, "check_id": check_id, "bytes": len(data)}
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self.last_digest = digest
+        self.recorded += 1
+        logger.info(f"Recorded page snapshot {digest[:12]} ({len(data)} bytes)")
+
+    def stop(self):
+        self.queue.put(None)
+        self.thread.join(timeout=10)
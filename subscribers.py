@@ -0,0 +1,165 @@
+"""
+Alert subscribers for OurCampus Apartment Monitor.
+
+Availability alerts used to go to TELEGRAM_CHAT_ID only. Subscribers are
+stored in the subscribers table with an optional floor plan filter (apartment
+types; no filter means every floor plan), and each alert is fanned out to the
+matching subscribers concurrently, each receiving only the apartments it asked
+for.
+
+Sends are throttled by a global rate limiter (Telegram allows about 30
+messages per second per bot) and one limiter per chat (about one message per
+second); a 429 answer is retried after the retry_after it carries.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import html_extract
+from latency import percentile
+from rate_limit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+def init_subscribers_table(conn):
+    c = conn.cursor()
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS subscribers (
+        chat_id TEXT PRIMARY KEY,
+        floor_plans TEXT,
+        subscribed_at TEXT
+    )
+    ''')
+    conn.commit()
+
+
+def parse_floor_plans(tokens):
+    """Apartment types named by tokens: floor plan IDs or person counts ("1", "2p"). None for all/no tokens.
+
+    Raises ValueError for a token that names no floor plan.
+    """
+    floor_plans = set()
+    for token in tokens:
+        token = token.strip().lower()
+        if token in ("", "all"):
+            return None
+        if token in html_extract.FLOOR_PLANS:
+            floor_plans.add(html_extract.FLOOR_PLANS[token])
+            continue
+        persons = token.rstrip("p")
+        matched = [apartment_type for apartment_type in html_extract.FLOOR_PLANS.values()
+                   if apartment_type.startswith(f"{persons} Person")]
+        if not persons.isdigit() or not matched:
+            raise ValueError(f"Unknown floor plan: {token}")
+        floor_plans.update(matched)
+    return floor_plans or None
+
+
+def add_subscriber(conn, chat_id, floor_plans=None):
+    """Subscribe a chat (or change its filter). floor_plans is a set of apartment types, None for all."""
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO subscribers VALUES (?, ?, ?)",
+            (str(chat_id), ",".join(sorted(floor_plans)) if floor_plans else None, datetime.now().isoformat())
+        )
+
+
+def remove_subscriber(conn, chat_id):
+    """Unsubscribe a chat. Returns whether it was subscribed."""
+    with conn:
+        return conn.execute("DELETE FROM subscribers WHERE chat_id = ?", (str(chat_id),)).rowcount > 0
+
+
+def load_subscribers(conn):
+    """chat_id -> set of apartment types, or None for every floor plan."""
+    c = conn.cursor()
+    c.execute("SELECT chat_id, floor_plans FROM subscribers ORDER BY subscribed_at")
+    return {chat_id: set(floor_plans.split(",")) if floor_plans else None for chat_id, floor_plans in c.fetchall()}
+
+
+def matching(subscribers, apartments):
+    """(chat_id, apartments) for every subscriber whose filter matches at least one of the apartments."""
+    recipients = []
+    for chat_id, floor_plans in subscribers.items():
+        matched = [apt for apt in apartments
+                   if floor_plans is None or html_extract.apartment_type(apt) in floor_plans]
+        if matched:
+            recipients.append((chat_id, matched))
+    return recipients
+
+
+class FanOut:
+    """Send messages to many chats concurrently within per-chat and global rate limits.
+
+    send(chat_id, text) returns True or False, or the seconds to wait before retrying (HTTP 429).
+    """
+
+    def __init__(self, send, max_workers=8, global_per_second=30, chat_per_second=1, max_retries=2,
+                 history=100):
+        self.send = send
+        self.max_retries = max_retries
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fanout")
+        self.global_limiter = RateLimiter(global_per_second, 1.0)
+        self.chat_per_second = chat_per_second
+        self.chat_limiters = {}
+        self.lock = threading.Lock()
+        self.durations = deque(maxlen=history)  # seconds per fan-out
+        self.counts = {"fanouts": 0, "messages": 0, "failed": 0, "rate_limited": 0}
+
+    def chat_limiter(self, chat_id):
+        with self.lock:
+            if chat_id not in self.chat_limiters:
+                self.chat_limiters[chat_id] = RateLimiter(self.chat_per_second, 1.0)
+            return self.chat_limiters[chat_id]
+
+    def deliver(self, chat_id, text):
+        limiter = self.chat_limiter(chat_id)
+        for attempt in range(self.max_retries + 1):
+            limiter.acquire()
+            self.global_limiter.acquire()
+            try:
+                result = self.send(chat_id, text)
+            except Exception as e:
+                logger.error(f"Error sending alert to {chat_id}: {e}")
+                return False
+            if isinstance(result, bool):
+                return result
+            with self.lock:
+                self.counts["rate_limited"] += 1
+            logger.warning(f"Telegram rate limited chat {chat_id}; retrying in {result:.1f}s")
+            time.sleep(result)
+        return False
+
+    def dispatch(self, messages):
+        """Send (chat_id, text) messages concurrently. Returns chat_id -> delivered."""
+        if not messages:
+            return {}
+        started = time.perf_counter()
+        futures = {chat_id: self.executor.submit(self.deliver, chat_id, text) for chat_id, text in messages}
+        results = {chat_id: future.result() for chat_id, future in futures.items()}
+        elapsed = time.perf_counter() - started
+        failed = sum(1 for ok in results.values() if not ok)
+        with self.lock:
+            self.durations.append(elapsed)
+            self.counts["fanouts"] += 1
+            self.counts["messages"] += len(results)
+            self.counts["failed"] += failed
+        logger.info(f"Alert fanned out to {len(results)} chats in {elapsed * 1000:.0f}ms ({failed} failed)")
+        return results
+
+    def stats(self):
+        with self.lock:
+            durations = list(self.durations)
+            return dict(
+                self.counts,
+                p50_ms=percentile(durations, 50) * 1000 if durations else None,
+                p95_ms=percentile(durations, 95) * 1000 if durations else None,
+            )
+
+    def stop(self):
+        self.executor.shutdown(wait=False)
@@ -4,24 +4,42 @@ import requests
 import json
 import os
 import sqlite3
-import psutil
 import argparse
 import webbrowser
 import subprocess
 import platform
 from datetime import datetime, timedelta
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException, StaleElementReferenceException, NoSuchElementException
 import logging
 import threading
 from pathlib import Path
 import sys
 import io
+import contextlib
+import weakref
+import latency
+import adaptive_schedule
+import priority_windows
+import deadline_scheduler
+import worker_pool
+import cluster
+import alert_state
+import driver_cache
+import log_setup
+import snapshots
+import html_extract
+import page_fingerprint
+import resident_page
+import selector_cache
+import engine_controller
+import inventory
+import booking_browser
+import recovery
+import hang_watchdog
+import aimd_interval
+import subscribers
+import check_log
+import evidence
+from rate_limit import RateLimiter
 
 try:
     sys.stdout.reconfigure(encoding='utf-8')
@@ -38,11 +56,11 @@ except ImportError:
     print("dotenv not installed. Environment variables must be set manually.")
 
 # Configuration
-URL = "https://book-ourcampus.securerc.co.uk/onlineleasing/ourcampus-amsterdam-diemen/floorplans.aspx"
+URL = os.getenv("MONITOR_URL", "https://book-ourcampus.securerc.co.uk/onlineleasing/ourcampus-amsterdam-diemen/floorplans.aspx")
 
-# SPEED MODE: Ultra-fast checking intervals
-SPEED_MODE_INTERVAL_MIN = 0.5  # 500ms minimum
-SPEED_MODE_INTERVAL_MAX = 1.5  # 1.5s maximum
+# SPEED MODE: Ultra-fast checking, adapted to the site's latency and error rate (aimd_interval.py)
+SPEED_MODE_INTERVAL_MIN = float(os.getenv("SPEED_MODE_INTERVAL_MIN", 0.5))  # floor while the site is healthy
+SPEED_MODE_INTERVAL_MAX = float(os.getenv("SPEED_MODE_INTERVAL_MAX", 10))  # ceiling while it is degraded
 
 # Time window configurations with sensible defaults (can be overridden via .env)
 HIGH_PRIORITY_MIN = int(os.getenv("HIGH_PRIORITY_MIN", 20))  # seconds
@@ -52,7 +70,11 @@ MEDIUM_PRIORITY_MAX = int(os.getenv("MEDIUM_PRIORITY_MAX", 75))  # seconds
 NORMAL_CHECK_INTERVAL_MIN = int(os.getenv("NORMAL_CHECK_INTERVAL_MIN", 1))  # minutes
 NORMAL_CHECK_INTERVAL_MAX = int(os.getenv("NORMAL_CHECK_INTERVAL_MAX", 4))  # minutes
 
-# Define priority time windows
+# Priority windows are read from this file (reloaded when it changes); the lists below are used if it is missing
+PRIORITY_WINDOWS_FILE = os.getenv("PRIORITY_WINDOWS_FILE", "priority_windows.json")
+PROPERTY_NAME = os.getenv("PROPERTY_NAME", "ourcampus-amsterdam-diemen")
+
+# Default priority time windows
 HIGH_PRIORITY_WINDOWS = [
     {"day": 2, "start_hour": 12, "start_minute": 0, "end_hour": 15, "end_minute": 30},  # Wednesday 12pm-3:30pm
 ]
@@ -64,6 +86,27 @@ MEDIUM_PRIORITY_WINDOWS = [
     {"day": 4, "start_hour": 13, "start_minute": 0, "end_hour": 19, "end_minute": 0},  # Friday 1pm-7pm
 ]
 
+# Scheduler mode: "windows" (priority windows above) or "adaptive" (learned from availability history)
+SCHEDULER_MODE = os.getenv("SCHEDULER_MODE", "windows").lower()
+ADAPTIVE_CHECKS_PER_DAY = int(os.getenv("ADAPTIVE_CHECKS_PER_DAY", 1000))  # check budget
+ADAPTIVE_LOOKBACK_DAYS = int(os.getenv("ADAPTIVE_LOOKBACK_DAYS", 90))  # history used for the profile
+ADAPTIVE_SMOOTHING_MINUTES = int(os.getenv("ADAPTIVE_SMOOTHING_MINUTES", 30))  # +/- minutes
+ADAPTIVE_PRIOR_WEIGHT = float(os.getenv("ADAPTIVE_PRIOR_WEIGHT", 0.1))  # share of checks spread uniformly
+ADAPTIVE_ALLOCATION_EXPONENT = float(os.getenv("ADAPTIVE_ALLOCATION_EXPONENT", 1.0))  # 0.5 minimises mean delay
+ADAPTIVE_RECOMPUTE_HOUR = int(os.getenv("ADAPTIVE_RECOMPUTE_HOUR", 3))  # nightly recompute after this hour
+
+# Worker pool: phase-staggered browsers that only grow inside priority windows
+WORKER_POOL_SIZE = int(os.getenv("WORKER_POOL_SIZE", 1))  # 1 = single browser (no pool)
+WORKER_POOL_MIN_PRIORITY = os.getenv("WORKER_POOL_MIN_PRIORITY", "high").lower()  # grow from this priority up
+WORKER_POOL_MAX_REQUESTS_PER_MINUTE = int(os.getenv("WORKER_POOL_MAX_REQUESTS_PER_MINUTE", 20))  # hard cap
+
+# Cluster mode: nodes sharing a coordination database split the schedule and elect one alerting leader
+CLUSTER_DB_PATH = os.getenv("CLUSTER_DB_PATH", "")  # e.g. /shared/ourcampus_cluster.db; empty = single node
+CLUSTER_NODE_ID = os.getenv("CLUSTER_NODE_ID") or None  # defaults to hostname-pid
+CLUSTER_HEARTBEAT_SECONDS = float(os.getenv("CLUSTER_HEARTBEAT_SECONDS", 1))
+CLUSTER_LEASE_SECONDS = float(os.getenv("CLUSTER_LEASE_SECONDS", 5))  # leader takeover time
+CLUSTER_SLOT_JITTER = float(os.getenv("CLUSTER_SLOT_JITTER", 0.5))  # how far into its slot a node's check may fall
+
 # Apartment booking URLs for speed mode
 APARTMENT_URLS = {
     "1 Person Apartment": "https://book-ourcampus.securerc.co.uk/onlineleasing/ourcampus-amsterdam-diemen/availableunits.aspx?myOlePropertyId=182358&MoveInDate=undefined&t=0.34374300842116357&floorPlans=1100004",
@@ -73,12 +116,88 @@ APARTMENT_URLS = {
 # Telegram notification settings
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
+TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")  # Overridable for local stand-ins
+
+# Alert fan-out to the subscribers table (TELEGRAM_CHAT_ID always gets every alert)
+FANOUT_WORKERS = int(os.getenv("FANOUT_WORKERS", 8))  # concurrent sends per alert
+TELEGRAM_GLOBAL_PER_SECOND = int(os.getenv("TELEGRAM_GLOBAL_PER_SECOND", 30))  # messages/second over all chats
+TELEGRAM_CHAT_PER_SECOND = int(os.getenv("TELEGRAM_CHAT_PER_SECOND", 1))  # messages/second to one chat
+
+# Open booking pages in a new browser when speed mode finds apartments
+AUTO_OPEN_BROWSER = os.getenv("AUTO_OPEN_BROWSER", "true").lower() == "true"
+
+# Pre-launched booking browser for speed mode: "off", "startup" or "priority" (launched when a
+# priority window of at least BOOKING_BROWSER_MIN_PRIORITY opens); booking pages open in it via DevTools
+BOOKING_BROWSER = os.getenv("BOOKING_BROWSER", "off").lower()
+BOOKING_BROWSER_MIN_PRIORITY = os.getenv("BOOKING_BROWSER_MIN_PRIORITY", "high").lower()
+BOOKING_BROWSER_PORT = int(os.getenv("BOOKING_BROWSER_PORT", 9223))  # DevTools port, bound to localhost
+BOOKING_BROWSER_PROFILE = os.getenv("BOOKING_BROWSER_PROFILE", os.path.join(os.getenv("DB_DIR", "data"), "booking_profile"))
+
+# Resolved ChromeDriver path and Chrome version, re-validated with a stat() on every browser start
+DRIVER_CACHE_PATH = os.getenv("DRIVER_CACHE_PATH", os.path.join(os.getenv("DB_DIR", "data"), "driver_cache.json"))
+
+# Learned order of the floor plan tab selectors (most recently working first)
+SELECTOR_CACHE_PATH = os.getenv("SELECTOR_CACHE_PATH", os.path.join(os.getenv("DB_DIR", "data"), "selector_cache.json"))
 
 # Database settings
 DB_DIR = os.getenv("DB_DIR", "data")
 DB_FILE = os.getenv("DB_FILE", "apartment_history.db")
 DATABASE_PATH = os.path.join(DB_DIR, DB_FILE)
 
+# Page snapshots (floorPlanDataContainer HTML, stored once per distinct content) for offline replay
+SNAPSHOT_RECORDING = os.getenv("SNAPSHOT_RECORDING", "false").lower() == "true"
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", os.path.join(os.getenv("DB_DIR", "data"), "snapshots"))
+
+# Check engines, routed to the fastest healthy one (engine_controller.py):
+# selenium (check_availability), speed, page_source, resident, http
+CHECK_ENGINES = os.getenv("CHECK_ENGINES", "selenium")  # e.g. selenium,speed,page_source,resident,http
+SPEED_CHECK_ENGINES = os.getenv("SPEED_CHECK_ENGINES", "speed")  # e.g. speed,page_source,resident,http
+ENGINE_PROBE_SECONDS = int(os.getenv("ENGINE_PROBE_SECONDS", 60))  # canary check interval for demoted engines
+
+# Failure recovery (recovery.py): per-class backoff, then a circuit breaker after repeated failures
+RECOVERY_FAILURE_THRESHOLD = int(os.getenv("RECOVERY_FAILURE_THRESHOLD", 5))  # consecutive failures that open the circuit
+RECOVERY_OPEN_SECONDS = int(os.getenv("RECOVERY_OPEN_SECONDS", 60))  # first pause while open, doubling up to 10 minutes
+
+# Detection evidence (evidence.py): FP_Detail pane HTML and screenshot per transition, captured after the alert
+EVIDENCE_CAPTURE = os.getenv("EVIDENCE_CAPTURE", "true").lower() == "true"
+EVIDENCE_DIR = os.getenv("EVIDENCE_DIR", os.path.join(os.getenv("DB_DIR", "data"), "evidence"))
+EVIDENCE_MAX_MB = int(os.getenv("EVIDENCE_MAX_MB", 200))  # oldest captures are deleted above this total
+EVIDENCE_SCREENSHOTS = os.getenv("EVIDENCE_SCREENSHOTS", "true").lower() == "true"
+EVIDENCE_CAPTURE_SECONDS = int(os.getenv("EVIDENCE_CAPTURE_SECONDS", 20))  # watchdog deadline of one capture
+
+# Speed mode check log (check_log.py): binary records, bulk-imported into availability_history
+CHECK_LOG_ENABLED = os.getenv("CHECK_LOG_ENABLED", "true").lower() == "true"
+CHECK_LOG_PATH = os.getenv("CHECK_LOG_PATH", os.path.join(os.getenv("DB_DIR", "data"), "speed_checks.log"))
+CHECK_LOG_CAPACITY = int(os.getenv("CHECK_LOG_CAPACITY", 262144))  # records (one per floor plan and check)
+CHECK_LOG_IMPORT_SECONDS = int(os.getenv("CHECK_LOG_IMPORT_SECONDS", 30))
+
+# Hang watchdog (hang_watchdog.py): wall-clock deadlines on check phases, killing a stuck browser
+WATCHDOG_ENABLED = os.getenv("WATCHDOG_ENABLED", "true").lower() == "true"
+WATCHDOG_CHECK_SECONDS = int(os.getenv("WATCHDOG_CHECK_SECONDS", 90))  # one check, including engine failover
+WATCHDOG_RESTART_SECONDS = int(os.getenv("WATCHDOG_RESTART_SECONDS", 60))  # scheduled browser restart
+WATCHDOG_DUMP_PATH = os.getenv("WATCHDOG_DUMP_PATH", os.path.join(os.getenv("DB_DIR", "data"), "stalls.log"))
+
+# Resident page engine: keep floorplans.aspx loaded and refresh its data with in-page fetches
+RESIDENT_RELOAD_EVERY = int(os.getenv("RESIDENT_RELOAD_EVERY", 50))  # full page reload after this many fetches
+
+# Skip extraction and database writes when the page content is unchanged since the last check
+CONTENT_SHORT_CIRCUIT = os.getenv("CONTENT_SHORT_CIRCUIT", "true").lower() == "true"
+CONTENT_CACHE_MAX_AGE = int(os.getenv("CONTENT_CACHE_MAX_AGE", 600))  # seconds; full check at least this often
+
+# Unit inventory (availableunits.aspx unit lists, fetched while a floor plan is available)
+INVENTORY_ENABLED = os.getenv("INVENTORY_ENABLED", "true").lower() == "true"
+INVENTORY_REFRESH_SECONDS = int(os.getenv("INVENTORY_REFRESH_SECONDS", 300))  # re-fetch while still available
+INVENTORY_TIMEOUT = float(os.getenv("INVENTORY_TIMEOUT", 10))  # per unit list request
+
+# Logging settings
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()  # "text" or "json" (JSON lines, log file only)
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))  # rotate the log file at this size
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", 5))  # rotated files to keep
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "")  # e.g. "midnight" to rotate by time instead of size
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")  # per-subsystem levels, e.g. "speed=WARNING,cluster=DEBUG"
+LOG_SAMPLE = os.getenv("LOG_SAMPLE", "speed=20")  # write every Nth hot-path INFO record
+
 # Health check settings
 HEALTH_CHECK_ENABLED = os.getenv("HEALTH_CHECK_ENABLED", "false").lower() == "true"
 HEALTH_CHECK_PORT = int(os.getenv("HEALTH_CHECK_PORT", 8080))
@@ -89,8 +208,37 @@ last_check_time = None
 next_check_time = None
 last_command_update_id = 0  # Track the last processed command ID
 health_metrics = {}  # For storing health metrics
+adaptive_scheduler = None  # Set when SCHEDULER_MODE is "adaptive"
+loop_scheduler = None  # Deadline scheduler of the running check loop
+cluster_node = None  # Set when CLUSTER_DB_PATH is configured
 speed_mode = False
 apartments_found_this_session = set()
+startup_metrics = {}  # Import and driver creation times, published with the runtime metrics
+startup_started = None  # perf_counter() at the start of main/speed mode, for time-to-first-check
+snapshot_recorder = None  # Set when SNAPSHOT_RECORDING is enabled
+inventory_tracker = None  # Set when INVENTORY_ENABLED is true
+booking_handoff = None  # Set when BOOKING_BROWSER is not "off"
+content_caches = {}  # Check engine -> page_fingerprint.ContentCache
+engine_floor_plans = {}  # Check engine -> extracted floor plans of its last full check, for log_engine_result
+engine_pages = {}  # Check engine -> container HTML of its last check, for capture_evidence
+resident_pages = weakref.WeakKeyDictionary()  # Driver -> resident_page.ResidentPage
+check_engines = None  # engine_controller.EngineController of the running check loop
+http_session = None  # Shared requests session of the http check engine
+check_recovery = None  # recovery.Recovery of the running check loop
+check_watchdog = None  # hang_watchdog.Watchdog of the running check loop
+speed_interval = None  # aimd_interval.AimdInterval of speed mode
+alert_fanout = None  # subscribers.FanOut, created on the first alert
+speed_check_log = None  # check_log.CheckLog of speed mode, set when CHECK_LOG_ENABLED is true
+check_log_importer = None  # check_log.CheckLogImporter of speed_check_log
+evidence_store = None  # evidence.EvidenceStore, set when EVIDENCE_CAPTURE is true
+booking_handoff_checked = 0  # time.time() the booking browser was last checked
+
+# Selenium is imported on first use by load_selenium(), so paths that never start a browser skip it
+webdriver = By = Options = Service = WebDriverWait = EC = None
+TimeoutException = WebDriverException = StaleElementReferenceException = NoSuchElementException = None
+
+class CheckError(Exception):
+    """A check could not read the floor plans (raised so the engine controller can fail over)."""
 
 # Create necessary directories
 os.makedirs("logs", exist_ok=True)
@@ -102,16 +250,30 @@ if sys.platform.startswith('win'):
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
-# Set up logging (console and file) with Windows-compatible encoding
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler(f"logs/watch_units_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log", encoding='utf-8')
-    ]
+# Set up logging (console and rotating file) through a background queue listener
+log_setup.setup_logging(
+    log_dir="logs",
+    level=LOG_LEVEL,
+    log_format=LOG_FORMAT,
+    max_bytes=LOG_MAX_BYTES,
+    backup_count=LOG_BACKUP_COUNT,
+    rotate_when=LOG_ROTATE_WHEN,
+    levels=LOG_LEVELS,
+    sample=LOG_SAMPLE,
 )
 logger = logging.getLogger(__name__)
+speed_logger = logging.getLogger("speed")  # Per-check speed mode messages, sampled with LOG_SAMPLE
+
+# Floor plan tab lookups try the selector that worked last time first
+tab_selectors = selector_cache.SelectorCache(SELECTOR_CACHE_PATH)
+
+# Compile priority windows into a minute-of-week lookup table
+priority_schedule = priority_windows.PriorityWindows(
+    PRIORITY_WINDOWS_FILE,
+    PROPERTY_NAME,
+    APARTMENT_URLS.keys(),
+    default_windows=priority_windows.windows_from_legacy(HIGH_PRIORITY_WINDOWS, MEDIUM_PRIORITY_WINDOWS),
+)
 
 # List of user agents to rotate
 USER_AGENTS = [
@@ -127,6 +289,10 @@ def init_database():
     conn = sqlite3.connect(DATABASE_PATH, check_same_thread=False)
     c = conn.cursor()
     
+    # Write-ahead log: readers (the health check) never block writes, and an interrupted write is rolled back
+    c.execute("PRAGMA journal_mode=WAL")
+    c.execute("PRAGMA synchronous=NORMAL")
+    
     # Create availability history table
     c.execute('''
     CREATE TABLE IF NOT EXISTS availability_history (
@@ -135,16 +301,23 @@ def init_database():
         apartment_type TEXT,
         availability_text TEXT,
         button_text TEXT,
-        available INTEGER
+        available INTEGER,
+        latency_ms REAL
     )
     ''')
     
+    # Older databases have an availability history table without the check latency
+    columns = [row[1] for row in c.execute("PRAGMA table_info(availability_history)")]
+    if "latency_ms" not in columns:
+        c.execute("ALTER TABLE availability_history ADD COLUMN latency_ms REAL")
+    
     # Create notifications table
     c.execute('''
     CREATE TABLE IF NOT EXISTS notifications (
         timestamp TEXT,
         message TEXT,
-        sent_successfully INTEGER
+        sent_successfully INTEGER,
+        correlation_id TEXT
     )
     ''')
     
@@ -170,6 +343,36 @@ def init_database():
     )
     ''')
     
+    # Create alert latency table (links alerts to the checks that triggered them)
+    latency.init_latency_table(conn)
+    
+    # Create adaptive schedule profile table
+    adaptive_schedule.init_profile_table(conn)
+    
+    # Create alert state and ledger tables (what has already been alerted on, kept across restarts)
+    alert_state.init_alert_state_table(conn)
+    
+    # Create check engine switch table
+    engine_controller.init_engine_switches_table(conn)
+    
+    # Create recovery incident table (time from first failure to the next successful check)
+    recovery.init_recovery_table(conn)
+    
+    # Create alert subscriber table (chat IDs with floor plan filters)
+    subscribers.init_subscribers_table(conn)
+    
+    # Create unit inventory and unit history tables
+    inventory.init_inventory_tables(conn)
+    
+    # Create runtime metrics table (latest value of each loop metric, read by the health check server)
+    c.execute('''
+    CREATE TABLE IF NOT EXISTS runtime_metrics (
+        name TEXT PRIMARY KEY,
+        value REAL,
+        updated_at TEXT
+    )
+    ''')
+    
     conn.commit()
     return conn
 
@@ -182,14 +385,15 @@ def log_availability(conn, check_id, apartment_type, availability_text, button_t
         c = conn.cursor()
         timestamp = datetime.now().isoformat()
         c.execute(
-            "INSERT INTO availability_history VALUES (?, ?, ?, ?, ?, ?)",
+            "INSERT INTO availability_history (timestamp, check_id, apartment_type, availability_text, button_text, available) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
             (timestamp, check_id, apartment_type, availability_text, button_text, 1 if available else 0)
         )
         conn.commit()
     except Exception as e:
         logger.error(f"Error logging availability: {e}")
 
-def log_notification(conn, message, sent_successfully):
+def log_notification(conn, message, sent_successfully, correlation_id=None):
     """Log notification to database."""
     if not conn:
         return
@@ -198,8 +402,8 @@ def log_notification(conn, message, sent_successfully):
         c = conn.cursor()
         timestamp = datetime.now().isoformat()
         c.execute(
-            "INSERT INTO notifications VALUES (?, ?, ?)",
-            (timestamp, message, 1 if sent_successfully else 0)
+            "INSERT INTO notifications (timestamp, message, sent_successfully, correlation_id) VALUES (?, ?, ?, ?)",
+            (timestamp, message, 1 if sent_successfully else 0, correlation_id)
         )
         conn.commit()
     except Exception as e:
@@ -241,6 +445,8 @@ def log_health_metrics(conn):
         return
     
     try:
+        import psutil  # Deferred: only needed once health metrics are logged
+        
         c = conn.cursor()
         timestamp = datetime.now().isoformat()
         
@@ -282,8 +488,192 @@ def log_health_metrics(conn):
     except Exception as e:
         logger.error(f"Error logging health metrics: {e}")
 
+def publish_runtime_metrics(conn, metrics):
+    """Store the latest loop metrics so the health check server can expose them."""
+    if not conn:
+        return
+    
+    try:
+        c = conn.cursor()
+        timestamp = datetime.now().isoformat()
+        c.executemany(
+            "INSERT OR REPLACE INTO runtime_metrics VALUES (?, ?, ?)",
+            [(name, value, timestamp) for name, value in metrics.items()]
+        )
+        conn.commit()
+    except Exception as e:
+        logger.error(f"Error publishing runtime metrics: {e}")
+
+def quit_driver(driver):
+    """Quit a driver, ignoring errors from a browser that is already gone."""
+    if not driver:
+        return
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.warning(f"Error quitting driver: {e}")
+
+def load_selenium():
+    """Import Selenium into the module globals on first use and record how long it took."""
+    global webdriver, By, Options, Service, WebDriverWait, EC
+    global TimeoutException, WebDriverException, StaleElementReferenceException, NoSuchElementException
+    
+    if webdriver is not None:
+        return
+    
+    started = time.perf_counter()
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException, WebDriverException, StaleElementReferenceException, NoSuchElementException
+    startup_metrics["selenium_import_seconds"] = time.perf_counter() - started
+    logger.info(f"Selenium imported in {startup_metrics['selenium_import_seconds']:.2f}s")
+
+def install_chromedriver():
+    """Download or locate a matching ChromeDriver with webdriver_manager (slow; only on a cache miss)."""
+    started = time.perf_counter()
+    from webdriver_manager.chrome import ChromeDriverManager
+    startup_metrics["webdriver_manager_import_seconds"] = time.perf_counter() - started
+    return ChromeDriverManager().install()
+
+def resolve_chromedriver():
+    """ChromeDriver binary to use: CHROMEDRIVER_PATH, then the driver cache, then webdriver_manager or common paths."""
+    chromedriver_path = os.getenv("CHROMEDRIVER_PATH")
+    if chromedriver_path and os.path.exists(chromedriver_path):
+        return chromedriver_path
+    
+    started = time.perf_counter()
+    path, cache_hit = driver_cache.resolve(
+        DRIVER_CACHE_PATH,
+        install=install_chromedriver,
+        fallback_paths=["/usr/bin/chromedriver", "/usr/local/bin/chromedriver"],
+    )
+    startup_metrics["driver_resolve_seconds"] = time.perf_counter() - started
+    startup_metrics["driver_cache_hit"] = 1 if cache_hit else 0
+    return path
+
+def start_snapshot_recorder():
+    """Start the snapshot recorder if SNAPSHOT_RECORDING is enabled."""
+    global snapshot_recorder
+    if SNAPSHOT_RECORDING:
+        snapshot_recorder = snapshots.SnapshotRecorder(SNAPSHOT_DIR)
+        logger.info(f"Recording page snapshots to {SNAPSHOT_DIR}")
+
+def record_snapshot(driver, source, check_id=None):
+    """Hand the current container HTML to the snapshot recorder (one extra WebDriver call when enabled)."""
+    if not snapshot_recorder:
+        return
+    try:
+        container = driver.find_element(By.ID, "floorPlanDataContainer")
+        snapshot_recorder.record(container.get_attribute("outerHTML"), source, check_id)
+    except Exception as e:
+        logger.warning(f"Could not record page snapshot: {e}")
+
+def start_evidence_store():
+    """Start the evidence writer if EVIDENCE_CAPTURE is enabled."""
+    global evidence_store
+    if not EVIDENCE_CAPTURE:
+        return
+    try:
+        evidence_store = evidence.EvidenceStore(
+            EVIDENCE_DIR, max_bytes=EVIDENCE_MAX_MB * 1024 * 1024, screenshots=EVIDENCE_SCREENSHOTS
+        )
+        logger.info(f"Detection evidence is stored in {EVIDENCE_DIR} (up to {EVIDENCE_MAX_MB} MB)")
+    except OSError as e:
+        logger.error(f"Error starting evidence capture: {e}")
+
+# Engines that leave the page they checked loaded in the driver; evidence for the others is their parsed HTML
+DRIVER_PAGE_ENGINES = (None, "selenium", "speed", "page_source")
+
+def capture_evidence(driver, apartments, correlation_id=None, check_id=None, engine=None):
+    """Capture the FP_Detail panes of newly available apartments. Call after the alert has been dispatched."""
+    if not evidence_store:
+        return
+    html = None if engine in DRIVER_PAGE_ENGINES else engine_pages.get(engine)
+    if html is None and (not driver or engine not in DRIVER_PAGE_ENGINES):
+        return
+    plan_ids = {apartment_type: plan_id for plan_id, apartment_type in html_extract.FLOOR_PLANS.items()}
+    detected = sorted(apartments)
+    try:
+        with watched("evidence", EVIDENCE_CAPTURE_SECONDS, driver if html is None else None):
+            evidence_store.capture(
+                driver,
+                [plan_ids[apt_type] for apt_type in sorted({html_extract.apartment_type(apt) for apt in detected})
+                 if apt_type in plan_ids],
+                {"correlation_id": correlation_id, "check_id": check_id, "engine": engine, "detected": detected},
+                show=lambda plan_id: show_floor_plan_tab(driver, plan_id),
+                html=html,
+            )
+    except hang_watchdog.StallError as e:
+        # The driver was killed; the next check fails on it and recovery restarts the browser
+        logger.error(f"Evidence capture stalled: {e}")
+
+def show_floor_plan_tab(driver, plan_id):
+    """Click the tab of a floor plan, if it can be found, so its pane is shown."""
+    tab = find_floor_plan_tab(driver, plan_id)
+    if tab:
+        tab.click()
+
+def content_cache(engine):
+    """The unchanged-page cache of a check engine, created on first use."""
+    if engine not in content_caches:
+        content_caches[engine] = page_fingerprint.ContentCache(CONTENT_CACHE_MAX_AGE)
+    return content_caches[engine]
+
+def lookup_content(engine, html):
+    """Fingerprint container HTML. Returns (fingerprint, previous result if the content is unchanged else None)."""
+    if html:
+        engine_pages[engine] = html
+    if not CONTENT_SHORT_CIRCUIT or not html:
+        return None, None
+    digest = page_fingerprint.fingerprint(html)
+    return digest, content_cache(engine).lookup(digest)
+
+def store_content(engine, digest, result, html):
+    """Remember the result of a full check for the next lookup_content."""
+    if CONTENT_SHORT_CIRCUIT and digest:
+        content_cache(engine).store(digest, result, html)
+
+def content_metrics():
+    """Unchanged-page hit counters of every check engine, as runtime metrics."""
+    return {
+        f"content.{engine}.{name}": value
+        for engine, cache in list(content_caches.items())
+        for name, value in cache.stats().items()
+    }
+
+def note_first_check():
+    """Log and record the time from startup to the first completed check (once per start)."""
+    if startup_started is None or "time_to_first_check_seconds" in startup_metrics:
+        return
+    startup_metrics["time_to_first_check_seconds"] = time.perf_counter() - startup_started
+    logger.info(f"Time to first check: {startup_metrics['time_to_first_check_seconds']:.2f}s")
+
+def create_chrome(chrome_options):
+    """Start Chrome with the resolved driver and record the driver creation time."""
+    load_selenium()
+    chromedriver_path = resolve_chromedriver()
+    
+    started = time.perf_counter()
+    if chromedriver_path:
+        driver = webdriver.Chrome(service=Service(chromedriver_path), options=chrome_options)
+        logger.info(f"Using ChromeDriver at {chromedriver_path}")
+    else:
+        # Let Selenium locate a driver itself
+        driver = webdriver.Chrome(options=chrome_options)
+        logger.info("Using default ChromeDriver")
+    elapsed = time.perf_counter() - started
+    
+    startup_metrics.setdefault("first_driver_seconds", elapsed)
+    startup_metrics["last_driver_seconds"] = elapsed
+    return driver
+
 def setup_driver(headless=True):
     """Setup Selenium WebDriver with flexible configurations. Works both locally and on servers."""
+    load_selenium()
     chrome_options = Options()
     
     if headless:
@@ -304,33 +694,8 @@ def setup_driver(headless=True):
     user_agent = random.choice(USER_AGENTS)
     chrome_options.add_argument(f"--user-agent={user_agent}")
     
-    # Get ChromeDriver path from environment (if set)
-    chromedriver_path = os.getenv("CHROMEDRIVER_PATH")
-    
     try:
-        # Try different approaches to create the driver
-        if chromedriver_path and os.path.exists(chromedriver_path):
-            # Use specified chromedriver path
-            driver = webdriver.Chrome(service=Service(chromedriver_path), options=chrome_options)
-            logger.info(f"Using specified ChromeDriver at {chromedriver_path}")
-        else:
-            try:
-                # Try to use webdriver manager
-                from webdriver_manager.chrome import ChromeDriverManager
-                driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-                logger.info("Using ChromeDriver from webdriver_manager")
-            except Exception as e:
-                logger.warning(f"Failed to use webdriver_manager: {e}. Trying common paths.")
-                # Try common Linux paths
-                for path in ["/usr/bin/chromedriver", "/usr/local/bin/chromedriver"]:
-                    if os.path.exists(path):
-                        driver = webdriver.Chrome(service=Service(path), options=chrome_options)
-                        logger.info(f"Using ChromeDriver from {path}")
-                        break
-                else:
-                    # Fallback to local chromedriver
-                    driver = webdriver.Chrome(options=chrome_options)
-                    logger.info("Using default ChromeDriver")
+        driver = create_chrome(chrome_options)
     except Exception as e:
         logger.error(f"Error creating Chrome driver: {e}")
         raise
@@ -342,6 +707,7 @@ def setup_driver(headless=True):
 
 def setup_speed_driver(headless=False):
     """Setup ultra-fast Chrome driver optimized for speed."""
+    load_selenium()
     chrome_options = Options()
     
     if headless:
@@ -377,7 +743,7 @@ def setup_speed_driver(headless=False):
     chrome_options.add_argument(f"--user-agent={user_agent}")
     
     try:
-        driver = webdriver.Chrome(options=chrome_options)
+        driver = create_chrome(chrome_options)
         logger.info("Speed-optimized ChromeDriver created")
     except Exception as e:
         logger.error(f"Error creating Chrome driver: {e}")
@@ -385,10 +751,31 @@ def setup_speed_driver(headless=False):
     
     # Ultra-short timeouts for speed
     driver.set_page_load_timeout(15)  # Slightly longer to allow JS to load
-    driver.implicitly_wait(3)  # Slightly longer for element finding
+    driver.implicitly_wait(0)  # Lookups never wait; tab_selectors polls explicitly when nothing matches yet
     
     return driver
 
+def ensure_booking_browser():
+    """Launch the booking browser in the background when BOOKING_BROWSER says it should be running."""
+    global booking_handoff, booking_handoff_checked
+    if BOOKING_BROWSER not in ("startup", "priority"):
+        return
+    if BOOKING_BROWSER == "priority":
+        min_level = priority_windows.PRIORITY_LEVELS[BOOKING_BROWSER_MIN_PRIORITY]
+        if priority_schedule.level() < min_level:
+            return
+    
+    # Checked every 30 seconds, so a closed booking browser is relaunched without slowing every check
+    if time.time() - booking_handoff_checked < 30:
+        return
+    booking_handoff_checked = time.time()
+    
+    if booking_handoff is None:
+        booking_handoff = booking_browser.BookingBrowser(BOOKING_BROWSER_PORT, BOOKING_BROWSER_PROFILE)
+    if not booking_handoff.is_ready():
+        logger.info("Launching booking browser for instant hand-off")
+        booking_handoff.start_in_background()
+
 def open_booking_page(apartment_type):
     """Open the apartment booking page in a NEW BROWSER INSTANCE (very noticeable)."""
     if apartment_type not in APARTMENT_URLS:
@@ -397,6 +784,25 @@ def open_booking_page(apartment_type):
     
     url = APARTMENT_URLS[apartment_type]
     
+    # Hand off to the pre-launched booking browser when it is running
+    if booking_handoff:
+        try:
+            handoff_seconds = booking_handoff.open(url)
+            logger.info(f"SUCCESS: Opened {apartment_type} in the booking browser "
+                        f"(hand-off {handoff_seconds * 1000:.0f}ms)")
+            return True
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Booking browser hand-off failed: {e}, starting a new browser...")
+    
+    started = time.perf_counter()
+    opened = launch_booking_page(apartment_type, url)
+    if opened:
+        logger.info(f"New browser for {apartment_type} launched in {(time.perf_counter() - started) * 1000:.0f}ms "
+                    f"(the page appears once the browser has started)")
+    return opened
+
+def launch_booking_page(apartment_type, url):
+    """Open url in a new browser process, trying several browsers."""
     try:
         # Method 1: Use subprocess to start completely new browser instance
         system = platform.system().lower()
@@ -496,6 +902,20 @@ def wait_for_element(driver, by, selector, timeout=15, poll_frequency=0.3):
         logger.error(f"Element not found: {selector}")
         return None
 
+def floor_plan_tab_selectors(plan_id):
+    """Candidate selectors for a floor plan tab, from most to least specific."""
+    position = list(html_extract.FLOOR_PLANS).index(plan_id) + 1
+    return [
+        (By.CSS_SELECTOR, f"a[href='#FP_Detail_{plan_id}']"),
+        (By.XPATH, f"//a[contains(@href, '#FP_Detail_{plan_id}')]"),
+        (By.CSS_SELECTOR, f"li.FPTabLi:nth-child({position}) a"),
+        (By.XPATH, f"(//li[contains(@class, 'FPTabLi')]/a)[{position}]"),
+    ]
+
+def find_floor_plan_tab(driver, plan_id):
+    """The tab of a floor plan, or None. Tries the selector that worked last time first."""
+    return tab_selectors.find(driver, f"tab:{plan_id}", floor_plan_tab_selectors(plan_id))
+
 def safely_click(driver, element, retries=2):
     """Attempt to safely click an element with fewer retries for speed."""
     for attempt in range(retries):
@@ -533,52 +953,133 @@ def add_random_delay():
 def get_check_interval():
     """Determine check interval based on current time. Returns check interval in seconds with randomization."""
     now = datetime.now()
-    current_day = now.weekday()  # 0=Monday, 1=Tuesday, ..., 6=Sunday
-    current_hour = now.hour
-    current_minute = now.minute
-    
-    # Check if current time falls within any high priority window
-    for window in HIGH_PRIORITY_WINDOWS:
-        if (current_day == window["day"] and
-            (current_hour > window["start_hour"] or 
-             (current_hour == window["start_hour"] and current_minute >= window["start_minute"])) and
-            (current_hour < window["end_hour"] or
-             (current_hour == window["end_hour"] and current_minute <= window["end_minute"]))):
-            
-            # Randomize within high priority range
-            interval = random.randint(HIGH_PRIORITY_MIN, HIGH_PRIORITY_MAX)
-            logger.info(f"HIGH PRIORITY TIME WINDOW - checking every {interval} seconds")
-            return interval
-    
-    # Check if current time falls within any medium priority window
-    for window in MEDIUM_PRIORITY_WINDOWS:
-        if (current_day == window["day"] and
-            (current_hour > window["start_hour"] or 
-             (current_hour == window["start_hour"] and current_minute >= window["start_minute"])) and
-            (current_hour < window["end_hour"] or
-             (current_hour == window["end_hour"] and current_minute <= window["end_minute"]))):
-            
-            # Randomize within medium priority range
-            interval = random.randint(MEDIUM_PRIORITY_MIN, MEDIUM_PRIORITY_MAX) 
-            logger.info(f"MEDIUM PRIORITY TIME WINDOW - checking every {interval} seconds")
-            return interval
+    
+    # Adaptive mode: interval learned from availability history
+    if adaptive_scheduler and adaptive_scheduler.ready:
+        interval = adaptive_scheduler.interval(now)
+        likelihood = adaptive_scheduler.release_probability(now)
+        logger.info(f"ADAPTIVE SCHEDULE - checking every {interval} seconds (release likelihood {likelihood:.1f}x average)")
+        return interval
+    
+    # Look up the priority of the current minute (highest over all floor plans)
+    level = priority_schedule.level(now)
+    
+    if level == priority_windows.HIGH:
+        # Randomize within high priority range
+        interval = random.randint(HIGH_PRIORITY_MIN, HIGH_PRIORITY_MAX)
+        logger.info(f"HIGH PRIORITY TIME WINDOW - checking every {interval} seconds")
+        return interval
+    
+    if level == priority_windows.MEDIUM:
+        # Randomize within medium priority range
+        interval = random.randint(MEDIUM_PRIORITY_MIN, MEDIUM_PRIORITY_MAX) 
+        logger.info(f"MEDIUM PRIORITY TIME WINDOW - checking every {interval} seconds")
+        return interval
     
     # Otherwise use normal priority with randomized interval (in minutes, convert to seconds)
     interval = random.randint(NORMAL_CHECK_INTERVAL_MIN * 60, NORMAL_CHECK_INTERVAL_MAX * 60)
     logger.info(f"NORMAL PRIORITY TIME - checking every {interval//60} minutes")
     return interval
 
+def get_slot_length():
+    """Check interval for the current time without randomisation, the schedule slot length in cluster mode."""
+    now = datetime.now()
+    if adaptive_scheduler and adaptive_scheduler.ready:
+        return adaptive_scheduler.base_interval(now)
+    level = priority_schedule.level(now)
+    if level == priority_windows.HIGH:
+        return HIGH_PRIORITY_MIN
+    if level == priority_windows.MEDIUM:
+        return MEDIUM_PRIORITY_MIN
+    return NORMAL_CHECK_INTERVAL_MIN * 60
+
+def create_adaptive_scheduler():
+    """Build the adaptive scheduler from the ADAPTIVE_* settings."""
+    return adaptive_schedule.AdaptiveScheduler(
+        checks_per_day=ADAPTIVE_CHECKS_PER_DAY,
+        min_interval=HIGH_PRIORITY_MIN,
+        max_interval=NORMAL_CHECK_INTERVAL_MAX * 60,
+        lookback_days=ADAPTIVE_LOOKBACK_DAYS,
+        smoothing_minutes=ADAPTIVE_SMOOTHING_MINUTES,
+        prior_weight=ADAPTIVE_PRIOR_WEIGHT,
+        exponent=ADAPTIVE_ALLOCATION_EXPONENT,
+        recompute_hour=ADAPTIVE_RECOMPUTE_HOUR,
+    )
+
+def print_schedule_report():
+    """Print the expected detection delay bought by different daily check budgets."""
+    db_conn = init_database()
+    scheduler = create_adaptive_scheduler()
+    scheduler.recompute(db_conn)
+    
+    print(f"Adaptive schedule profile from {scheduler.transitions} releases in the last {ADAPTIVE_LOOKBACK_DAYS} days")
+    print(f"{'checks/day':>12} {'expected delay':>16}")
+    budgets = sorted({250, 500, 1000, 2000, 4000, 8000, ADAPTIVE_CHECKS_PER_DAY})
+    for budget in budgets:
+        marker = "  <- current budget" if budget == ADAPTIVE_CHECKS_PER_DAY else ""
+        print(f"{budget:>12} {scheduler.expected_delay(budget):>15.0f}s{marker}")
+    
+    db_conn.close()
+
+def start_speed_check_log(db_conn):
+    """Open the speed mode check log and start importing it into availability_history."""
+    global speed_check_log, check_log_importer
+    if not CHECK_LOG_ENABLED or not db_conn:
+        return
+    try:
+        speed_check_log = check_log.CheckLog(CHECK_LOG_PATH, CHECK_LOG_CAPACITY)
+    except (OSError, ValueError) as e:
+        logger.error(f"Error opening check log {CHECK_LOG_PATH}: {e}")
+        return
+    check_log_importer = check_log.CheckLogImporter(
+        speed_check_log, db_conn, html_extract.FLOOR_PLANS, import_interval=CHECK_LOG_IMPORT_SECONDS
+    ).start()
+    logger.info(f"Speed mode checks are logged to {CHECK_LOG_PATH} and imported every {CHECK_LOG_IMPORT_SECONDS}s")
+
+def log_speed_check(available_apartments, latency_seconds, floor_plans=None):
+    """Append one speed mode check to the check log (one record per floor plan).
+    
+    floor_plans (apartment type -> extracted button text) marks the floor plans the engine could not read
+    as unknown; without it every floor plan is available or unavailable.
+    """
+    if not speed_check_log:
+        return
+    available_types = set(available_apartments)
+    states = {}
+    for plan_id, apartment_type in html_extract.FLOOR_PLANS.items():
+        if apartment_type in available_types:
+            states[plan_id] = check_log.AVAILABLE
+        elif floor_plans is not None and not (floor_plans.get(apartment_type) or {}).get("button_text"):
+            states[plan_id] = check_log.UNKNOWN
+        else:
+            states[plan_id] = check_log.UNAVAILABLE
+    speed_check_log.append(states, latency_seconds * 1000)
+
+def stop_speed_check_log():
+    """Import what is left of the speed mode check log and close it."""
+    if check_log_importer:
+        check_log_importer.stop()
+    if speed_check_log:
+        speed_check_log.close()
+
 def get_speed_interval():
-    """Get check interval for speed mode."""
-    return random.uniform(SPEED_MODE_INTERVAL_MIN, SPEED_MODE_INTERVAL_MAX)
+    """Get check interval for speed mode, as chosen from recent latency and errors."""
+    if speed_interval is None:
+        return random.uniform(SPEED_MODE_INTERVAL_MIN, min(SPEED_MODE_INTERVAL_MAX, 1.5))
+    return speed_interval.next_interval()
+
+def new_check_id(suffix=None):
+    """Unique ID for a check, used to link history rows and alerts."""
+    check_id = datetime.now().strftime('%Y%m%d%H%M%S')
+    return f"{check_id}-{suffix}" if suffix is not None else check_id
 
-def check_availability(driver, db_conn):
+def check_availability(driver, db_conn, check_id=None):
     """Check for apartment availability on the website with improved speed."""
     global last_check_time
     
     logger.info("Checking for apartment availability...")
     last_check_time = datetime.now()  # Update the last check time
-    check_id = datetime.now().strftime('%Y%m%d%H%M%S')  # Unique ID for this check
+    check_id = check_id or new_check_id()  # Unique ID for this check
     
     try:
         # Load the page directly
@@ -589,28 +1090,22 @@ def check_availability(driver, db_conn):
         if not container:
             logger.error("Main container not found - page may have changed structure")
             update_stats(db_conn, error=True)
-            return []
+            raise CheckError("floorPlanDataContainer not found")
         
-        apartments_available = []
+        # Unchanged since the last check: reuse its result without tab clicks or database writes
+        container_html = container.get_attribute("outerHTML") if CONTENT_SHORT_CIRCUIT else None
+        digest, unchanged = lookup_content("selenium", container_html)
+        if unchanged is not None:
+            logger.info("Page unchanged since the last check")
+            return unchanged
         
-        # Try multiple selectors in order of specificity
-        tab_selector_options = [
-            {"by": By.CSS_SELECTOR, "selector": "a[href='#FP_Detail_1100004']"},
-            {"by": By.XPATH, "selector": "//a[contains(@href, '#FP_Detail_1100004')]"},
-            {"by": By.XPATH, "selector": "//li[contains(@class, 'FPTabLi')]/a[1]"}
-        ]
+        apartments_available = []
+        extraction_failed = False
         
         # Check the first apartment type (1 Person)
         try:
-            # Try different selectors until one works
-            one_person_tab = None
-            for selector_option in tab_selector_options:
-                try:
-                    one_person_tab = driver.find_element(selector_option["by"], selector_option["selector"])
-                    if one_person_tab:
-                        break
-                except NoSuchElementException:
-                    continue
+            # The selector that worked last time is tried first
+            one_person_tab = find_floor_plan_tab(driver, "1100004")
             
             if not one_person_tab:
                 raise Exception("Could not find 1-person apartment tab")
@@ -644,29 +1139,16 @@ def check_availability(driver, db_conn):
                 apartments_available.append(f"1 Person Apartment - Button says: {button_text}")
         except Exception as e:
             logger.error(f"Error checking 1-person apartment: {e}")
+            extraction_failed = True
             threading.Thread(
                 target=log_availability,
                 args=(db_conn, check_id, "1 Person Apartment", "Error", "Error", False)
             ).start()
         
-        # Reset selectors for the second apartment type
-        tab_selector_options = [
-            {"by": By.CSS_SELECTOR, "selector": "a[href='#FP_Detail_1100005']"},
-            {"by": By.XPATH, "selector": "//a[contains(@href, '#FP_Detail_1100005')]"},
-            {"by": By.XPATH, "selector": "//li[contains(@class, 'FPTabLi')]/a[2]"}
-        ]
-        
         # Check the second apartment type (2 Person)
         try:
-            # Try different selectors until one works
-            two_person_tab = None
-            for selector_option in tab_selector_options:
-                try:
-                    two_person_tab = driver.find_element(selector_option["by"], selector_option["selector"])
-                    if two_person_tab:
-                        break
-                except NoSuchElementException:
-                    continue
+            # The selector that worked last time is tried first
+            two_person_tab = find_floor_plan_tab(driver, "1100005")
             
             if not two_person_tab:
                 raise Exception("Could not find 2-person apartment tab")
@@ -700,11 +1182,19 @@ def check_availability(driver, db_conn):
                 apartments_available.append(f"2 Person Apartment - Button says: {button_text}")
         except Exception as e:
             logger.error(f"Error checking 2-person apartment: {e}")
+            extraction_failed = True
             threading.Thread(
                 target=log_availability,
                 args=(db_conn, check_id, "2 Person Apartment", "Error", "Error", False)
             ).start()
         
+        record_snapshot(driver, "main", check_id)
+        if not extraction_failed:
+            store_content("selenium", digest, apartments_available, container_html)
+        elif not apartments_available:
+            threading.Thread(target=update_stats, args=(db_conn, False, True)).start()
+            raise CheckError("floor plan extraction incomplete")
+        
         # Update stats in a thread to avoid slowing down main execution
         threading.Thread(
             target=update_stats,
@@ -720,24 +1210,26 @@ def check_availability(driver, db_conn):
         
         return apartments_available
         
+    except CheckError:
+        raise
     except TimeoutException:
         logger.error("Timeout waiting for page to load")
         threading.Thread(target=update_stats, args=(db_conn, False, True)).start()
-        return []
+        raise
     except WebDriverException as e:
         logger.error(f"WebDriver error: {e}")
         threading.Thread(target=update_stats, args=(db_conn, False, True)).start()
-        return []
+        raise
     except Exception as e:
         logger.error(f"Unexpected error during availability check: {e}")
         threading.Thread(target=update_stats, args=(db_conn, False, True)).start()
-        return []
+        raise
 
 def check_availability_speed(driver):
     """Ultra-fast availability check optimized for speed."""
     global last_check_time
     
-    logger.info("SPEED: Checking apartments...")
+    speed_logger.info("SPEED: Checking apartments...")
     last_check_time = datetime.now()
     
     try:
@@ -752,24 +1244,30 @@ def check_availability_speed(driver):
         except TimeoutException:
             logger.warning("Container not found quickly, continuing anyway...")
         
+        # Unchanged since the last check: skip the tab clicks
+        container_html = None
+        if CONTENT_SHORT_CIRCUIT:
+            try:
+                container_html = driver.find_element(By.ID, "floorPlanDataContainer").get_attribute("outerHTML")
+            except NoSuchElementException:
+                pass
+        digest, unchanged = lookup_content("speed", container_html)
+        if unchanged is not None:
+            speed_logger.info("SPEED: Page unchanged")
+            return unchanged
+        
         apartments_available = []
+        extraction_failed = False
+        floor_plans = engine_floor_plans["speed"] = {}
         
         # Check 1 Person Apartment - try multiple approaches
         try:
-            # Wait a bit for JavaScript to load the tabs
-            time.sleep(0.5)
-            
-            # Try multiple selectors for the first tab
-            tab1 = None
-            for selector in ["a[href='#FP_Detail_1100004']", "li.FPTabLi:first-child a", ".FPTabLi a"]:
-                try:
-                    tab1 = driver.find_element(By.CSS_SELECTOR, selector)
-                    break
-                except NoSuchElementException:
-                    continue
+            # Polls until JavaScript has rendered the tabs, trying the selector that worked last time first
+            tab1 = find_floor_plan_tab(driver, "1100004")
             
             if not tab1:
                 logger.warning("Could not find 1P apartment tab")
+                extraction_failed = True
             else:
                 # Click first tab
                 driver.execute_script("arguments[0].click();", tab1)
@@ -779,27 +1277,23 @@ def check_availability_speed(driver):
                 button = driver.find_element(By.XPATH, "//div[@id='FP_Detail_1100004']//button[contains(@class, 'btn')]")
                 button_text = button.text.strip()
                 
-                logger.info(f"1P: '{button_text}'")
+                speed_logger.info(f"1P: '{button_text}'")
+                floor_plans["1 Person Apartment"] = {"availability_text": None, "button_text": button_text}
                 
                 if button_text and button_text not in ["CONTACT US", "Contact Us"]:
                     apartments_available.append("1 Person Apartment")
                     
         except Exception as e:
             logger.warning(f"Error checking 1P: {e}")
+            extraction_failed = True
         
         # Check 2 Person Apartment
         try:
-            # Try multiple selectors for the second tab
-            tab2 = None
-            for selector in ["a[href='#FP_Detail_1100005']", "li.FPTabLi:nth-child(2) a", ".FPTabLi:nth-child(2) a"]:
-                try:
-                    tab2 = driver.find_element(By.CSS_SELECTOR, selector)
-                    break
-                except NoSuchElementException:
-                    continue
+            tab2 = find_floor_plan_tab(driver, "1100005")
             
             if not tab2:
                 logger.warning("Could not find 2P apartment tab")
+                extraction_failed = True
             else:
                 # Click second tab
                 driver.execute_script("arguments[0].click();", tab2)
@@ -809,27 +1303,356 @@ def check_availability_speed(driver):
                 button = driver.find_element(By.XPATH, "//div[@id='FP_Detail_1100005']//button[contains(@class, 'btn')]")
                 button_text = button.text.strip()
                 
-                logger.info(f"2P: '{button_text}'")
+                speed_logger.info(f"2P: '{button_text}'")
+                floor_plans["2 Person Apartment"] = {"availability_text": None, "button_text": button_text}
                 
                 if button_text and button_text not in ["CONTACT US", "Contact Us"]:
                     apartments_available.append("2 Person Apartment")
                     
         except Exception as e:
             logger.warning(f"Error checking 2P: {e}")
+            extraction_failed = True
+        
+        record_snapshot(driver, "speed")
+        if not extraction_failed:
+            store_content("speed", digest, apartments_available, container_html)
+        elif not apartments_available:
+            raise CheckError("floor plan extraction incomplete")
         
         return apartments_available
         
     except Exception as e:
         logger.error(f"Speed check error: {e}")
-        return []
+        raise
+
+def extract_available(html, source, engine):
+    """Run the single-pass extractor over a whole page and return the available apartment types."""
+    floor_plans = html_extract.extract_floor_plans(html)
+    if not floor_plans:
+        raise CheckError(f"{source}: no floor plans in page")
+    engine_floor_plans[engine] = floor_plans
+    for apartment_type in html_extract.FLOOR_PLANS.values():
+        if apartment_type not in floor_plans:
+            logger.warning(f"{source}: {apartment_type} not found in page")
+        else:
+            speed_logger.info(f"{source}: {apartment_type} '{floor_plans[apartment_type]['button_text']}'")
+    return html_extract.available_apartments(floor_plans)
 
-def send_telegram_notification(message, db_conn=None):
+def check_availability_page_source(driver):
+    """Availability check that reads driver.page_source once and extracts every floor plan in one pass.
+    
+    Avoids the per-element WebDriver round trips of check_availability_speed; returns the same apartment types.
+    """
+    global last_check_time
+    
+    speed_logger.info("PAGE SOURCE: Checking apartments...")
+    last_check_time = datetime.now()
+    
+    try:
+        driver.get(URL)
+        try:
+            WebDriverWait(driver, 8).until(
+                EC.presence_of_element_located((By.ID, "floorPlanDataContainer"))
+            )
+        except TimeoutException:
+            logger.warning("Container not found quickly, continuing anyway...")
+        
+        html = driver.page_source
+        container_html = page_fingerprint.container_html(html)
+        digest, unchanged = lookup_content("page_source", container_html)
+        if unchanged is not None:
+            speed_logger.info("PAGE SOURCE: Page unchanged")
+            return unchanged
+        
+        available = extract_available(html, "PAGE SOURCE", "page_source")
+        store_content("page_source", digest, available, container_html)
+        return available
+    except Exception as e:
+        logger.error(f"Page source check error: {e}")
+        raise
+
+def check_availability_resident(driver):
+    """Availability check on a page kept loaded in the driver: the floor plan data is re-fetched from inside
+    the page instead of reloading it, with a full reload on failure and every RESIDENT_RELOAD_EVERY checks.
+    """
+    global last_check_time
+    
+    speed_logger.info("RESIDENT: Checking apartments...")
+    last_check_time = datetime.now()
+    
+    try:
+        page = resident_pages.get(driver)
+        if page is None:
+            page = resident_pages[driver] = resident_page.ResidentPage(driver, URL, RESIDENT_RELOAD_EVERY)
+        
+        container_html = page.container()
+        source = page.last[0]
+        if source == "fetch" and len(html_extract.extract_floor_plans(container_html)) < len(html_extract.FLOOR_PLANS):
+            # The served HTML lacks floor plans that the loaded page has (filled in by JavaScript)
+            logger.warning("RESIDENT: Fetched page is missing floor plans - reloading")
+            container_html = page.container(force_reload=True)
+            source = page.last[0]
+        if not container_html:
+            raise CheckError("RESIDENT: floorPlanDataContainer not found")
+        speed_logger.info(f"RESIDENT: {source} {page.last[1]} bytes in {page.last[2] * 1000:.0f}ms")
+        
+        digest, unchanged = lookup_content("resident", container_html)
+        if unchanged is not None:
+            return unchanged
+        
+        available = extract_available(container_html, "RESIDENT", "resident")
+        store_content("resident", digest, available, container_html)
+        return available
+    except Exception as e:
+        logger.error(f"Resident page check error: {e}")
+        raise
+
+def create_http_session():
+    """HTTP session for check_availability_http, with a browser user agent."""
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": random.choice(USER_AGENTS),
+        "Accept": "text/html,application/xhtml+xml",
+        "Accept-Language": "en-US,en;q=0.9",
+    })
+    return session
+
+def start_inventory_tracker(db_conn, notify):
+    """Start fetching unit lists for available floor plans, if INVENTORY_ENABLED."""
+    global inventory_tracker
+    if not INVENTORY_ENABLED:
+        return
+    session = create_http_session()
+    
+    def fetch(url):
+        response = session.get(url, timeout=INVENTORY_TIMEOUT)
+        response.raise_for_status()
+        return response.content
+    
+    inventory_tracker = inventory.InventoryTracker(
+        APARTMENT_URLS, fetch, db_conn, notify,
+        refresh_seconds=INVENTORY_REFRESH_SECONDS, max_workers=len(APARTMENT_URLS),
+    )
+
+def update_inventory(available_apartments):
+    """Hand a check result to the inventory tracker, which fetches unit lists in the background."""
+    if inventory_tracker:
+        inventory_tracker.update([apt.split(" - ")[0] for apt in available_apartments])
+
+def check_availability_http(session):
+    """Availability check without a browser: fetch floorplans.aspx over HTTP and extract it in one pass.
+    
+    Only works while the floor plan panes are part of the served HTML (not filled in by JavaScript).
+    """
+    global last_check_time
+    
+    speed_logger.info("HTTP: Checking apartments...")
+    last_check_time = datetime.now()
+    
+    try:
+        cache = content_cache("http")
+        response = session.get(URL, headers=cache.conditional_headers() if CONTENT_SHORT_CIRCUIT else None,
+                               timeout=10)
+        if response.status_code == 304:
+            unchanged = cache.hit()
+            if unchanged is not None:
+                speed_logger.info("HTTP: Not modified")
+                return unchanged
+            response = session.get(URL, timeout=10)  # the cached result has expired
+        response.raise_for_status()
+        
+        container_html = page_fingerprint.container_html(response.content)
+        digest, unchanged = lookup_content("http", container_html)
+        if unchanged is not None:
+            speed_logger.info("HTTP: Page unchanged")
+            cache.update_validators(response.headers)
+            return unchanged
+        
+        available = extract_available(response.content, "HTTP", "http")
+        store_content("http", digest, available, container_html)
+        cache.update_validators(response.headers)
+        return available
+    except Exception as e:
+        logger.error(f"HTTP check error: {e}")
+        raise
+
+ENGINE_NAMES = ("selenium", "speed", "page_source", "resident", "http")
+
+def parse_engine_names(value):
+    """Engine names from a comma-separated setting, dropping unknown ones."""
+    names = [name.strip().lower() for name in value.split(",") if name.strip()]
+    for name in names:
+        if name not in ENGINE_NAMES:
+            logger.warning(f"Unknown check engine '{name}' ignored (known: {', '.join(ENGINE_NAMES)})")
+    return [name for name in names if name in ENGINE_NAMES] or ["selenium"]
+
+def create_engine_controller(setting, db_conn):
+    """Engine controller for the check loop; switches are recorded in the engine_switches table."""
+    names = parse_engine_names(setting)
+    logger.info(f"Check engines: {', '.join(names)}")
+    return engine_controller.EngineController(
+        names,
+        on_switch=lambda previous, name, reason: threading.Thread(
+            target=engine_controller.record_switch, args=(db_conn, previous, name, reason)
+        ).start(),
+        probe_interval=ENGINE_PROBE_SECONDS,
+    )
+
+def get_http_session():
+    """The shared session of the http check engine, created on first use."""
+    global http_session
+    if http_session is None:
+        http_session = create_http_session()
+    return http_session
+
+def log_engine_result(db_conn, check_id, available_apartments, floor_plans):
+    """availability_history rows and stats for a check by an engine that does not write them itself.
+    
+    floor_plans maps apartment type -> extracted availability_text and button_text; a floor plan missing
+    from it is logged with button text "Unknown", like check_availability does.
+    """
+    available_types = {html_extract.apartment_type(apt) for apt in available_apartments}
+    for apartment_type in html_extract.FLOOR_PLANS.values():
+        plan = floor_plans.get(apartment_type) or {}
+        log_availability(db_conn, check_id, apartment_type, plan.get("availability_text"),
+                         plan.get("button_text") or "Unknown", apartment_type in available_types)
+    update_stats(db_conn, bool(available_apartments), False)
+
+def run_logged_engine(engine, check, db_conn, check_id):
+    """Run a single-result engine and log its result, unless the page was unchanged since the last check."""
+    cache = content_cache(engine)
+    hits = cache.hits
+    engine_floor_plans.pop(engine, None)
+    available = check()
+    if db_conn and cache.hits == hits:
+        threading.Thread(
+            target=log_engine_result, args=(db_conn, check_id, available, engine_floor_plans.get(engine, {}))
+        ).start()
+    return available
+
+def engine_runners(driver, db_conn=None, check_id=None, log_results=False):
+    """Callables running one check with each engine, bound to the current driver.
+    
+    With log_results, the engines that do not write availability_history themselves are logged like
+    check_availability, so the history (and the adaptive schedule) does not depend on the engine in use.
+    """
+    checks = {
+        "speed": lambda: check_availability_speed(driver),
+        "page_source": lambda: check_availability_page_source(driver),
+        "resident": lambda: check_availability_resident(driver),
+        "http": lambda: check_availability_http(get_http_session()),
+    }
+    runners = {"selenium": lambda: check_availability(driver, db_conn, check_id)}
+    for engine, check in checks.items():
+        if log_results:
+            runners[engine] = lambda engine=engine, check=check: run_logged_engine(engine, check, db_conn, check_id)
+        else:
+            runners[engine] = check
+    return runners
+
+def engine_metrics():
+    """Rolling health of every check engine, as runtime metrics."""
+    if not check_engines:
+        return {}
+    return {
+        f"engine.{engine}.{name}": value
+        for engine, stats in check_engines.stats().items()
+        for name, value in stats.items()
+        if value is not None
+    }
+
+def probe_engines(driver, engine):
+    """Canary check of a demoted or unmeasured engine if one is due, under its own watchdog deadline.
+    
+    Runs after the check result has been handled, so a canary does not delay the check or its alert.
+    """
+    if not check_engines:
+        return
+    try:
+        with watched("canary", WATCHDOG_CHECK_SECONDS, driver):
+            check_engines.probe(engine_runners(driver), exclude=engine)
+    except hang_watchdog.StallError as e:
+        # The driver was killed; the next check fails on it and recovery restarts the browser
+        logger.error(f"Canary check stalled: {e}")
+
+def create_check_recovery():
+    """Failure recovery of the check loop, from the RECOVERY_* settings."""
+    return recovery.Recovery(
+        failure_threshold=RECOVERY_FAILURE_THRESHOLD,
+        open_seconds=RECOVERY_OPEN_SECONDS,
+        max_open_seconds=max(RECOVERY_OPEN_SECONDS, 600),
+    )
+
+def note_check_success(db_conn, notify):
+    """Close the circuit after a successful check; stores the incident it ends, if any."""
+    incident = check_recovery.success()
+    if not incident:
+        return
+    threading.Thread(target=recovery.record_incident, args=(db_conn, incident)).start()
+    if incident["circuit_opened"]:
+        message = f"Recovered\n\n"
+        message += f"Checks are running again after {incident['recovery_seconds']:.0f}s "
+        message += f"({incident['failures']} failed attempts, first: {incident['failure_class']})."
+        threading.Thread(target=notify, args=(message,), daemon=True).start()
+
+def handle_check_failure(error, driver, make_driver, notify):
+    """Back off after a failed check as recovery decides, restarting the browser if it says so.
+    
+    Returns the driver to continue with, or None if the restart failed (the next check starts one).
+    A failed restart belongs to the failure already recorded: it is not counted or waited for again.
+    """
+    decision = check_recovery.failure(error)
+    if decision.circuit_opened:
+        message = f"Critical Error\n\n"
+        message += f"Encountered {check_recovery.consecutive} consecutive errors ({decision.failure_class}).\n"
+        message += f"Last error: {str(error)}\n\n"
+        message += f"Checks paused for {decision.delay:.0f}s, then retried."
+        threading.Thread(target=notify, args=(message,), daemon=True).start()
+    time.sleep(decision.delay)
+    if not decision.restart_browser and driver is not None:
+        return driver
+    try:
+        with watched("restart", WATCHDOG_RESTART_SECONDS, driver):
+            quit_driver(driver)
+            return make_driver()
+    except Exception as browser_error:
+        logger.error(f"Error restarting browser ({recovery.classify(browser_error)}): {browser_error}")
+        return None
+
+def start_check_watchdog():
+    """Start the hang watchdog of the check loop if WATCHDOG_ENABLED."""
+    global check_watchdog
+    if not WATCHDOG_ENABLED:
+        return
+    check_watchdog = hang_watchdog.Watchdog(dump_path=WATCHDOG_DUMP_PATH)
+    check_watchdog.start()
+    logger.info(f"Hang watchdog: {WATCHDOG_CHECK_SECONDS}s per check, {WATCHDOG_RESTART_SECONDS}s per browser restart")
+
+def watched(phase, seconds, driver=None):
+    """Deadline for a phase of the check loop (no-op with the watchdog disabled)."""
+    if not check_watchdog:
+        return contextlib.nullcontext()
+    return check_watchdog.phase(phase, seconds, driver, new_processes=phase == "restart")
+
+def recovery_metrics():
+    """Failure counts and circuit state of the check loop, as runtime metrics."""
+    if not check_recovery:
+        return {}
+    return {f"recovery.{name}": value for name, value in check_recovery.stats().items() if value is not None}
+
+def watchdog_metrics():
+    """Stall counts of the hang watchdog, as runtime metrics."""
+    if not check_watchdog:
+        return {}
+    return {f"watchdog.{name}": value for name, value in check_watchdog.stats().items()}
+
+def send_telegram_notification(message, db_conn=None, correlation_id=None):
     """Use a direct, simple HTTP request with minimal overhead."""
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
         logger.warning("Telegram notifications disabled: missing token or chat ID")
         return False
         
-    telegram_api_url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
+    telegram_api_url = f"{TELEGRAM_API_URL}/bot{TELEGRAM_TOKEN}/sendMessage"
     payload = {
         "chat_id": TELEGRAM_CHAT_ID,
         "text": message,
@@ -844,15 +1667,80 @@ def send_telegram_notification(message, db_conn=None):
         # Log to database outside of critical path
         if db_conn:
             threading.Thread(target=log_notification, 
-                           args=(db_conn, message, success)).start()
+                           args=(db_conn, message, success, correlation_id)).start()
         
         return success
     except Exception as e:
         logger.error(f"Error sending notification: {e}")
         if db_conn:
             threading.Thread(target=log_notification, 
-                           args=(db_conn, message, False)).start()
+                           args=(db_conn, message, False, correlation_id)).start()
+        return False
+
+def send_telegram_message(chat_id, message, timeout=5):
+    """Send one message to a chat. Returns True or False, or the seconds to wait when Telegram rate limits (429)."""
+    response = requests.post(
+        f"{TELEGRAM_API_URL}/bot{TELEGRAM_TOKEN}/sendMessage",
+        data={"chat_id": chat_id, "text": message, "parse_mode": "HTML"},
+        timeout=timeout
+    )
+    if response.status_code == 429:
+        try:
+            return float(response.json()["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            return 1.0
+    return response.status_code == 200
+
+def get_alert_fanout():
+    """The alert fan-out, created on the first alert."""
+    global alert_fanout
+    if alert_fanout is None:
+        alert_fanout = subscribers.FanOut(
+            send_telegram_message,
+            max_workers=FANOUT_WORKERS,
+            global_per_second=TELEGRAM_GLOBAL_PER_SECOND,
+            chat_per_second=TELEGRAM_CHAT_PER_SECOND,
+        )
+    return alert_fanout
+
+def alert_recipients(db_conn, apartments):
+    """(chat_id, apartments) per recipient: TELEGRAM_CHAT_ID with all of them, subscribers with their matches."""
+    recipients = [(TELEGRAM_CHAT_ID, list(apartments))] if TELEGRAM_CHAT_ID else []
+    if db_conn:
+        try:
+            registry = subscribers.load_subscribers(db_conn)
+        except sqlite3.Error as e:
+            logger.error(f"Error loading subscribers: {e}")
+            registry = {}
+        registry.pop(TELEGRAM_CHAT_ID, None)
+        recipients += subscribers.matching(registry, apartments)
+    return recipients
+
+def send_alert(apartments, format_message, db_conn=None, correlation_id=None, traces=None):
+    """Fan an alert about apartments out to every matching recipient, each with only its own apartments.
+    
+    traces are stamped "enqueued" when the messages are handed to the fan-out.
+    Returns whether TELEGRAM_CHAT_ID received it (without one: whether any subscriber did).
+    """
+    if not TELEGRAM_TOKEN:
+        logger.warning("Telegram notifications disabled: missing token")
         return False
+    recipients = alert_recipients(db_conn, apartments)
+    messages = [(chat_id, format_message(matched)) for chat_id, matched in recipients]
+    if traces:
+        latency.mark(traces, "enqueued")
+    results = get_alert_fanout().dispatch(messages)
+    sent = results.get(TELEGRAM_CHAT_ID, False) if TELEGRAM_CHAT_ID else any(results.values())
+    if db_conn:
+        threading.Thread(target=log_notification,
+                         args=(db_conn, format_message(list(apartments)), sent, correlation_id)).start()
+    return sent
+
+def fanout_metrics():
+    """Alert fan-out counts and durations, as runtime metrics."""
+    if not alert_fanout:
+        return {}
+    return {f"fanout.{name}": value for name, value in alert_fanout.stats().items() if value is not None}
 
 def send_speed_notification(message):
     """Send notification only if Telegram is configured."""
@@ -860,7 +1748,7 @@ def send_speed_notification(message):
         return False
         
     try:
-        telegram_api_url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
+        telegram_api_url = f"{TELEGRAM_API_URL}/bot{TELEGRAM_TOKEN}/sendMessage"
         payload = {
             "chat_id": TELEGRAM_CHAT_ID,
             "text": message,
@@ -877,13 +1765,17 @@ def send_startup_notification(db_conn=None):
     startup_message = f"OurCampus Monitor Started\n\n" + \
                       f"Monitoring started at: {start_time.strftime('%Y-%m-%d %H:%M:%S')}\n" + \
                       f"Priority-based checking:\n" + \
-                      f"• High Priority: {HIGH_PRIORITY_MIN}-{HIGH_PRIORITY_MAX} seconds (Wednesdays 12:00-15:30)\n" + \
-                      f"• Medium Priority: {MEDIUM_PRIORITY_MIN}-{MEDIUM_PRIORITY_MAX} seconds (Weekday afternoons)\n" + \
+                      f"• High Priority: {HIGH_PRIORITY_MIN}-{HIGH_PRIORITY_MAX} seconds\n" + \
+                      f"• Medium Priority: {MEDIUM_PRIORITY_MIN}-{MEDIUM_PRIORITY_MAX} seconds\n" + \
                       f"• Normal Priority: {NORMAL_CHECK_INTERVAL_MIN}-{NORMAL_CHECK_INTERVAL_MAX} minutes (All other times)\n\n" + \
+                      f"Priority windows:\n" + \
+                      "".join(f"• {line}\n" for line in priority_schedule.describe()) + "\n" + \
                       f"Available commands:\n" + \
                       f"• /last - Show last check time\n" + \
                       f"• /status - Show full status\n" + \
                       f"• /stats - Show statistics\n" + \
+                      f"• /units - Show listed units\n" + \
+                      f"• /subscribers - Show alert subscribers\n" + \
                       f"• /help - Show commands\n\n" + \
                       f"Health check enabled: {HEALTH_CHECK_ENABLED}\n" + \
                       f"Health check port: {HEALTH_CHECK_PORT}"
@@ -900,7 +1792,7 @@ def process_telegram_commands(db_conn=None):
     try:
         # Get updates from Telegram with short timeout
         response = requests.get(
-            f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/getUpdates",
+            f"{TELEGRAM_API_URL}/bot{TELEGRAM_TOKEN}/getUpdates",
             params={"offset": last_command_update_id + 1, "timeout": 1},
             timeout=3
         )
@@ -936,9 +1828,17 @@ def process_telegram_commands(db_conn=None):
                             elif message_text == "/stats":
                                 handle_stats_command(chat_id, db_conn)
                             
+                            # Handle /units command
+                            elif message_text == "/units":
+                                handle_units_command(chat_id, db_conn)
+                            
                             # Handle /restart command
                             elif message_text == "/restart":
                                 handle_restart_command(chat_id, db_conn)
+                            
+                            # Handle subscriber commands
+                            elif message_text.split(" ")[0] in ("/subscribe", "/unsubscribe", "/subscribers"):
+                                handle_subscriber_command(message_text.split(), db_conn)
                                 
     except requests.exceptions.RequestException as e:
         logger.error(f"Network error processing Telegram commands: {e}")
@@ -1014,6 +1914,23 @@ def handle_status_command(chat_id, db_conn=None):
             message += f"• Next check: {next_check_time.strftime('%H:%M:%S')}\n"
             message += f"• Time until next: {int(seconds_until)} seconds\n"
     
+    # Add scheduling accuracy
+    if loop_scheduler and loop_scheduler.ticks:
+        scheduler_stats = loop_scheduler.stats()
+        message += f"• Check lateness: {scheduler_stats['lateness_mean']:.1f}s avg, {scheduler_stats['lateness_max']:.1f}s max\n"
+        message += f"• Skipped ticks: {scheduler_stats['skipped_ticks']}\n"
+    
+    # Add cluster membership
+    if cluster_node:
+        status = cluster_node.status()
+        message += f"\nCluster:\n"
+        message += f"• This node: {cluster_node.node_id}{' (leader)' if cluster_node.is_leader else ''}\n"
+        message += f"• Live nodes: {status['live_nodes']}\n"
+        message += f"• Combined checks: {status['combined_checks_per_minute']:.0f}/min\n"
+        for node in status["nodes"]:
+            if node["live"]:
+                message += f"• {node['node_id']}: {node['checks_per_minute']:.0f}/min, lag {node['lag_seconds']:.1f}s\n"
+    
     # Add system metrics if available
     if health_metrics:
         message += f"\nSystem Health:\n"
@@ -1022,6 +1939,13 @@ def handle_status_command(chat_id, db_conn=None):
         message += f"• Checks since start: {health_metrics.get('checks_since_start', 'N/A')}\n"
         message += f"• Errors since start: {health_metrics.get('errors_since_start', 'N/A')}\n"
     
+    # Add adaptive schedule status
+    if adaptive_scheduler and adaptive_scheduler.ready:
+        message += f"\nAdaptive Schedule:\n"
+        message += f"• Budget: {ADAPTIVE_CHECKS_PER_DAY} checks/day\n"
+        message += f"• Learned from: {adaptive_scheduler.transitions} releases\n"
+        message += f"• Expected detection delay: {adaptive_scheduler.expected_delay():.0f}s\n"
+    
     # Add health check status
     if HEALTH_CHECK_ENABLED:
         message += f"\nHealth Check:\n"
@@ -1078,18 +2002,101 @@ def handle_stats_command(chat_id, db_conn=None):
             message += f"• Availabilities: {today_stats[2]}\n"
             message += f"• Errors: {today_stats[3]}\n"
         
+        # Detection-to-alert latency over recent alerts
+        alert_latency = latency.latency_percentiles(db_conn)
+        if alert_latency["count"]:
+            total = alert_latency["total"]
+            message += f"\nAlert Latency ({alert_latency['count']} alerts, check → delivered):\n"
+            message += f"• p50: {total['p50']:.1f}s\n"
+            message += f"• p95: {total['p95']:.1f}s\n"
+            message += f"• p99: {total['p99']:.1f}s\n"
+        
+        # Time from the first failed check to the next successful one
+        recovery_times = recovery.recovery_summary(db_conn)
+        if recovery_times["count"]:
+            message += f"\nRecovery ({recovery_times['count']} incidents):\n"
+            message += f"• p50: {recovery_times['p50']:.1f}s\n"
+            message += f"• p95: {recovery_times['p95']:.1f}s\n"
+            message += f"• max: {recovery_times['max']:.1f}s\n"
+        
+        # Checks that found the page unchanged and skipped extraction
+        for engine, cache in list(content_caches.items()):
+            content = cache.stats()
+            message += f"\nUnchanged Page ({engine}): {content['hit_rate']:.0%} of "
+            message += f"{content['hits'] + content['misses']} checks\n"
+        
         send_telegram_notification(message, db_conn)
     except Exception as e:
         logger.error(f"Error generating stats: {e}")
         message = f"Error generating statistics: {e}"
         send_telegram_notification(message, db_conn)
 
+def handle_units_command(chat_id, db_conn=None):
+    """Handle the /units command: List the units currently listed per floor plan."""
+    if not db_conn:
+        send_telegram_notification("Database not available for the unit inventory.")
+        return
+    
+    try:
+        units = inventory.active_units(db_conn)
+        if not units:
+            message = "No units currently listed."
+        else:
+            message = f"Listed Units ({len(units)})\n"
+            floor_plan = None
+            for unit in units:
+                if unit["floor_plan"] != floor_plan:
+                    floor_plan = unit["floor_plan"]
+                    message += f"\n{floor_plan}:\n"
+                message += f"• {inventory.format_unit(unit)}\n"
+        send_telegram_notification(message, db_conn)
+    except Exception as e:
+        logger.error(f"Error listing units: {e}")
+        send_telegram_notification(f"Error listing units: {e}", db_conn)
+
+def handle_subscriber_command(args, db_conn=None):
+    """Handle /subscribe <chat_id> [floor plans], /unsubscribe <chat_id> and /subscribers."""
+    if not db_conn:
+        send_telegram_notification("Database not available for subscribers.")
+        return
+    
+    try:
+        command = args[0]
+        if command == "/subscribers":
+            registry = subscribers.load_subscribers(db_conn)
+            if not registry:
+                message = "No subscribers."
+            else:
+                message = f"Subscribers ({len(registry)})\n\n"
+                for subscriber, floor_plans in registry.items():
+                    message += f"• {subscriber}: {', '.join(sorted(floor_plans)) if floor_plans else 'all floor plans'}\n"
+        elif len(args) < 2:
+            message = f"Usage: {command} <chat_id>" + (" [1p] [2p]" if command == "/subscribe" else "")
+        elif command == "/subscribe":
+            floor_plans = subscribers.parse_floor_plans(args[2:])
+            subscribers.add_subscriber(db_conn, args[1], floor_plans)
+            message = f"Subscribed {args[1]} to {', '.join(sorted(floor_plans)) if floor_plans else 'all floor plans'}."
+        elif subscribers.remove_subscriber(db_conn, args[1]):
+            message = f"Unsubscribed {args[1]}."
+        else:
+            message = f"{args[1]} was not subscribed."
+    except ValueError as e:
+        message = str(e)
+    except Exception as e:
+        logger.error(f"Error handling {args[0]}: {e}")
+        message = f"Error handling {args[0]}: {e}"
+    send_telegram_notification(message, db_conn)
+
 def handle_help_command(chat_id, db_conn=None):
     """Handle the /help command: Show available commands."""
     message = f"Available Commands\n\n"
     message += f"• /last - Last check time\n"
     message += f"• /status - Monitor status\n"
     message += f"• /stats - Show statistics\n"
+    message += f"• /units - Listed units\n"
+    message += f"• /subscribe <chat_id> [1p] [2p] - Send alerts to a chat\n"
+    message += f"• /unsubscribe <chat_id> - Stop alerts to a chat\n"
+    message += f"• /subscribers - List subscribers\n"
     message += f"• /restart - Restart info\n"
     message += f"• /help - This help message"
     
@@ -1218,11 +2225,125 @@ def simple_test_browser_opening():
     
     return success1 and success2
 
+def format_available_message(new_available):
+    """Telegram alert text for newly available apartments."""
+    message = "OurCampus Apartments Available!\n\n"
+    message += "The following apartments are now available:\n\n"
+    for apt in new_available:
+        message += f"• {apt}\n"
+    message += f"\nClick here to apply now: {URL}"
+    return message
+
+def format_speed_message(new_apartments):
+    """Telegram alert text of speed mode, which also opens the booking pages."""
+    message = f"APARTMENTS AVAILABLE!\n\n"
+    for apt in new_apartments:
+        message += f"• {apt}\n"
+    message += f"\nNew browser instances should have opened automatically!"
+    return message
+
+def format_gone_message():
+    """Telegram text for when previously available apartments disappear."""
+    message = "OurCampus Update\n\n"
+    message += "Previously available apartments are no longer listed."
+    return message
+
+def handle_check_result(available_apartments, last_notified, db_conn, check_id, check_started_at, checked_at,
+                        capture=None):
+    """Decide whether a check result is a new transition and alert on it. Returns the updated notified set.
+    
+    capture(new_available, correlation_id) is called after the alert has been dispatched.
+    """
+    last_notified, alert = decide_check_result(
+        available_apartments, last_notified, db_conn, check_id, check_started_at, checked_at, capture
+    )
+    if alert:
+        alert()
+    return last_notified
+
+def decide_check_result(available_apartments, last_notified, db_conn, check_id, check_started_at, checked_at,
+                        capture=None):
+    """Decide whether a check result is a new transition and store the new alert state.
+    
+    Returns (updated notified set, alert callable or None); the alert is sent by calling it, which callers
+    serialising decisions do after releasing their lock.
+    """
+    if available_apartments:
+        current_available = set(available_apartments)
+        # Compared by apartment type: engines report "1 Person Apartment" with or without the button text
+        notified_types = {html_extract.apartment_type(apt) for apt in last_notified}
+        new_available = {apt for apt in current_available if html_extract.apartment_type(apt) not in notified_types}
+        
+        if not new_available:
+            logger.info("No new apartments since last check.")
+            return last_notified, None
+        
+        logger.info(f"New apartments available! {new_available}")
+        
+        # Trace this transition from the check through to delivery
+        correlation_id = latency.new_correlation_id()
+        traces = latency.new_traces(
+            correlation_id, check_id, [apt.split(" - ")[0] for apt in new_available],
+            "main", check_started_at, checked_at
+        )
+        latency.mark(traces, "decided")
+        alert_state.save_alert_state(db_conn, "main", current_available, "alerted", correlation_id)
+        
+        def alert():
+            sent = send_alert(new_available, format_available_message, db_conn, correlation_id, traces)
+            if sent:
+                latency.mark(traces, "delivered")
+            threading.Thread(target=latency.record_traces, args=(db_conn, traces, sent)).start()
+            if capture:
+                capture(new_available, correlation_id)
+        
+        return current_available, alert
+    
+    logger.info("No apartments available currently.")
+    # Only reset notification tracking if we've previously found something
+    if not last_notified:
+        return last_notified, None
+    alert_state.save_alert_state(db_conn, "main", set(), "cleared")
+    # Notify about apartments no longer available (the recipients of the last alert)
+    gone = set(last_notified)
+    return set(), lambda: send_alert(gone, lambda apartments: format_gone_message(), db_conn)
+
+def deliver_cluster_alert(alert, db_conn):
+    """Send an alert recorded in the cluster store. Runs on the leader, which may not be the detecting node."""
+    if alert["kind"] == "gone":
+        return send_alert(alert["apartments"], lambda apartments: format_gone_message(), db_conn)
+    
+    traces = latency.new_traces(
+        alert["correlation_id"], alert["check_id"], [apt.split(" - ")[0] for apt in alert["apartments"]],
+        "cluster", alert["check_started_at"], alert["checked_at"]
+    )
+    # The transition is enqueued for the leader as soon as it is decided
+    latency.mark(traces, "decided", alert["decided_at"])
+    latency.mark(traces, "enqueued", alert["decided_at"])
+    sent = send_alert(alert["apartments"], format_available_message, db_conn, alert["correlation_id"])
+    if sent:
+        latency.mark(traces, "delivered")
+    threading.Thread(target=latency.record_traces, args=(db_conn, traces, sent)).start()
+    return sent
+
+def process_commands_if_leader(db_conn=None):
+    """Answer Telegram commands, unless another cluster node is the leader."""
+    if cluster_node is None or cluster_node.is_leader:
+        process_telegram_commands(db_conn)
+
+def send_notification_if_leader(message, db_conn=None):
+    """Send a Telegram message, unless another cluster node is the leader."""
+    if cluster_node is None or cluster_node.is_leader:
+        return send_telegram_notification(message, db_conn)
+    return False
+
 def speed_mode_main(test_mode=False):
     """Main function optimized for maximum speed."""
-    global start_time, next_check_time, apartments_found_this_session
+    global start_time, next_check_time, apartments_found_this_session, loop_scheduler, startup_started
+    global check_engines, check_recovery, speed_interval
     
     start_time = datetime.now()
+    startup_started = time.perf_counter()
     
     if test_mode:
         logger.info("TEST MODE: Starting speed mode for testing!")
@@ -1230,7 +2351,7 @@ def speed_mode_main(test_mode=False):
     else:
         logger.info("SPEED MODE: Starting maximum performance monitoring!")
         
-    logger.info(f"Check interval: {SPEED_MODE_INTERVAL_MIN}-{SPEED_MODE_INTERVAL_MAX} seconds")
+    logger.info(f"Check interval: adaptive, {SPEED_MODE_INTERVAL_MIN}-{SPEED_MODE_INTERVAL_MAX} seconds")
     
     # Send startup notification if Telegram is configured
     if TELEGRAM_TOKEN and TELEGRAM_CHAT_ID:
@@ -1240,9 +2361,29 @@ def speed_mode_main(test_mode=False):
         else:
             startup_msg = f"SPEED MODE ACTIVATED\n\n"
             startup_msg += f"Ultra-fast monitoring started!\n"
-        startup_msg += f"Check interval: {SPEED_MODE_INTERVAL_MIN}-{SPEED_MODE_INTERVAL_MAX}s\n"
+        startup_msg += f"Check interval: adaptive, {SPEED_MODE_INTERVAL_MIN}-{SPEED_MODE_INTERVAL_MAX}s\n"
         startup_msg += f"Browser instances will open automatically when apartments are found!"
-        send_speed_notification(startup_msg)
+        # Sent in the background so the first check does not wait for Telegram
+        threading.Thread(target=send_speed_notification, args=(startup_msg,), daemon=True).start()
+    
+    # The database keeps the alert state across restarts (test mode always starts fresh)
+    db_conn = None
+    if not test_mode:
+        try:
+            db_conn = init_database()
+        except Exception as e:
+            logger.error(f"Error initializing database: {e}")
+        apartments_found_this_session = alert_state.load_alert_state(db_conn, "speed")
+        if apartments_found_this_session:
+            logger.info(f"Restored alert state: already opened {sorted(apartments_found_this_session)}")
+    
+    if not test_mode:
+        start_snapshot_recorder()
+        start_inventory_tracker(db_conn, send_speed_notification)
+        start_speed_check_log(db_conn)
+        start_evidence_store()
+    if AUTO_OPEN_BROWSER:
+        ensure_booking_browser()
     
     driver = None
     test_triggered = False
@@ -1251,9 +2392,18 @@ def speed_mode_main(test_mode=False):
         if not test_mode:
             driver = setup_speed_driver(headless=True)  # Headless for speed
         check_count = 0
+        loop_scheduler = deadline_scheduler.DeadlineScheduler()
+        if not test_mode:
+            check_engines = create_engine_controller(SPEED_CHECK_ENGINES, db_conn)
+            check_recovery = create_check_recovery()
+            start_check_watchdog()
+            speed_interval = aimd_interval.AimdInterval(floor=SPEED_MODE_INTERVAL_MIN, ceiling=SPEED_MODE_INTERVAL_MAX)
         
         while True:
             try:
+                loop_scheduler.begin_tick()
+                check_started_at = time.time()
+                
                 # TEST MODE: Simulate apartment availability after 15 seconds
                 if test_mode and not test_triggered:
                     uptime = (datetime.now() - start_time).total_seconds()
@@ -1264,72 +2414,128 @@ def speed_mode_main(test_mode=False):
                     else:
                         available_apartments = []
                         logger.info(f"TEST: Waiting for 15 seconds... ({int(15-uptime)} seconds remaining)")
+                elif test_mode:
+                    available_apartments = []
                 else:
-                    # Normal mode: Actually check the website
-                    available_apartments = check_availability_speed(driver) if not test_mode else []
+                    if driver is None:
+                        driver = setup_speed_driver(headless=True)  # the restart after the last failure did not succeed
+                    # Normal mode: Actually check the website, with the fastest healthy engine
+                    with watched("check", WATCHDOG_CHECK_SECONDS, driver):
+                        engine, available_apartments = check_engines.run(engine_runners(driver))
+                    available_apartments = [html_extract.apartment_type(apt) for apt in available_apartments]
+                    note_check_success(db_conn, send_speed_notification)
+                    check_seconds = time.time() - check_started_at
+                    speed_interval.record(True, check_seconds, engine)
+                    log_speed_check(available_apartments, check_seconds, engine_floor_plans.get(engine))  # no commit per check
                 
+                checked_at = time.time()
+                note_first_check()
                 check_count += 1
+                update_inventory(available_apartments)
                 
                 if available_apartments:
                     new_apartments = set(available_apartments) - apartments_found_this_session
                     
                     if new_apartments:
                         logger.info(f"SUCCESS: New apartments found: {new_apartments}")
+                        correlation_id = latency.new_correlation_id()
+                        traces = latency.new_traces(
+                            correlation_id, None, sorted(new_apartments),
+                            "speed", check_started_at, checked_at
+                        )
+                        latency.mark(traces, "decided")
                         
                         # MAXIMUM ATTENTION: Open booking pages in NEW BROWSER INSTANCES
-                        for apt_type in new_apartments:
-                            logger.info(f"APARTMENT ALERT: Opening {apt_type} booking page!")
-                            success = open_booking_page(apt_type)
-                            if success:
-                                logger.info(f"SUCCESS: NEW BROWSER INSTANCE opened for {apt_type}")
+                        if AUTO_OPEN_BROWSER:
+                            for apt_type in new_apartments:
+                                logger.info(f"APARTMENT ALERT: Opening {apt_type} booking page!")
+                                success = open_booking_page(apt_type)
+                                if success:
+                                    logger.info(f"SUCCESS: NEW BROWSER INSTANCE opened for {apt_type}")
                                 
-                                # Additional attention-getting measures
-                                try:
-                                    # Try to make a system beep sound (Windows)
-                                    if platform.system().lower() == "windows":
-                                        import winsound
-                                        winsound.Beep(1000, 500)  # 1000Hz for 500ms
-                                except:
-                                    pass
+                                    # Additional attention-getting measures
+                                    try:
+                                        # Try to make a system beep sound (Windows)
+                                        if platform.system().lower() == "windows":
+                                            import winsound
+                                            winsound.Beep(1000, 500)  # 1000Hz for 500ms
+                                    except:
+                                        pass
                                     
-                            else:
-                                logger.error(f"ERROR: Failed to open browser instance for {apt_type}")
+                                else:
+                                    logger.error(f"ERROR: Failed to open browser instance for {apt_type}")
                         
                         # Send notification as backup
-                        if TELEGRAM_TOKEN and TELEGRAM_CHAT_ID:
-                            msg = f"APARTMENTS AVAILABLE!\n\n"
-                            for apt in new_apartments:
-                                msg += f"• {apt}\n"
-                            msg += f"\nNew browser instances should have opened automatically!"
-                            send_speed_notification(msg)
+                        sent = False
+                        if TELEGRAM_TOKEN:
+                            sent = send_alert(
+                                sorted(new_apartments), format_speed_message, db_conn, correlation_id, traces
+                            )
+                            if sent:
+                                latency.mark(traces, "delivered")
                         
                         # Update found apartments
                         apartments_found_this_session.update(new_apartments)
+                        alert_state.save_alert_state(
+                            db_conn, "speed", apartments_found_this_session, "alerted", correlation_id
+                        )
+                        threading.Thread(target=latency.record_traces, args=(db_conn, traces, sent)).start()
+                        if not test_mode:
+                            capture_evidence(driver, new_apartments, correlation_id, None, engine)
                     else:
-                        logger.info(f"Same apartments still available: {available_apartments}")
+                        speed_logger.info(f"Same apartments still available: {available_apartments}")
                 else:
                     # Reset if no apartments found
                     if apartments_found_this_session:
                         logger.info("No apartments available now - resetting tracker")
                         apartments_found_this_session = set()
+                        alert_state.save_alert_state(db_conn, "speed", apartments_found_this_session, "cleared")
+                
+                if not test_mode:
+                    probe_engines(driver, engine)
+                
+                # Launch the booking browser when a priority window opens (or relaunch it if it was closed)
+                if AUTO_OPEN_BROWSER:
+                    ensure_booking_browser()
                 
                 # Calculate next check time
                 if test_mode:
                     interval = 2.0  # Faster checking in test mode
                 else:
                     interval = get_speed_interval()
-                next_check_time = datetime.now() + timedelta(seconds=interval)
+                
+                # Aim at an absolute deadline so check time does not stretch the period
+                seconds_until = loop_scheduler.schedule(interval)
+                next_check_time = datetime.now() + timedelta(seconds=seconds_until)
+                if speed_interval:
+                    speed_logger.info(f"Next check in {seconds_until:.2f}s - {speed_interval.describe()}")
                 
                 # Status update every 50 checks (or every 5 in test mode)
                 status_interval = 5 if test_mode else 50
                 if check_count % status_interval == 0:
                     uptime = datetime.now() - start_time
+                    scheduler_stats = loop_scheduler.stats()
+                    timing = (f"Next: {seconds_until:.1f}s | Lateness p95: {scheduler_stats['lateness_p95']:.2f}s"
+                              f" | Skipped: {scheduler_stats['skipped_ticks']}")
+                    if speed_interval:
+                        timing += f" | Interval: {speed_interval.interval:.2f}s"
+                    if "speed" in content_caches:
+                        timing += f" | Unchanged: {content_caches['speed'].stats()['hit_rate']:.0%}"
                     if test_mode:
-                        logger.info(f"TEST Check #{check_count} | Uptime: {uptime} | Next: {interval:.1f}s")
+                        logger.info(f"TEST Check #{check_count} | Uptime: {uptime} | {timing}")
                     else:
-                        logger.info(f"STATUS Check #{check_count} | Uptime: {uptime} | Next: {interval:.1f}s")
+                        logger.info(f"STATUS Check #{check_count} | Uptime: {uptime} | {timing}")
                 
-                time.sleep(interval)
+                # Restart browser every 100 checks to prevent issues (skip in test mode)
+                # Done before waiting so the restart comes out of the idle time
+                if not test_mode and check_count % 100 == 0:
+                    logger.info("MAINTENANCE: Restarting browser for performance...")
+                    with watched("restart", WATCHDOG_RESTART_SECONDS, driver):
+                        quit_driver(driver)
+                        driver = None  # the next check starts one if the restart fails
+                        driver = setup_speed_driver(headless=True)
+                
+                loop_scheduler.wait()
                 
                 # In test mode, exit after successful test
                 if test_mode and test_triggered and available_apartments:
@@ -1338,29 +2544,21 @@ def speed_mode_main(test_mode=False):
                     time.sleep(5)  # Give user time to see the opened tabs
                     break
                 
-                # Restart browser every 100 checks to prevent issues (skip in test mode)
-                if not test_mode and check_count % 100 == 0:
-                    logger.info("MAINTENANCE: Restarting browser for performance...")
-                    driver.quit()
-                    driver = setup_speed_driver(headless=True)
-                
             except Exception as e:
                 logger.error(f"Error during speed check: {e}")
                 if not test_mode:
-                    time.sleep(2)  # Brief pause before retry
-                    
-                    # Try to restart browser on error
-                    try:
-                        if driver:
-                            driver.quit()
-                        driver = setup_speed_driver(headless=True)
-                    except Exception as browser_error:
-                        logger.error(f"Browser restart failed: {browser_error}")
-                        time.sleep(5)
+                    speed_interval.record(False)
+                    # Wait and restart the browser as the failure class needs
+                    driver = handle_check_failure(
+                        e, driver, lambda: setup_speed_driver(headless=True), send_speed_notification
+                    )
                 else:
                     # In test mode, just continue
                     time.sleep(1)
                 
+                # Start a fresh schedule after recovering instead of counting the outage as lateness
+                loop_scheduler.reset()
+                
     except KeyboardInterrupt:
         if test_mode:
             logger.info("Test mode stopped by user")
@@ -1369,16 +2567,112 @@ def speed_mode_main(test_mode=False):
     finally:
         if driver:
             driver.quit()
+        if check_watchdog:
+            check_watchdog.stop()
+        stop_speed_check_log()
+        if evidence_store:
+            evidence_store.stop()
+        if snapshot_recorder:
+            snapshot_recorder.stop()
+        if inventory_tracker:
+            inventory_tracker.stop()
+        if db_conn:
+            db_conn.close()
         if test_mode:
             logger.info("TEST MODE: Test mode ended")
         else:
             logger.info("SPEED MODE: Speed mode ended")
 
-def main(headless=True):
+def publish_loop_metrics(db_conn):
+    """Publish scheduler (and cluster) metrics of the main loop for the health check."""
+    metrics = {f"scheduler.{name}": value for name, value in loop_scheduler.stats().items()}
+    metrics.update({f"startup.{name}": value for name, value in startup_metrics.items()})
+    metrics.update(content_metrics())
+    metrics.update({f"selectors.{name}": value for name, value in tab_selectors.stats().items()})
+    metrics.update(engine_metrics())
+    metrics.update(recovery_metrics())
+    metrics.update(watchdog_metrics())
+    metrics.update(fanout_metrics())
+    if evidence_store:
+        metrics.update({f"evidence.{name}": value for name, value in evidence_store.stats().items() if value is not None})
+    if cluster_node:
+        try:
+            status = cluster_node.status()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading cluster status: {e}")
+            status = None
+    if cluster_node and status:
+        metrics.update({
+            "cluster.is_leader": 1 if cluster_node.is_leader else 0,
+            "cluster.live_nodes": status["live_nodes"],
+            "cluster.combined_checks_per_minute": status["combined_checks_per_minute"],
+            "cluster.max_lag_seconds": status["max_lag_seconds"],
+        })
+    publish_runtime_metrics(db_conn, metrics)
+
+def run_worker_pool(headless, workers, db_conn):
+    """Check with a phase-staggered pool of browsers that only grows inside priority windows."""
+    global next_check_time, loop_scheduler
+    
+    min_level = priority_windows.PRIORITY_LEVELS[WORKER_POOL_MIN_PRIORITY]
+    state = {"last_notified": alert_state.load_alert_state(db_conn, "main")}
+    
+    def decide(available_apartments, check_id, check_started_at, checked_at):
+        # Called under the decision stage lock, in sample order; the returned alert is sent after releasing it
+        note_first_check()
+        update_inventory(available_apartments)
+        state["last_notified"], alert = decide_check_result(
+            available_apartments, state["last_notified"], db_conn, check_id, check_started_at, checked_at
+        )
+        return alert
+    
+    def pool_size():
+        return workers if priority_schedule.level() >= min_level else 1
+    
+    pool = worker_pool.WorkerPool(
+        make_driver=lambda: setup_driver(headless=headless),
+        close_driver=quit_driver,
+        check=lambda driver, check_id: check_availability(driver, db_conn, check_id),
+        decide=decide,
+        size_for=pool_size,
+        interval_for=get_check_interval,
+        rate_limiter=RateLimiter(WORKER_POOL_MAX_REQUESTS_PER_MINUTE, 60),
+        restart_every=15,
+    )
+    loop_scheduler = pool.scheduler
+    logger.info(f"Worker pool mode: up to {workers} browsers from {WORKER_POOL_MIN_PRIORITY} priority, "
+                f"max {WORKER_POOL_MAX_REQUESTS_PER_MINUTE} requests/minute")
+    logger.warning("Worker pool mode checks with check_availability only: engine failover, "
+                   "failure recovery, the hang watchdog and evidence capture are not used")
+    
+    tick = 0
+    try:
+        while True:
+            tick += 1
+            if adaptive_scheduler:
+                adaptive_scheduler.refresh(db_conn)
+            
+            seconds_until = pool.tick(new_check_id(tick))
+            next_check_time = datetime.now() + timedelta(seconds=seconds_until)
+            
+            metrics = {f"scheduler.{name}": value for name, value in pool.scheduler.stats().items()}
+            metrics.update({f"pool.{name}": value for name, value in pool.stats().items()})
+            metrics.update({f"startup.{name}": value for name, value in startup_metrics.items()})
+            metrics.update(content_metrics())
+            metrics.update({f"selectors.{name}": value for name, value in tab_selectors.stats().items()})
+            threading.Thread(target=publish_runtime_metrics, args=(db_conn, metrics)).start()
+            
+            pool.scheduler.wait(idle=lambda: process_telegram_commands(db_conn), idle_every=5, idle_guard=3)
+    finally:
+        pool.stop()
+
+def main(headless=True, workers=WORKER_POOL_SIZE):
     """Main function to monitor apartment availability with improved speed."""
-    global start_time, next_check_time
+    global start_time, next_check_time, adaptive_scheduler, loop_scheduler, cluster_node, startup_started, check_engines
+    global check_recovery
     
     start_time = datetime.now()  # Track when the script started
+    startup_started = time.perf_counter()
     logger.info("Starting OurCampus Amsterdam Diemen apartment monitor")
     
     # Initialize database
@@ -1389,117 +2683,176 @@ def main(headless=True):
         logger.error(f"Error initializing database: {e}")
         db_conn = None
     
-    # Send startup notification
-    send_startup_notification(db_conn)
+    # The adaptive scheduler learns from availability history, so it needs the database
+    if SCHEDULER_MODE == "adaptive":
+        if db_conn:
+            adaptive_scheduler = create_adaptive_scheduler()
+            logger.info(f"Adaptive scheduling enabled with a budget of {ADAPTIVE_CHECKS_PER_DAY} checks/day")
+        else:
+            logger.warning("Adaptive scheduling needs the database - falling back to priority windows")
+    
+    # Join the cluster before the startup notification so commands are only answered by the leader
+    if CLUSTER_DB_PATH:
+        if workers > 1:
+            logger.warning("Cluster mode runs one browser per node - ignoring the worker pool setting")
+            workers = 1
+        cluster_node = cluster.ClusterNode(
+            CLUSTER_DB_PATH,
+            send_alert=lambda alert: deliver_cluster_alert(alert, db_conn),
+            node_id=CLUSTER_NODE_ID,
+            heartbeat_interval=CLUSTER_HEARTBEAT_SECONDS,
+            lease_seconds=CLUSTER_LEASE_SECONDS,
+        )
+        cluster_node.start()
+    
+    start_snapshot_recorder()
+    start_evidence_store()
     
-    # Start health check server if enabled
-    start_health_check_server()
+    # Unit lists follow the availability alert as a separate message (sent by the leader only in a cluster)
+    start_inventory_tracker(db_conn, lambda message: send_notification_if_leader(message, db_conn))
+    
+    # Send the startup notification and start the health check server in the background,
+    # so the first check only waits for the browser
+    threading.Thread(target=send_startup_notification, args=(db_conn,), daemon=True).start()
+    threading.Thread(target=start_health_check_server, daemon=True).start()
     
     driver = None
     
     try:
+        if workers > 1:
+            run_worker_pool(headless, workers, db_conn)
+            return
+        
         driver = setup_driver(headless=headless)
-        last_notified = set()  # Keep track of apartments we've already notified about
+        startup_metrics["time_to_driver_seconds"] = time.perf_counter() - startup_started
+        logger.info("Startup timings: " + ", ".join(f"{name}={value:.2f}" for name, value in startup_metrics.items()))
+        
+        # Keep track of apartments we've already notified about, including before a restart
+        last_notified = alert_state.load_alert_state(db_conn, "main")
+        if last_notified:
+            logger.info(f"Restored alert state: already notified about {sorted(last_notified)}")
+        check_engines = create_engine_controller(CHECK_ENGINES, db_conn)
         command_check_time = 0  # Track when we last checked for commands
         browser_restart_counter = 0  # Counter for browser restarts
-        consecutive_errors = 0  # Track consecutive errors
+        check_recovery = create_check_recovery()  # Backoff and circuit breaker after failed checks
+        start_check_watchdog()  # Kills the browser when a check hangs
+        notify_error = lambda message: send_telegram_notification(message, db_conn)
+        loop_scheduler = deadline_scheduler.DeadlineScheduler()  # Aims checks at absolute target times
         
         while True:
             try:
-                available_apartments = check_availability(driver, db_conn)
+                lateness = loop_scheduler.begin_tick()
+                if lateness > 1:
+                    logger.warning(f"Check started {lateness:.1f}s after its target time")
                 
-                # Reset error counter on successful check
-                consecutive_errors = 0
+                if driver is None:
+                    driver = setup_driver(headless=headless)  # the restart after the last failure did not succeed
+                    browser_restart_counter = 0
                 
-                if available_apartments:
-                    current_available = set(available_apartments)
-                    new_available = current_available - last_notified
-                    
-                    if new_available:
-                        logger.info(f"New apartments available! {new_available}")
-                        
-                        message = "OurCampus Apartments Available!\n\n"
-                        message += "The following apartments are now available:\n\n"
-                        for apt in new_available:
-                            message += f"• {apt}\n"
-                        message += f"\nClick here to apply now: {URL}"
-                        
-                        send_telegram_notification(message, db_conn)
-                        last_notified = current_available
-                    else:
-                        logger.info("No new apartments since last check.")
+                check_id = new_check_id()
+                check_started_at = time.time()
+                # Routed to the fastest healthy engine, failing over to the next one on errors
+                with watched("check", WATCHDOG_CHECK_SECONDS, driver):
+                    engine, available_apartments = check_engines.run(
+                        engine_runners(driver, db_conn, check_id, log_results=True)
+                    )
+                checked_at = time.time()
+                note_first_check()
+                
+                note_check_success(db_conn, notify_error)
+                update_inventory(available_apartments)
+                
+                if cluster_node:
+                    # Every node reports; the shared state decides and the leader alerts
+                    cluster_node.record_check(checked_at, lateness)
+                    correlation_id = latency.new_correlation_id()
+                    kind, apartments = cluster_node.report(
+                        check_id, check_started_at, checked_at, available_apartments, correlation_id
+                    )
+                    if kind == "available":
+                        capture_evidence(driver, apartments, correlation_id, check_id, engine)
                 else:
-                    logger.info("No apartments available currently.")
-                    # Only reset notification tracking if we've previously found something
-                    if last_notified:
-                        # Notify about apartments no longer available
-                        message = "OurCampus Update\n\n"
-                        message += "Previously available apartments are no longer listed."
-                        send_telegram_notification(message, db_conn)
-                        last_notified = set()
+                    last_notified = handle_check_result(
+                        available_apartments, last_notified, db_conn, check_id, check_started_at, checked_at,
+                        capture=lambda apartments, correlation_id: capture_evidence(
+                            driver, apartments, correlation_id, check_id, engine
+                        )
+                    )
+                probe_engines(driver, engine)
                 
                 # Check for Telegram commands every 10 seconds
                 current_time = time.time()
                 if current_time - command_check_time > 10:
-                    process_telegram_commands(db_conn)
+                    process_commands_if_leader(db_conn)
                     command_check_time = current_time
                 
                 # Determine the next check interval based on current time
-                check_interval = get_check_interval()
-                next_check_time = datetime.now().replace(microsecond=0)
-                next_check_time = datetime.fromtimestamp(next_check_time.timestamp() + check_interval)
+                if adaptive_scheduler:
+                    adaptive_scheduler.refresh(db_conn)
+                # The next check is due check_interval after this one was due, not after it finished
+                if cluster_node:
+                    # Nodes take turns: this node only checks its own share of slots every node agrees on
+                    seconds_until = loop_scheduler.schedule_in(
+                        cluster_node.seconds_until_my_slot(get_slot_length(), CLUSTER_SLOT_JITTER)
+                    )
+                else:
+                    seconds_until = loop_scheduler.schedule(get_check_interval())
+                next_check_time = datetime.now() + timedelta(seconds=seconds_until)
                 
                 logger.info(f"Next check at {next_check_time.strftime('%H:%M:%S')}")
                 
-                # Sleep in shorter intervals while checking for commands
-                remaining_sleep = check_interval
-                while remaining_sleep > 0:
-                    sleep_interval = min(5, remaining_sleep)  # Sleep for 5 seconds at a time (faster command response)
-                    time.sleep(sleep_interval)
-                    remaining_sleep -= sleep_interval
-                    
-                    # Check for commands during sleep periods
-                    process_telegram_commands(db_conn)
-                
                 # Increment browser restart counter
                 browser_restart_counter += 1
                 
                 # Restart the browser every 15 checks to avoid memory issues
+                # Done before waiting so the restart comes out of the idle time
                 if browser_restart_counter >= 15:
                     logger.info("Scheduled browser restart")
                     browser_restart_counter = 0
-                    driver.quit()
-                    driver = setup_driver(headless=headless)
+                    with watched("restart", WATCHDOG_RESTART_SECONDS, driver):
+                        quit_driver(driver)
+                        driver = None  # the next check starts one if the restart fails
+                        driver = setup_driver(headless=headless)
+                
+                threading.Thread(target=publish_loop_metrics, args=(db_conn,)).start()
+                
+                # Wait for the deadline, checking for commands every 5 seconds while waiting
+                # (skipped when fewer than 3 seconds remain, the Telegram request timeout)
+                loop_scheduler.wait(idle=lambda: process_commands_if_leader(db_conn), idle_every=5, idle_guard=3)
                 
             except Exception as e:
                 logger.error(f"Error during check: {e}")
-                consecutive_errors += 1
-                
-                # If we have too many consecutive errors, send an alert
-                if consecutive_errors >= 5:
-                    error_message = f"Critical Error\n\n"
-                    error_message += f"Encountered {consecutive_errors} consecutive errors.\n"
-                    error_message += f"Last error: {str(e)}\n\n"
-                    error_message += f"Attempting to recover..."
-                    
-                    send_telegram_notification(error_message, db_conn)
-                    
-                time.sleep(30)  # Wait 30 seconds before trying again after an error
                 
-                # Restart the browser after errors
-                try:
-                    if driver:
-                        driver.quit()
-                    driver = setup_driver(headless=headless)
+                # Wait and restart the browser as the failure class needs (the circuit opens after repeated failures)
+                previous_driver = driver
+                driver = handle_check_failure(e, driver, lambda: setup_driver(headless=headless), notify_error)
+                if driver is not previous_driver:
                     browser_restart_counter = 0
-                except Exception as browser_error:
-                    logger.error(f"Error restarting browser: {browser_error}")
-                    time.sleep(30)
+                
+                threading.Thread(target=publish_loop_metrics, args=(db_conn,)).start()
+                
+                # Start a fresh schedule after recovering instead of counting the outage as lateness
+                loop_scheduler.reset()
                 
     finally:
         if driver:
             driver.quit()
         
+        if check_watchdog:
+            check_watchdog.stop()
+        
+        if cluster_node:
+            cluster_node.stop()
+        
+        if snapshot_recorder:
+            snapshot_recorder.stop()
+        
+        if evidence_store:
+            evidence_store.stop()
+        
+        if inventory_tracker:
+            inventory_tracker.stop()
+        
         if db_conn:
             db_conn.close()
             
@@ -1519,10 +2872,17 @@ if __name__ == "__main__":
     parser.add_argument('--test-full', action='store_true',
                        help='Full test: Simulate finding apartments and test complete workflow')
     parser.add_argument('--no-headless', action='store_true', help='Run Chrome in visible mode (not headless)')
+    parser.add_argument('--workers', type=int, default=WORKER_POOL_SIZE,
+                       help='Number of phase-staggered browsers to use inside priority windows (default: WORKER_POOL_SIZE)')
+    parser.add_argument('--schedule-report', action='store_true',
+                       help='Show the expected detection delay of the adaptive schedule for different check budgets')
     args = parser.parse_args()
     
     # Run the monitor
-    if args.debug_page:
+    if args.schedule_report:
+        print_schedule_report()
+        
+    elif args.debug_page:
         print("DEBUG MODE ACTIVATED!")
         print("Will analyze the website structure and save details to logs/")
         print("This will help identify why apartment tabs aren't being found")
@@ -1605,4 +2965,4 @@ if __name__ == "__main__":
         print("-" * 60)
         speed_mode_main(test_mode=args.test_mode)
     else:
-        main(headless=not args.no_headless)
\ No newline at end of file
+        main(headless=not args.no_headless, workers=args.workers)
\ No newline at end of file
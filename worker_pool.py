@@ -0,0 +1,200 @@
+"""
+Phase-staggered multi-worker checking for OurCampus Apartment Monitor.
+
+A single browser can only sample the page once per check cycle. The worker
+pool runs several checkers, each with its own driver, and hands them ticks
+spaced interval / N apart, so together they sample the page N times per
+interval. Results from all workers go through one DecisionStage, which
+applies them in sample order, so exactly one alert goes out per transition.
+Only the decision holds the stage's lock; the alert is sent after it is
+released, so a slow send does not hold up other workers' results.
+
+The pool only grows while size_for() asks for more workers (inside the
+configured priority windows), and every check must get a slot from a shared
+RateLimiter, which caps total requests per minute.
+"""
+
+import logging
+import queue
+import threading
+import time
+
+from deadline_scheduler import DeadlineScheduler
+
+logger = logging.getLogger(__name__)
+
+
+class DecisionStage:
+    """Serialise results from all workers and drop samples older than the latest applied one."""
+
+    def __init__(self, decide):
+        self.decide = decide
+        self.lock = threading.Lock()
+        self.latest_sample = 0.0
+        self.applied = 0
+        self.stale = 0
+
+    def submit(self, check_id, check_started_at, checked_at, available_apartments):
+        """Apply a result under the lock. decide may return an action (the alert), run after the lock is released."""
+        with self.lock:
+            if check_started_at < self.latest_sample:
+                # A newer sample has already been applied; this one would flip the state back
+                self.stale += 1
+                return
+            self.latest_sample = check_started_at
+            self.applied += 1
+            action = self.decide(available_apartments, check_id, check_started_at, checked_at)
+        if action:
+            action()
+
+
+class Worker(threading.Thread):
+    """One checker with its own driver, running ticks handed to it by the pool."""
+
+    def __init__(self, worker_id, pool):
+        super().__init__(name=f"check-worker-{worker_id}", daemon=True)
+        self.worker_id = worker_id
+        self.pool = pool
+        self.ticks = queue.Queue(maxsize=1)
+        self.ready = threading.Event()
+        self.busy = False
+        self.stopping = False
+        self.checks = 0
+        self.driver = None
+
+    def run(self):
+        try:
+            self.driver = self.pool.make_driver()
+        except Exception as e:
+            logger.error(f"Worker {self.worker_id}: could not create driver: {e}")
+            return
+        self.ready.set()
+        logger.info(f"Worker {self.worker_id} ready")
+
+        try:
+            while not self.stopping:
+                try:
+                    check_id = self.ticks.get(timeout=1)
+                except queue.Empty:
+                    continue
+                self.run_check(check_id)
+        finally:
+            self.ready.clear()
+            self.pool.close_driver(self.driver)
+            logger.info(f"Worker {self.worker_id} stopped")
+
+    def run_check(self, check_id):
+        check_started_at = time.time()
+        try:
+            result = self.pool.check(self.driver, check_id)
+            self.pool.decisions.submit(check_id, check_started_at, time.time(), result)
+        except Exception as e:
+            logger.error(f"Worker {self.worker_id}: check failed: {e}")
+            self.restart_driver()
+        finally:
+            self.checks += 1
+            self.busy = False
+
+        if self.pool.restart_every and self.checks % self.pool.restart_every == 0:
+            logger.info(f"Worker {self.worker_id}: scheduled browser restart")
+            self.restart_driver()
+
+    def restart_driver(self):
+        self.pool.close_driver(self.driver)
+        try:
+            self.driver = self.pool.make_driver()
+        except Exception as e:
+            logger.error(f"Worker {self.worker_id}: browser restart failed: {e}")
+            self.stopping = True
+
+    @property
+    def idle(self):
+        return self.ready.is_set() and not self.busy and not self.stopping
+
+    def give(self, check_id):
+        """Hand a tick to this (idle) worker."""
+        self.busy = True
+        self.ticks.put(check_id)
+
+
+class WorkerPool:
+    """Dispatch phase-staggered ticks to a resizable set of workers."""
+
+    def __init__(self, make_driver, close_driver, check, decide, size_for, interval_for,
+                 rate_limiter, restart_every=15):
+        self.make_driver = make_driver
+        self.close_driver = close_driver
+        self.check = check
+        self.decisions = DecisionStage(decide)
+        self.size_for = size_for
+        self.interval_for = interval_for
+        self.rate_limiter = rate_limiter
+        self.restart_every = restart_every
+
+        self.workers = []
+        self.next_worker_id = 1
+        self.next_worker = 0
+        self.scheduler = DeadlineScheduler()
+        self.dispatched = 0
+        self.rate_limited = 0
+        self.saturated = 0
+
+    def resize(self, size):
+        """Start or stop workers until size are running."""
+        self.workers = [w for w in self.workers if w.is_alive()]
+        while len(self.workers) < size:
+            worker = Worker(self.next_worker_id, self)
+            self.next_worker_id += 1
+            worker.start()
+            self.workers.append(worker)
+            logger.info(f"Worker pool grew to {len(self.workers)} workers")
+        while len(self.workers) > size:
+            # Stop the newest workers; a busy one finishes its current check first
+            worker = self.workers.pop()
+            worker.stopping = True
+            logger.info(f"Worker pool shrank to {len(self.workers)} workers")
+
+    def idle_worker(self):
+        """Next idle worker in round-robin order, or None if all are busy."""
+        for offset in range(len(self.workers)):
+            index = (self.next_worker + offset) % len(self.workers)
+            if self.workers[index].idle:
+                self.next_worker = index + 1
+                return self.workers[index]
+        return None
+
+    def tick(self, check_id):
+        """Resize the pool and run one tick. Returns the seconds until the next tick."""
+        self.scheduler.begin_tick()
+        self.resize(self.size_for())
+
+        worker = self.idle_worker()
+        if worker is None:
+            self.saturated += 1
+        elif not self.rate_limiter.try_acquire():
+            self.rate_limited += 1
+        else:
+            worker.give(check_id)
+            self.dispatched += 1
+
+        # N workers share one interval, each offset by interval / N
+        ready = max(1, sum(1 for w in self.workers if w.ready.is_set()))
+        return self.scheduler.schedule(self.interval_for() / ready)
+
+    def stop(self):
+        for worker in self.workers:
+            worker.stopping = True
+        for worker in self.workers:
+            worker.join(timeout=30)
+        self.workers = []
+
+    def stats(self):
+        return {
+            "workers": len(self.workers),
+            "ready_workers": sum(1 for w in self.workers if w.ready.is_set()),
+            "dispatched": self.dispatched,
+            "rate_limited": self.rate_limited,
+            "saturated": self.saturated,
+            "stale_results": self.decisions.stale,
+            "requests_last_minute": self.rate_limiter.used(),
+        }